@@ -0,0 +1,290 @@
+# batch.py
+# 스캔한 책(페이지 이미지 폴더 또는 PDF)을 Qt 없이 텍스트/오디오로 일괄 변환하는 명령줄 도구.
+# OCR은 프로세스 풀에서 페이지 단위로 병렬 실행하고, TTS는 페이지 순서대로 이어서 합성합니다.
+# 페이지별 결과(page_0001.txt / page_0001.mp3 또는 .wav)는 완성된 뒤에만 파일로 옮겨지므로,
+# 중간에 중단해도 같은 명령을 다시 실행하면 끝난 페이지는 건너뛰고 이어서 진행합니다.
+#
+#   python batch.py 입력(폴더 또는 .pdf) 출력_폴더 [--workers 2] [--dpi 200] [--tts edge] [--no-audio]
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import combined
+import tts
+import tts_backends
+from cache import AudioCache
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+# PDF 페이지를 이미지로 렌더링할 해상도
+DEFAULT_DPI = 200
+MERGED_TEXT = 'book.txt'
+MERGED_AUDIO = 'book'   # + 오디오 형식 확장자
+AUDIO_SUFFIXES = ('.mp3', '.wav', '.aiff')
+REPORT_FILE = 'batch_report.json'
+
+
+#-----------------------------------------
+# 입력 페이지 목록
+#-----------------------------------------
+def _natural_key(name):
+    """'page2.png'가 'page10.png'보다 앞에 오도록 숫자를 값으로 비교하는 정렬 키."""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', name)]
+
+
+def list_pages(source):
+    """(소스 경로, PDF 페이지 번호 또는 None) 목록을 페이지 순서대로 반환합니다."""
+    if os.path.isdir(source):
+        names = sorted((n for n in os.listdir(source) if n.lower().endswith(IMAGE_EXTS)), key=_natural_key)
+        return [(os.path.join(source, n), None) for n in names]
+    if source.lower().endswith('.pdf'):
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(source)
+        try:
+            return [(source, i) for i in range(len(pdf))]
+        finally:
+            pdf.close()
+    raise ValueError(f"페이지 이미지 폴더 또는 PDF 파일이 아닙니다: {source}")
+
+
+def load_page(source, page_no, dpi=DEFAULT_DPI):
+    """페이지 하나를 PIL 이미지로 읽습니다. (PDF는 dpi로 렌더링)"""
+    if page_no is None:
+        from capture import to_pil
+        return to_pil(source)
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(source)
+    try:
+        return pdf[page_no].render(scale=dpi / 72.0).to_pil()
+    finally:
+        pdf.close()
+
+
+#-----------------------------------------
+# OCR 워커 (별도 프로세스)
+#-----------------------------------------
+def _init_worker():
+    """워커 프로세스마다 OCR 모델을 한 번만 로드합니다."""
+    combined.ocr = combined.create_ocr()
+    combined._ocr_cache = None
+
+
+def _ocr_page(index, source, page_no, dpi):
+    t0 = time.perf_counter()
+    text = combined.recognize_text(load_page(source, page_no, dpi))
+    return index, text, (time.perf_counter() - t0) * 1000
+
+
+#-----------------------------------------
+# 결과 파일
+#-----------------------------------------
+def _page_path(out_dir, index, ext):
+    return os.path.join(out_dir, f'page_{index + 1:04d}{ext}')
+
+
+def _write_atomic(path, data):
+    """임시 파일에 쓴 뒤 이름을 바꿔, 중단되더라도 반쯤 쓰인 파일이 남지 않게 합니다."""
+    tmp_path = path + '.tmp'
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _find_page_audio(out_dir, index):
+    for suffix in AUDIO_SUFFIXES:
+        path = _page_path(out_dir, index, suffix)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _read_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+#-----------------------------------------
+# TTS (페이지 순서대로, 메인 프로세스)
+#-----------------------------------------
+def _write_page_audio(out_dir, index, text):
+    if _find_page_audio(out_dir, index) or not text.strip():
+        return
+    try:
+        data = combined.synthesize_audio(text)
+    except Exception as e:
+        print(f"[ERROR] {index + 1}페이지 TTS 실패: {e}")
+        return
+    if data:
+        _write_atomic(_page_path(out_dir, index, tts.audio_suffix(data)), data)
+
+
+#-----------------------------------------
+# 일괄 변환
+#-----------------------------------------
+def run_batch(source, out_dir, workers=2, dpi=DEFAULT_DPI, audio=True, tts_backend=None):
+    """
+    source의 모든 페이지를 OCR/TTS하여 out_dir에 페이지별 텍스트/오디오와 합친 결과를 저장합니다.
+    동시에 처리 중인 페이지는 workers * 2개로 제한해 메모리 사용량을 일정하게 유지합니다.
+    tts_backend로 TTS 엔진 이름을 지정할 수 있습니다. (기본: combined.TTS_BACKEND)
+    결과 요약 dict를 반환합니다.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    pages = list_pages(source)
+    total = len(pages)
+    texts = [None] * total
+    for index in range(total):
+        path = _page_path(out_dir, index, '.txt')
+        if os.path.exists(path):
+            texts[index] = _read_text(path)
+    pending = [i for i in range(total) if texts[i] is None]
+    print(f"[Batch] 전체 {total}페이지, 완료 {total - len(pending)}페이지, 남은 {len(pending)}페이지")
+
+    tts_pool = None
+    if audio:
+        combined._tts_backend = tts_backends.create_backend(tts_backend or combined.TTS_BACKEND,
+                                                            fallback=combined.TTS_FALLBACK)
+        combined._audio_cache = AudioCache(combined.TTS_CACHE_DIR, max_bytes=combined.TTS_CACHE_MAX_BYTES)
+        # 작업자 1개: 제출 순서 = 합성 순서 (OCR과 겹쳐서 진행)
+        tts_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch-tts")
+    next_audio = 0
+
+    def _queue_audio():
+        # 앞 페이지부터 OCR이 끝난 만큼만 순서대로 TTS에 넘김
+        nonlocal next_audio
+        while tts_pool is not None and next_audio < total and texts[next_audio] is not None:
+            tts_pool.submit(_write_page_audio, out_dir, next_audio, texts[next_audio])
+            next_audio += 1
+
+    _queue_audio()
+    start = time.perf_counter()
+    done = 0
+    ocr_ms = []
+    max_in_flight = max(1, workers) * 2
+    queue = iter(pending)
+    interrupted = False
+
+    with ProcessPoolExecutor(max_workers=max(1, workers), initializer=_init_worker) as pool:
+        in_flight = set()
+        try:
+            while True:
+                for index in queue:
+                    src, page_no = pages[index]
+                    in_flight.add(pool.submit(_ocr_page, index, src, page_no, dpi))
+                    if len(in_flight) >= max_in_flight:
+                        break
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index, text, ms = future.result()
+                    _write_atomic(_page_path(out_dir, index, '.txt'), text)
+                    texts[index] = text
+                    ocr_ms.append(ms)
+                    done += 1
+                    elapsed = time.perf_counter() - start
+                    print(f"[Batch] {index + 1}페이지 완료 ({done}/{len(pending)}, "
+                          f"{done / elapsed * 60:.1f} 페이지/분, OCR {ms:.0f}ms)")
+                _queue_audio()
+        except KeyboardInterrupt:
+            interrupted = True
+            print("\n[Batch] 중단됨. 같은 명령을 다시 실행하면 남은 페이지부터 이어서 진행합니다.")
+            for future in in_flight:
+                future.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    ocr_elapsed = time.perf_counter() - start
+    if tts_pool is not None:
+        tts_pool.shutdown(wait=not interrupted, cancel_futures=interrupted)
+
+    report = {
+        'source': os.path.abspath(source),
+        'pages': total,
+        'processed': done,
+        'workers': workers,
+        'ocr_seconds': round(ocr_elapsed, 2),
+        'pages_per_minute': round(done / ocr_elapsed * 60, 2) if done and ocr_elapsed > 0 else None,
+        'ocr_ms_avg': round(sum(ocr_ms) / len(ocr_ms), 1) if ocr_ms else None,
+        'total_seconds': round(time.perf_counter() - start, 2),
+        'complete': not interrupted and all(t is not None for t in texts),
+    }
+    if report['complete']:
+        # 합치기에 실패해도 페이지별 결과와 보고서는 남김
+        try:
+            report['merged_audio'] = _merge(out_dir, texts, audio)
+        except Exception as e:
+            print(f"[ERROR] 결과 합치기 실패 (페이지별 결과는 그대로 있습니다): {e}")
+            report['merge_error'] = str(e)
+    _write_atomic(os.path.join(out_dir, REPORT_FILE), json.dumps(report, ensure_ascii=False, indent=2))
+    return report
+
+
+def _merge(out_dir, texts, audio):
+    """
+    페이지별 결과를 페이지 순서대로 하나의 텍스트/오디오 파일로 합칩니다.
+    합친 오디오 파일 이름을 반환합니다. (오디오가 없거나 페이지마다 형식이 달라 합치지 않았으면 None)
+    실행마다 TTS 엔진이 달라 MP3/WAV 페이지가 섞여 있으면 오디오는 합치지 않고 경고만 남깁니다.
+    """
+    _write_atomic(os.path.join(out_dir, MERGED_TEXT), "\n\n".join(texts))
+    if not audio:
+        return None
+    pages_by_suffix = {}
+    missing = 0
+    for index, text in enumerate(texts):
+        path = _find_page_audio(out_dir, index)
+        if path:
+            pages_by_suffix.setdefault(os.path.splitext(path)[1], []).append((index, path))
+        elif text.strip():
+            missing += 1
+    if missing:
+        print(f"[Batch] 오디오가 없는 페이지 {missing}개 (다시 실행하면 합성을 재시도합니다)")
+    if len(pages_by_suffix) != 1:
+        if pages_by_suffix:
+            summary = ", ".join(f"{suffix} {len(pages)}페이지" for suffix, pages in sorted(pages_by_suffix.items()))
+            print(f"[Batch] 페이지 오디오 형식이 섞여 있어 합치지 않습니다 ({summary}). "
+                  f"한 형식의 페이지 오디오만 남기고 다시 실행하면 합쳐집니다.")
+        return None
+
+    (suffix, pages), = pages_by_suffix.items()
+    parts = []
+    for _index, path in pages:
+        with open(path, 'rb') as f:
+            parts.append(f.read())
+    name = MERGED_AUDIO + suffix
+    _write_atomic(os.path.join(out_dir, name), tts.join_audio(parts))
+    # 이전 실행에서 다른 형식으로 합친 파일은 지금 결과와 맞지 않으므로 삭제
+    for other in AUDIO_SUFFIXES:
+        stale = os.path.join(out_dir, MERGED_AUDIO + other)
+        if other != suffix and os.path.exists(stale):
+            os.remove(stale)
+    return name
+
+
+#-----------------------------------------
+# 엔트리 포인트
+#-----------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="페이지 이미지 폴더/PDF를 텍스트와 오디오로 일괄 변환")
+    parser.add_argument('source', help="페이지 이미지 폴더 또는 PDF 파일")
+    parser.add_argument('out_dir', help="결과를 저장할 폴더 (이미 있으면 이어서 진행)")
+    parser.add_argument('--workers', type=int, default=max(1, min(4, (os.cpu_count() or 2) // 2)),
+                        help="OCR 프로세스 수")
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI, help="PDF 렌더링 해상도")
+    parser.add_argument('--tts', help=f"TTS 엔진 (auto/{'/'.join(tts_backends.BACKENDS)}, 기본: {combined.TTS_BACKEND})")
+    parser.add_argument('--no-audio', action='store_true', help="텍스트만 생성")
+    args = parser.parse_args(argv)
+
+    report = run_batch(args.source, args.out_dir, workers=args.workers, dpi=args.dpi,
+                       audio=not args.no_audio, tts_backend=args.tts)
+    ppm = report['pages_per_minute']
+    print(f"[Batch] {report['processed']}페이지 처리, {report['ocr_seconds']:.1f}s"
+          + (f", {ppm:.1f} 페이지/분" if ppm else ""))
+    return 0 if report['complete'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
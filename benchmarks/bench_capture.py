@@ -0,0 +1,96 @@
+# benchmarks/bench_capture.py
+# 화면 캡처 백엔드(qt / mss / pil)별로 같은 영역을 반복 캡처해 지연 시간을 비교합니다.
+# 실제 화면이 필요합니다. (qt 백엔드는 PyQt5가 있으면 QApplication을 만들어 GUI 스레드에서 측정)
+#
+#   python -m benchmarks.bench_capture [--repeat 30] [--size 1200x1600] [--backend qt mss pil] [--json out.json]
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import capture
+from benchmarks.bench_pipeline import percentile
+
+
+def _parse_size(value):
+    w, h = value.lower().split('x')
+    return int(w), int(h)
+
+
+def measure(backend, bbox, repeat):
+    """backend로 bbox를 repeat번 캡처한 ms 목록. 사용할 수 없으면 None."""
+    try:
+        image, _ = capture.grab(bbox, backend)
+    except Exception as e:
+        print(f"{backend:<4} 사용 불가: {e}", file=sys.stderr)
+        return None, None
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        capture.grab(bbox, backend)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples, capture.image_size(image)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="화면 캡처 백엔드 지연 시간 벤치마크")
+    parser.add_argument('--repeat', type=int, default=30, help="백엔드별 반복 횟수")
+    parser.add_argument('--size', type=_parse_size, default=(1200, 1600), help="캡처 영역 크기 (논리 좌표, 예: 1200x1600)")
+    parser.add_argument('--origin', type=int, nargs=2, default=(0, 0), metavar=('X', 'Y'), help="캡처 영역 왼쪽 위")
+    parser.add_argument('--backend', nargs='*', choices=capture.BACKENDS, help="측정할 백엔드 (기본: 전체)")
+    parser.add_argument('--json', help="결과를 저장할 JSON 경로 (기본: 표준 출력)")
+    args = parser.parse_args(argv)
+
+    app = None
+    try:
+        from PyQt5.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication(sys.argv)
+    except ImportError:
+        pass
+
+    x, y = args.origin
+    bbox = (x, y, x + args.size[0], y + args.size[1])
+    results = {}
+    for backend in args.backend or capture.BACKENDS:
+        samples, size = measure(backend, bbox, args.repeat)
+        if not samples:
+            continue
+        results[backend] = {
+            'n': len(samples),
+            'pixels': list(size),
+            'p50_ms': round(percentile(samples, 50), 2),
+            'p95_ms': round(percentile(samples, 95), 2),
+            'mean_ms': round(statistics.fmean(samples), 2),
+        }
+        print(f"{backend:<4} p50 {results[backend]['p50_ms']:8.2f}ms  p95 {results[backend]['p95_ms']:8.2f}ms  "
+              f"({size[0]}x{size[1]} px)", file=sys.stderr)
+
+    report = {
+        'machine': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'screens': [
+                {'geometry': [s.geometry().x(), s.geometry().y(), s.geometry().width(), s.geometry().height()],
+                 'device_pixel_ratio': s.devicePixelRatio()}
+                for s in app.screens()
+            ] if app is not None else None,
+        },
+        'bbox': list(bbox),
+        'backends': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"결과 저장: {args.json}", file=sys.stderr)
+    else:
+        print(text)
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
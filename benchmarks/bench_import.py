@@ -0,0 +1,119 @@
+# benchmarks/bench_import.py
+# 앱 모듈(toolbar / combined 등)의 import 시간을 `python -X importtime`으로 측정합니다.
+# 모듈마다 새 프로세스에서 import해 누적 시간과 자체 시간이 큰 모듈, 시작 경로에 끌려 들어온 무거운 패키지를 보고합니다.
+# 로딩 화면은 main.py가 toolbar/combined를 import한 뒤에야 그려지므로, 이 시간이 곧 화면이 뜨기까지의 대기 시간입니다.
+#
+#   python -m benchmarks.bench_import [--module toolbar combined] [--repeat 5] [--top 15] [--budget-ms 300] [--json out.json]
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ('toolbar', 'combined')
+# 시작 경로(main → toolbar → combined)에서 불러오면 안 되는 무거운 패키지 (초기화 워커나 사용 시점에 불러옴)
+HEAVY_PACKAGES = ('paddleocr', 'paddle', 'paddlex', 'pyautogui', 'pygame', 'numpy', 'PIL', 'cv2',
+                  'edge_tts', 'pyttsx3', 'onnxruntime', 'openvino', 'mss')
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력 → [(모듈 이름, 깊이, 자체 us, 누적 us)] (import가 끝난 순서)"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue   # 머리글
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(fields[0]), int(fields[1])))
+    return entries
+
+
+def measure(module):
+    """module을 새 프로세스에서 import하고 -X importtime 결과를 파싱합니다."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=BASE_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import 실패")
+    return parse_importtime(proc.stderr)
+
+
+def summarize(module, runs, top):
+    """여러 번 측정한 결과를 모듈별 중앙값으로 묶습니다."""
+    self_us, cumulative_us = {}, {}
+    for entries in runs:
+        for name, _depth, self_t, cum_t in entries:
+            self_us.setdefault(name, []).append(self_t)
+            cumulative_us.setdefault(name, []).append(cum_t)
+    total = statistics.median(cumulative_us[module]) if module in cumulative_us else None
+    # 대상 모듈이 직접 import한 모듈(깊이 1)별 누적 시간
+    direct = {name for name, depth, _s, _c in runs[0] if depth == 1}
+
+    def _top(table, names):
+        rows = sorted(((statistics.median(table[n]), n) for n in names), reverse=True)[:top]
+        return [{'module': n, 'ms': round(us / 1000, 2)} for us, n in rows]
+
+    loaded = {name.split('.')[0] for name in self_us}
+    return {
+        'total_ms': round(total / 1000, 1) if total is not None else None,
+        'modules': len(self_us),
+        'direct_imports': _top(cumulative_us, direct),
+        'top_self': _top(self_us, self_us),
+        'heavy_loaded': sorted(loaded & set(HEAVY_PACKAGES)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="앱 모듈 import 시간 벤치마크 (-X importtime)")
+    parser.add_argument('--module', nargs='*', default=list(DEFAULT_MODULES), help="측정할 모듈 (기본: toolbar combined)")
+    parser.add_argument('--repeat', type=int, default=5, help="모듈별 측정 횟수 (중앙값 사용)")
+    parser.add_argument('--top', type=int, default=15, help="보고할 모듈 수")
+    parser.add_argument('--budget-ms', type=float, default=0, help="0보다 크면 누적 import 시간이 이를 넘을 때 실패 코드로 종료")
+    parser.add_argument('--json', help="결과를 저장할 JSON 경로 (기본: 표준 출력)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    failed = False
+    for module in args.module:
+        try:
+            runs = [measure(module) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"{module:<10} import 실패: {e}", file=sys.stderr)
+            failed = True
+            continue
+        summary = results[module] = summarize(module, runs, args.top)
+        print(f"{module:<10} {summary['total_ms']:8.1f}ms  모듈 {summary['modules']}개"
+              f"{'  무거운 패키지: ' + ', '.join(summary['heavy_loaded']) if summary['heavy_loaded'] else ''}",
+              file=sys.stderr)
+        for row in summary['direct_imports']:
+            print(f"    {row['ms']:8.2f}ms  {row['module']}", file=sys.stderr)
+        if summary['heavy_loaded'] or (args.budget_ms > 0 and summary['total_ms'] > args.budget_ms):
+            failed = True
+
+    report = {
+        'machine': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+        },
+        'repeat': args.repeat,
+        'budget_ms': args.budget_ms or None,
+        'modules': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"결과 저장: {args.json}", file=sys.stderr)
+    else:
+        print(text)
+    return 1 if failed or not results else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# benchmarks/bench_pipeline.py
+# 디스플레이/마우스/네트워크 TTS 없이 run_pipeline의 단계별 지연 시간을 측정합니다.
+# 합성 페이지(한국어/영어/혼합 × 크기 × DPI)를 실제 OCR에 통과시키고, TTS와 재생은 로컬 스텁을 사용합니다.
+#
+#   python -m benchmarks.bench_pipeline [--repeat 3] [--json bench.json] [--lang ko en] [--dpi 96 144]
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+import combined
+from cache import AudioCache, OcrResultCache
+from playback import SegmentPlayer
+from benchmarks.pages import iter_pages, SAMPLE_TEXTS, DPIS, PAGE_SIZES
+from benchmarks.stubs import StubPygame
+from tts_backends import StubBackend
+
+STAGES = ('capture', 'ocr', 'text_save', 'lang_detect', 'tts_first_audio', 'playback_start',
+          'time_to_first_audio', 'tts_total')
+# 페이지를 올려 둘 가상 화면의 여백 (px)
+SCREEN_MARGIN = 200
+
+
+def percentile(values, pct):
+    """선형 보간 백분위수."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(samples):
+    out = {}
+    for stage in STAGES:
+        values = samples.get(stage, [])
+        if not values:
+            continue
+        out[stage] = {
+            'n': len(values),
+            'p50_ms': round(percentile(values, 50), 2),
+            'p95_ms': round(percentile(values, 95), 2),
+            'mean_ms': round(statistics.fmean(values), 2),
+        }
+    return out
+
+
+def setup_headless(tts_first_chunk_delay=0.0, use_cache=False):
+    """run_pipeline이 사용하는 전역 구성 요소를 헤드리스 환경용으로 준비합니다."""
+    out_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    combined.OUTPUT_DIR = out_dir
+    combined.OUTPUT_FILE = os.path.join(out_dir, 'snip_ocr.txt')
+    # 캐시를 끈 측정에서는 줄 인식 캐시도 꺼서 반복 측정이 매번 인식을 수행하게 함
+    combined.ocr = combined.create_ocr(line_cache_size=None if use_cache else 0)
+    combined._ocr_cache = None
+    combined._audio_cache = None
+    if use_cache:
+        # 앱과 같은 설정의 OCR 결과 캐시 (파일 저장 없이 메모리에서만)
+        combined._ocr_cache = OcrResultCache(max_entries=combined.OCR_CACHE_SIZE,
+                                             phash_distance=combined.OCR_CACHE_PHASH_DISTANCE,
+                                             config=combined.ocr_cache_config())
+        combined._audio_cache = AudioCache(os.path.join(out_dir, 'tts_cache'), max_bytes=combined.TTS_CACHE_MAX_BYTES)
+    combined._tts_backend = StubBackend(first_chunk_delay=tts_first_chunk_delay)
+    combined._asyncio = asyncio
+    combined._player = SegmentPlayer(StubPygame())
+
+
+def capture(screen, bbox):
+    """화면 이미지에서 영역을 잘라 OCR 입력을 만드는 캡처 단계 (ImageGrab.grab(bbox)에 해당)."""
+    return screen.crop(bbox).copy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="run_pipeline 단계별 지연 시간 벤치마크 (헤드리스)")
+    parser.add_argument('--repeat', type=int, default=3, help="케이스별 반복 횟수")
+    parser.add_argument('--lang', nargs='*', choices=sorted(SAMPLE_TEXTS), help="언어 선택 (기본: 전체)")
+    parser.add_argument('--size', nargs='*', choices=[s[0] for s in PAGE_SIZES], help="페이지 크기 선택")
+    parser.add_argument('--dpi', nargs='*', type=int, help=f"DPI 선택 (기본: {list(DPIS)})")
+    parser.add_argument('--tts-delay', type=float, default=0.0, help="스텁 TTS 첫 청크 지연(초)")
+    parser.add_argument('--cache', action='store_true', help="OCR 결과/줄 인식 캐시 사용 (기본: 끔, 스텁 TTS는 캐시에 저장되지 않음)")
+    parser.add_argument('--json', help="결과를 저장할 JSON 경로 (기본: 표준 출력)")
+    args = parser.parse_args(argv)
+
+    setup_headless(args.tts_delay, args.cache)
+
+    overall, cases = {}, []
+    warmed = False
+    for name, lang, text, page in iter_pages(args.lang, args.size, args.dpi):
+        # 페이지를 더 큰 '화면' 위에 놓고 해당 영역만 잘라내는 방식으로 캡처를 흉내냄
+        screen = Image.new('RGB', (page.width + 2 * SCREEN_MARGIN, page.height + 2 * SCREEN_MARGIN), (230, 230, 230))
+        screen.paste(page, (SCREEN_MARGIN, SCREEN_MARGIN))
+        bbox = (SCREEN_MARGIN, SCREEN_MARGIN, SCREEN_MARGIN + page.width, SCREEN_MARGIN + page.height)
+        if not warmed:
+            combined.run_pipeline(capture(screen, bbox))
+            warmed = True
+        samples = {}
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            image = capture(screen, bbox)
+            capture_ms = (time.perf_counter() - t0) * 1000
+            combined.run_pipeline(image)
+            timings = combined.get_last_stage_timings()
+            timings['capture'] = capture_ms
+            for stage, ms in timings.items():
+                samples.setdefault(stage, []).append(ms)
+                overall.setdefault(stage, []).append(ms)
+        case = {'case': name, 'lang': lang, 'size': list(page.size), 'chars': len(text),
+                'ocr_chars': len(combined.get_last_ocr_text()), 'stages': summarize(samples)}
+        cases.append(case)
+        s = case['stages']
+        print(f"{name:<22} OCR p50 {s.get('ocr', {}).get('p50_ms', 0):8.1f}ms  "
+              f"첫 오디오 p50 {s.get('time_to_first_audio', {}).get('p50_ms', 0):8.1f}ms", file=sys.stderr)
+
+    report = {
+        'machine': {
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+        },
+        'config': {
+            'repeat': args.repeat,
+            'preprocess': combined.PREPROCESS_ENABLED,
+            'line_cache': combined.OCR_LINE_CACHE,
+            'line_cache_size': combined.OCR_LINE_CACHE_SIZE if args.cache else 0,
+            'tts_streaming': combined.TTS_STREAMING,
+            'tts_stub_first_chunk_delay_s': args.tts_delay,
+            'cache': args.cache,
+        },
+        'ocr_cache': ({'hits': combined._ocr_cache.hits, 'misses': combined._ocr_cache.misses}
+                      if combined._ocr_cache is not None else None),
+        'overall': summarize(overall),
+        'cases': cases,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"결과 저장: {args.json}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+# benchmarks/bench_preprocess.py
+# 같은 이미지에 대해 원본 캡처와 전처리(여백 자르기/축소)한 입력의 페이지당 OCR 시간을 비교합니다.
+#
+#   python -m benchmarks.bench_preprocess 이미지_또는_폴더 [...] [--repeat 3] [--json 결과.json]
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+from PIL import Image
+
+import combined
+import preprocess
+from capture import to_ocr_array
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+
+def _collect(paths):
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            images += sorted(os.path.join(path, n) for n in os.listdir(path) if n.lower().endswith(IMAGE_EXTS))
+        else:
+            images.append(path)
+    return images
+
+
+def _time_ocr(ocr, array, repeat):
+    times, text = [], ""
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        raw = ocr.ocr(array)
+        times.append((time.perf_counter() - t0) * 1000)
+        text = "\n".join(combined._extract_texts(raw))
+    return statistics.median(times), text
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR 전처리 전/후 페이지당 OCR 시간 비교")
+    parser.add_argument('paths', nargs='+', help="이미지 파일 또는 폴더")
+    parser.add_argument('--repeat', type=int, default=3, help="이미지별 반복 횟수 (중앙값 사용)")
+    parser.add_argument('--target-text-height', type=int, default=combined.PREPROCESS_TARGET_TEXT_HEIGHT)
+    parser.add_argument('--grayscale', action='store_true')
+    parser.add_argument('--binarize', action='store_true')
+    parser.add_argument('--json', help="결과를 저장할 JSON 경로")
+    args = parser.parse_args(argv)
+
+    images = _collect(args.paths)
+    if not images:
+        print("[ERROR] 이미지가 없습니다.")
+        return 1
+
+    # 같은 이미지를 반복 인식하므로 줄 인식 캐시를 끔 (켜 두면 두 번째부터 검출 + 캐시 조회 시간만 잼)
+    ocr = combined.create_ocr(line_cache_size=0)
+    # 첫 추론의 워밍업 비용이 결과에 섞이지 않도록 한 번 실행
+    with Image.open(images[0]) as warm:
+        ocr.ocr(to_ocr_array(warm.convert('RGB')))
+
+    rows = []
+    for path in images:
+        with Image.open(path) as img:
+            img = img.convert('RGB')
+        raw_array = to_ocr_array(img)
+        pre_array, info = preprocess.preprocess(
+            img, target_text_height=args.target_text_height,
+            grayscale=args.grayscale, binarize=args.binarize
+        )
+        raw_ms, raw_text = _time_ocr(ocr, raw_array, args.repeat)
+        pre_ms, pre_text = _time_ocr(ocr, pre_array, args.repeat)
+        rows.append({
+            'image': path,
+            'original_size': info['original_size'],
+            'preprocessed_size': info['size'],
+            'text_height': info['text_height'],
+            'raw_ms': round(raw_ms, 1),
+            'preprocessed_ms': round(pre_ms, 1),
+            'raw_chars': len(raw_text),
+            'preprocessed_chars': len(pre_text),
+        })
+        print(f"{os.path.basename(path):<32} {str(info['original_size']):>14} → {str(info['size']):<14} "
+              f"{raw_ms:8.1f}ms → {pre_ms:8.1f}ms  (글자 {len(raw_text)} → {len(pre_text)})")
+
+    total_raw = sum(r['raw_ms'] for r in rows)
+    total_pre = sum(r['preprocessed_ms'] for r in rows)
+    print(f"합계: {total_raw:.0f}ms → {total_pre:.0f}ms ({(1 - total_pre / total_raw) * 100 if total_raw else 0:.0f}% 감소)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'images': rows, 'total_raw_ms': total_raw, 'total_preprocessed_ms': total_pre,
+                       'line_cache_size': 0},
+                      f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
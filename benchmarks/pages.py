@@ -0,0 +1,109 @@
+# benchmarks/pages.py
+# 벤치마크/보정용 합성 페이지: 한국어/영어/혼합 텍스트를 PIL로 여러 크기와 DPI로 렌더링합니다.
+import os
+import sys
+
+from PIL import Image, ImageDraw, ImageFont
+
+SAMPLE_TEXTS = {
+    'ko': (
+        "국립중앙도서관은 대한민국을 대표하는 국가 도서관으로 국내에서 발행된 자료를 수집하고 보존합니다. "
+        "이용자는 전자 도서를 화면에서 읽거나 음성으로 들을 수 있습니다. "
+        "오늘은 날씨가 맑아서 산책하기 좋은 날입니다. 책을 읽는 습관은 생각하는 힘을 길러 줍니다. "
+        "도서관에서는 다양한 문화 행사와 독서 교육 프로그램이 운영됩니다."
+    ),
+    'en': (
+        "The National Library of Korea collects and preserves materials published in the country. "
+        "Readers can browse electronic books on screen or listen to them as synthesized speech. "
+        "The quick brown fox jumps over the lazy dog while the library prepares its evening programs. "
+        "Reading every day builds vocabulary, focus and the habit of careful thought."
+    ),
+    'mixed': (
+        "오늘의 주제는 Optical Character Recognition, 즉 광학 문자 인식입니다. "
+        "PaddleOCR 모델은 text detection과 text recognition 두 단계로 동작합니다. "
+        "The toolbar reads each page aloud, 그리고 다음 페이지로 자동으로 넘어갑니다. "
+        "Time-to-first-audio는 사용자가 체감하는 가장 중요한 지연 시간입니다."
+    ),
+}
+
+# (이름, 텍스트 영역 폭(pt), 글자 크기(pt))
+PAGE_SIZES = (
+    ('small', 360, 11),
+    ('large', 520, 14),
+)
+DPIS = (96, 144, 192)
+
+_FONT_CANDIDATES = (
+    # Windows
+    "C:/Windows/Fonts/malgun.ttf",
+    # macOS
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+    "/Library/Fonts/AppleGothic.ttf",
+    # Linux
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+)
+
+
+def find_font_path():
+    """한글을 그릴 수 있는 시스템 글꼴 경로 (없으면 None)."""
+    override = os.environ.get('BENCH_FONT')
+    if override:
+        return override
+    for path in _FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _wrap(draw, text, font, max_width):
+    lines, cur = [], ""
+    for word in text.split():
+        candidate = f"{cur} {word}" if cur else word
+        if draw.textlength(candidate, font=font) > max_width and cur:
+            lines.append(cur)
+            cur = word
+        else:
+            cur = candidate
+    if cur:
+        lines.append(cur)
+    return lines
+
+
+def render_page(text, width_pt, font_pt, dpi, font_path=None):
+    """text를 흰 배경에 검은 글씨로 렌더링한 RGB 이미지."""
+    scale = dpi / 72.0
+    font_px = max(8, round(font_pt * scale))
+    if font_path:
+        font = ImageFont.truetype(font_path, font_px)
+    else:
+        font = ImageFont.load_default(size=font_px)
+    margin = round(24 * scale)
+    width = round(width_pt * scale) + 2 * margin
+
+    probe = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+    lines = _wrap(probe, text, font, width - 2 * margin)
+    line_h = round(font_px * 1.6)
+    height = len(lines) * line_h + 2 * margin
+
+    img = Image.new('RGB', (width, height), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    for i, line in enumerate(lines):
+        draw.text((margin, margin + i * line_h), line, fill=(0, 0, 0), font=font)
+    return img
+
+
+def iter_pages(languages=None, sizes=None, dpis=None):
+    """(케이스 이름, 언어, 원문, 이미지)를 차례로 생성합니다."""
+    font_path = find_font_path()
+    if font_path is None:
+        print("[WARN] 한글 글꼴을 찾지 못해 기본 글꼴로 렌더링합니다. (BENCH_FONT로 지정 가능)", file=sys.stderr)
+    for lang in (languages or SAMPLE_TEXTS):
+        text = SAMPLE_TEXTS[lang]
+        for size_name, width_pt, font_pt in PAGE_SIZES:
+            if sizes and size_name not in sizes:
+                continue
+            for dpi in (dpis or DPIS):
+                yield f"{lang}-{size_name}-{dpi}dpi", lang, text, render_page(text, width_pt, font_pt, dpi, font_path)
@@ -0,0 +1,44 @@
+# benchmarks/stubs.py
+# 사운드 장치 없이 run_pipeline을 돌리기 위한 로컬 대체 구현. (TTS 대체는 tts_backends.StubBackend)
+
+class _StubMusic:
+    def __init__(self):
+        self._busy = False
+
+    def load(self, source, *args):
+        pass
+
+    def play(self, *args):
+        # 재생은 즉시 끝난 것으로 처리 (재생 시작 시점만 측정)
+        self._busy = False
+
+    def get_busy(self):
+        return self._busy
+
+    def pause(self):
+        pass
+
+    def unpause(self):
+        pass
+
+    def stop(self):
+        self._busy = False
+
+    def unload(self):
+        pass
+
+
+class _StubMixer:
+    def __init__(self):
+        self.music = _StubMusic()
+
+    def init(self, *args, **kwargs):
+        pass
+
+
+class StubPygame:
+    """SegmentPlayer가 사용하는 pygame.mixer.music 부분만 흉내내는 대체 객체."""
+    error = RuntimeError
+
+    def __init__(self):
+        self.mixer = _StubMixer()
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+#-----------------------------------------
+# 이미지 해시
+#-----------------------------------------
+def image_digest(img):
+    """픽셀 데이터 기준의 정확한 해시 (같은 픽셀이면 파일 형식/경로와 무관하게 같은 값)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{img.mode}:{img.size[0]}x{img.size[1]}:".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def dhash(img, hash_size=8):
+    """64비트 차이 해시(dHash). 압축 노이즈나 미세한 렌더링 차이에 강한 지각 해시."""
+    from PIL import Image
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR)
+    px = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = px[row * (hash_size + 1) + col]
+            right = px[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def config_fingerprint(config):
+    """설정 dict의 짧은 지문 (키 순서와 무관). config가 None이면 빈 문자열."""
+    if config is None:
+        return ""
+    return hashlib.blake2b(json.dumps(config, sort_keys=True, default=str).encode(), digest_size=8).hexdigest()
+
+
+#-----------------------------------------
+# OCR 결과 캐시
+#-----------------------------------------
+class OcrResultCache:
+    """
+    캡처 이미지 해시 → OCR 텍스트를 저장하는 LRU 캐시.
+    phash_distance > 0이면 정확한 해시가 없을 때 dHash 해밍 거리가 그 이하인 항목도 적중으로 봅니다.
+    (레이아웃이 비슷한 다른 페이지가 잘못 적중할 수 있으므로 작은 값만 권장, 기본은 꺼짐)
+    persist_path가 주어지면 JSON 파일로 저장/복원합니다.
+    config는 결과에 영향을 주는 설정(전처리, 모델 프로필, 추론 엔진 등)의 dict로, 그 지문을 키와 저장 파일에 넣어
+    설정이 바뀐 뒤에는 이전 설정으로 얻은 결과를 돌려주지 않습니다. (지문이 다른 저장 파일은 버림)
+    """
+
+    def __init__(self, max_entries=128, phash_distance=0, persist_path=None, config=None):
+        self.max_entries = max_entries
+        self.phash_distance = phash_distance
+        self.persist_path = persist_path
+        self.fingerprint = config_fingerprint(config)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # digest -> (phash, text)
+        if persist_path:
+            self._load()
+
+    def make_key(self, img):
+        """이미지에서 (설정 지문이 포함된 정확한 해시, 지각 해시) 키를 계산합니다."""
+        return f"{self.fingerprint}:{image_digest(img)}", (dhash(img) if self.phash_distance > 0 else None)
+
+    def get(self, key):
+        digest, phash = key
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None and phash is not None:
+                for other_digest, (other_phash, _text) in reversed(self._entries.items()):
+                    if other_phash is not None and hamming(phash, other_phash) <= self.phash_distance:
+                        digest, entry = other_digest, self._entries[other_digest]
+                        break
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, text):
+        digest, phash = key
+        with self._lock:
+            self._entries[digest] = (phash, text)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.persist_path:
+                self._save_locked()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.persist_path and os.path.exists(self.persist_path):
+                os.remove(self.persist_path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self):
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or data.get('fingerprint') != self.fingerprint:
+                print(f"[Cache] OCR 설정이 바뀌어 저장된 OCR 캐시를 버립니다: {self.persist_path}")
+                return
+            for item in data['entries'][-self.max_entries:]:
+                self._entries[item['digest']] = (item.get('phash'), item['text'])
+            print(f"[Cache] OCR 캐시 {len(self._entries)}개 항목 복원: {self.persist_path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[ERROR] OCR 캐시 파일 읽기 실패: {e}")
+
+    def _save_locked(self):
+        # 오래된 항목 → 최근 항목 순서로 저장해 복원 시 LRU 순서를 유지
+        data = {
+            'fingerprint': self.fingerprint,
+            'entries': [{'digest': d, 'phash': p, 'text': t} for d, (p, t) in self._entries.items()],
+        }
+        tmp_path = self.persist_path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.persist_path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            print(f"[ERROR] OCR 캐시 파일 저장 실패: {e}")
+
+
+#-----------------------------------------
+# TTS 오디오 캐시 (디스크)
+#-----------------------------------------
+class AudioCache:
+    """
+    (텍스트, 음성, 속도) → 합성된 오디오 파일을 전용 디렉터리에 저장하는 디스크 캐시.
+    전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 파일(mtime 기준)부터 지웁니다.
+    적중 시 파일 mtime을 갱신하여 LRU 순서를 유지합니다.
+    in_use()가 주어지면 그 반환값(경로 모음)에 든 파일, 즉 재생 중이거나 다시 듣기로 재생될 파일은 지우지 않습니다.
+    get/put/정리는 모두 한 잠금 안에서 실행됩니다.
+    """
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, suffix='.mp3', in_use=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.in_use = in_use
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._total_bytes = sum(size for _path, size, _mtime in self._scan())
+            self._evict_locked()
+
+    @staticmethod
+    def make_key(text, voice, rate=""):
+        h = hashlib.sha256()
+        h.update(f"{voice}\0{rate}\0{text}".encode('utf-8'))
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key):
+        """캐시된 오디오 파일 경로, 없으면 None."""
+        path = self._path(key)
+        with self._lock:
+            if not os.path.exists(path):
+                self.misses += 1
+                return None
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+            self.hits += 1
+            return path
+
+    def put(self, key, data):
+        """오디오 데이터를 저장하고 파일 경로를 반환합니다."""
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        with self._lock:
+            try:
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._total_bytes += len(data) - old_size
+                self._evict_locked(keep=path)
+            except OSError as e:
+                print(f"[ERROR] TTS 캐시 저장 실패: {e}")
+        return path
+
+    def total_bytes(self):
+        with self._lock:
+            return self._total_bytes
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _evict_locked(self, keep=None):
+        if self._total_bytes <= self.max_bytes:
+            return
+        protected = {keep}
+        if self.in_use is not None:
+            try:
+                protected.update(os.path.abspath(p) for p in self.in_use())
+            except Exception as e:
+                print(f"[ERROR] 재생 중인 TTS 캐시 파일 확인 실패, 정리를 미룹니다: {e}")
+                return
+        for path, size, _mtime in sorted(self._scan(), key=lambda e: e[2]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if path == keep or os.path.abspath(path) in protected:
+                continue
+            try:
+                os.remove(path)
+                self._total_bytes -= size
+            except OSError:
+                # 재생 중이라 잠긴 파일(Windows) 등은 다음 기회에 정리
+                pass
+
+
+#-----------------------------------------
+# 줄 단위 인식 결과 캐시
+#-----------------------------------------
+class LineRecognitionCache:
+    """
+    검출된 텍스트 줄 이미지(crop)의 해시 → 인식 결과(텍스트, 점수)를 저장하는 LRU 캐시.
+    연속 읽기에서 머리말/꼬리말/바뀌지 않은 줄은 인식기를 다시 돌리지 않게 합니다.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def make_key(crop):
+        """줄 이미지(NumPy 배열)의 크기와 픽셀로 만든 해시."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{crop.shape}:{crop.dtype}:".encode())
+        h.update(crop.tobytes())
+        return h.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,193 @@
+import sys
+import threading
+import tracing
+
+#-----------------------------------------
+# 화면 캡처 백엔드
+#-----------------------------------------
+# 영역 좌표는 항상 Qt 논리 좌표(가상 데스크톱 전체 기준, 보조 모니터는 음수일 수 있음)로 받습니다.
+#   'qt'  : QScreen.grabWindow. GUI 스레드에서만 사용 가능하며, 배율이 적용된 화면도 실제 픽셀로 캡처
+#   'mss' : mss(Windows BitBlt / X11 XGetImage / macOS CoreGraphics). 어느 스레드에서나 사용 가능
+#   'pil' : PIL.ImageGrab (기존 방식, 가장 느림)
+# qt/mss는 BGRA 버퍼를 복사 한 번으로 BGR NumPy 배열(OCR 입력 형식)로 바꿔 반환하고, pil은 PIL 이미지를 반환합니다.
+# NumPy/PIL은 툴바 시작 시간을 늘리지 않도록 처음 캡처할 때 불러옵니다.
+BACKENDS = ('qt', 'mss', 'pil')
+# 'auto'는 위 순서대로 사용 가능한 첫 백엔드를 캡처마다 고름
+_backend = 'auto'
+_local = threading.local()   # 스레드별 mss 인스턴스 (mss는 스레드 간 공유 불가)
+_unavailable = set()         # import에 실패한 백엔드
+
+
+def configure(backend='auto'):
+    """캡처 백엔드를 설정합니다. ('auto' / 'qt' / 'mss' / 'pil')"""
+    global _backend
+    if backend != 'auto' and backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 캡처 백엔드: {backend}")
+    _backend = backend
+
+
+def _qt_app():
+    """실행 중인 QGuiApplication (Qt를 쓰지 않는 실행에서는 PyQt5를 불러오지 않고 None)."""
+    if 'PyQt5.QtGui' not in sys.modules:
+        return None
+    from PyQt5.QtGui import QGuiApplication
+    return QGuiApplication.instance()
+
+
+def _screen_for(app, bbox):
+    """영역 중심이 속한 화면 (없으면 주 화면)."""
+    from PyQt5.QtCore import QPoint
+    center = QPoint((bbox[0] + bbox[2]) // 2, (bbox[1] + bbox[3]) // 2)
+    return app.screenAt(center) or app.primaryScreen()
+
+
+#-----------------------------------------
+# 좌표 변환 (논리 좌표 → 실제 픽셀)
+#-----------------------------------------
+def _scale_point(screen, x, y):
+    # Qt 5의 화면 geometry는 원점은 실제 위치 그대로, 크기만 배율로 나눈 값
+    geo = screen.geometry()
+    ratio = screen.devicePixelRatio()
+    return round(geo.x() + (x - geo.x()) * ratio), round(geo.y() + (y - geo.y()) * ratio)
+
+
+def to_physical(bbox):
+    """
+    논리 좌표 영역을 mss/PIL/pyautogui가 쓰는 실제 픽셀 좌표로 바꿉니다.
+    (macOS는 이들도 포인트 단위를 쓰므로, Qt가 없거나 배율이 1이면 그대로 반환)
+    """
+    app = _qt_app()
+    if app is None or sys.platform == 'darwin':
+        return tuple(bbox)
+    screen = _screen_for(app, bbox)
+    if screen.devicePixelRatio() == 1:
+        return tuple(bbox)
+    x1, y1 = _scale_point(screen, bbox[0], bbox[1])
+    x2, y2 = _scale_point(screen, bbox[2], bbox[3])
+    return x1, y1, x2, y2
+
+
+def to_physical_point(x, y):
+    """논리 좌표 한 점을 실제 픽셀 좌표로 바꿉니다. (자동 클릭용)"""
+    return to_physical((x, y, x, y))[:2]
+
+
+#-----------------------------------------
+# 백엔드별 캡처
+#-----------------------------------------
+def _grab_qt(bbox):
+    app = _qt_app()
+    # QScreen.grabWindow는 GUI 스레드에서만 호출 가능
+    if app is None or threading.current_thread() is not threading.main_thread():
+        return None
+    import numpy as np
+    from PyQt5.QtCore import QRect
+    from PyQt5.QtGui import QImage
+    x1, y1, x2, y2 = bbox
+    screen = _screen_for(app, bbox)
+    geo = screen.geometry()
+    if not geo.contains(QRect(x1, y1, x2 - x1, y2 - y1)):
+        # 여러 화면에 걸친 영역은 가상 데스크톱 전체를 다루는 다른 백엔드로
+        return None
+    image = screen.grabWindow(0, x1 - geo.x(), y1 - geo.y(), x2 - x1, y2 - y1).toImage()
+    if image.isNull():
+        # 화면 캡처를 허용하지 않는 환경(Wayland 등)
+        return None
+    # Format_RGB32는 메모리상 B, G, R, X 순서 (리틀 엔디언)
+    image = image.convertToFormat(QImage.Format_RGB32)
+    w, h = image.width(), image.height()
+    ptr = image.constBits()
+    ptr.setsize(image.bytesPerLine() * h)
+    buf = np.frombuffer(ptr, np.uint8).reshape(h, image.bytesPerLine())[:, :w * 4].reshape(h, w, 4)
+    return np.ascontiguousarray(buf[:, :, :3])
+
+
+def _grab_mss(bbox):
+    import numpy as np
+    sct = getattr(_local, 'mss', None)
+    if sct is None:
+        import mss
+        sct = _local.mss = mss.mss()
+    x1, y1, x2, y2 = to_physical(bbox)
+    shot = sct.grab({'left': x1, 'top': y1, 'width': x2 - x1, 'height': y2 - y1})
+    buf = np.frombuffer(shot.raw, np.uint8).reshape(shot.height, shot.width, 4)
+    return np.ascontiguousarray(buf[:, :, :3])   # BGRA → BGR
+
+
+def _grab_pil(bbox):
+    from PIL import ImageGrab
+    # all_screens: Windows에서 주 화면 밖(보조 모니터) 영역도 캡처
+    return ImageGrab.grab(bbox=to_physical(bbox), all_screens=True)
+
+
+_GRABBERS = {'qt': _grab_qt, 'mss': _grab_mss, 'pil': _grab_pil}
+
+
+def image_size(image):
+    """PIL 이미지 / NumPy 배열의 (너비, 높이)."""
+    if hasattr(image, 'shape'):
+        return image.shape[1], image.shape[0]
+    return image.size
+
+
+def grab(bbox, backend=None):
+    """
+    화면의 (x1, y1, x2, y2) 논리 좌표 영역을 캡처해 (이미지, 사용한 백엔드 이름)을 반환합니다.
+    이미지는 qt/mss면 BGR NumPy 배열, pil이면 PIL 이미지입니다. (tracing 기록 없음)
+    """
+    backend = backend or _backend
+    names = BACKENDS if backend == 'auto' else (backend,)
+    for name in names:
+        if name in _unavailable:
+            continue
+        try:
+            image = _GRABBERS[name](bbox)
+        except ImportError:
+            _unavailable.add(name)
+            continue
+        except Exception as e:
+            if backend != 'auto':
+                raise
+            print(f"[Capture] {name} 캡처 실패, 다음 방식 사용: {e}")
+            continue
+        if image is not None:
+            return image, name
+    raise RuntimeError(f"사용 가능한 화면 캡처 방식이 없습니다. (설정: {backend})")
+
+
+def grab_region(bbox):
+    """
+    화면의 (x1, y1, x2, y2) 영역을 캡처해 반환합니다. (디스크를 거치지 않음)
+    qt/mss 백엔드는 OCR에 그대로 넘길 수 있는 BGR 배열을 반환합니다.
+    """
+    with tracing.span('capture') as sp:
+        image, name = grab(bbox)
+        sp.set(backend=name, size=image_size(image))
+        return image
+
+
+#-----------------------------------------
+# 화면 캡처 → OCR 입력 변환
+#-----------------------------------------
+def to_pil(image):
+    """경로 / PIL 이미지 / BGR NumPy 배열을 PIL 이미지로 통일합니다."""
+    import numpy as np
+    from PIL import Image
+    if isinstance(image, Image.Image):
+        return image
+    if isinstance(image, np.ndarray):
+        if image.ndim == 3:
+            image = image[:, :, ::-1]  # BGR → RGB
+        return Image.fromarray(np.ascontiguousarray(image))
+    with Image.open(image) as img:
+        img.load()
+        return img
+
+
+def to_ocr_array(image):
+    """PaddleOCR이 바로 받을 수 있는 BGR uint8 배열로 변환합니다. (cv2.imread와 같은 형식)"""
+    import numpy as np
+    if isinstance(image, np.ndarray):
+        return image
+    rgb = np.asarray(to_pil(image).convert('RGB'))
+    return np.ascontiguousarray(rgb[:, :, ::-1])
@@ -1,15 +1,19 @@
 import sys
 import os
-import asyncio
-import tempfile
-import uuid
-from PyQt5.QtWidgets import QWidget, QApplication
-from PyQt5.QtGui import QPainter, QPen, QGuiApplication, QFont, QColor
-from PyQt5.QtCore import Qt, QRect, pyqtSignal, QObject, QPoint
+import json
+import atexit
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
-from PIL import ImageGrab
-from paddleocr import PaddleOCR
-import pyautogui
+import capture
+from capture import to_pil, to_ocr_array
+import tracing
+from playback import SegmentPlayer
+from scratch import ScratchArea
+from cache import OcrResultCache, AudioCache
+import tts
+import tts_backends
+import ocr_profiles
+import cpu_tuning
 
 #-----------------------------------------
 # 설정
@@ -18,153 +22,417 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SNIP_PATH = os.path.join(BASE_DIR, 'result/snip.png')
 OUTPUT_DIR = os.path.join(BASE_DIR, 'result')
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, 'snip_ocr.txt')
+# 디버깅용 캡처 저장: True일 때만 캡처 이미지를 SNIP_PATH에 PNG로 저장
+# (기본은 캡처 이미지를 메모리에서 바로 OCR로 넘기며 디스크에 쓰지 않음)
+SAVE_DEBUG_CAPTURES = False
+# 화면 캡처 방식: 'auto'(qt → mss → pil 순서로 사용 가능한 첫 방식) / 'qt' / 'mss' / 'pil'
+# qt/mss는 배율이 적용된 화면과 보조 모니터 좌표를 실제 픽셀로 맞추고, 캡처 결과를 배열로 바로 OCR에 넘김
+CAPTURE_BACKEND = 'auto'
+capture.configure(CAPTURE_BACKEND)
 
 # TTS 설정
+# TTS 엔진: 'edge'(온라인 신경망 음성) / 'pyttsx3'(운영체제 음성, 오프라인) / 'espeak'(espeak-ng, 오프라인)
+#          / 'stub'(시험용 무음) / 'auto'(사용 가능한 엔진 중 첫 음성이 가장 빨리 나오는 엔진을 요청마다 선택)
+TTS_BACKEND = 'edge'
+# 선택한 엔진이 실패하면(네트워크 끊김 등) 설치된 다른 엔진으로 이어서 합성
+# (실패한 엔진은 잠시 후보에서 빠지므로 연속 읽기 중 매 페이지 연결을 기다리지 않음)
+TTS_FALLBACK = True
 # 한국어 TTS 음성 이름
 KO_VOICE_NAME = "ko-KR-SunHiNeural"
 # 영어 TTS 음성 이름 (원하는 다른 음성으로 변경 가능)
 EN_VOICE_NAME = "en-US-JennyNeural"
+# 한 페이지 안의 한국어/영어 구간을 각각의 음성으로 읽음 (구간들은 동시에 합성되어 순서대로 재생)
+# False면 한글이 하나라도 있으면 페이지 전체를 한국어 음성으로 읽음
+TTS_MIXED_LANGUAGE = True
+# 스트리밍 재생: 첫 오디오 청크가 도착하는 즉시 재생을 시작하고 나머지는 재생 중에 계속 받음
+# (False면 전체 합성이 끝난 뒤 한 번에 재생)
+TTS_STREAMING = True
+# 문장/문단 청크를 동시에 합성할 최대 요청 수
+TTS_MAX_CONCURRENCY = 3
+# 말하기 속도 (edge-tts 형식, 예: "+10%")
+TTS_RATE = "+0%"
+
+# 연속 읽기 미리 준비: 현재 페이지의 합성이 끝나면 재생이 끝나기를 기다리지 않고 바로 다음 페이지로 넘겨
+# 캡처/OCR/TTS를 진행하고, 그 오디오를 현재 오디오 뒤에 대기시켜 페이지 사이 무음 없이 이어서 재생
+# (False면 현재 페이지 재생이 끝난 뒤 다음 페이지로 넘김. 페이지 사이 무음 길이는 tracing 'page_gap'으로 기록)
+CONTINUOUS_LOOKAHEAD = True
+
+# TTS 오디오 캐시 설정
+# (텍스트, 음성, 속도)가 같으면 edge-tts를 다시 호출하지 않고 저장된 오디오를 재생
+TTS_CACHE_DIR = os.path.join(OUTPUT_DIR, 'tts_cache')
+# 캐시 디렉터리 최대 크기 (초과 시 오래 사용하지 않은 파일부터 삭제)
+TTS_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# OCR 모델 프로필: 'fast' / 'balanced' / 'accurate'(기존 기본 모델) / 'auto'
+# 'auto'는 `python ocr_profiles.py calibrate`가 이 컴퓨터에서 측정해 저장한 추천 프로필을 사용
+OCR_PROFILE = 'accurate'
+
+# OCR 추론 엔진: 'paddle'(PaddlePaddle, 기본) / 'onnxruntime' / 'openvino' / 'onnxruntime-int8' / 'openvino-int8' / 'auto'
+# ONNX 엔진은 `python ocr_engines.py export [--int8]`로 내보낸 모델(OCR_ONNX_DIR)을 사용
+# 'auto'는 `python ocr_profiles.py calibrate --engines ...`가 정확도 기준을 통과한 엔진 중 가장 빠른 것을 사용
+# 코드를 고치지 않고 바꾸려면 실행 시 환경 변수 SNIP_OCR_ENGINE을 지정
+OCR_ENGINE = os.environ.get('SNIP_OCR_ENGINE', 'auto')
+OCR_ONNX_DIR = os.path.join(BASE_DIR, 'models', 'onnx')
+
+# OCR 추론 CPU 설정 (공용 PC에서 OCR이 UI/오디오 스레드와 코어를 다투어 화면/소리가 끊기는 것을 방지)
+# 추론 스레드 수 (0이면 엔진 기본값)
+OCR_CPU_THREADS = 0
+# OCR 스레드를 고정할 CPU 코어 번호 목록 (None이면 고정 안 함). 예: [2, 3, 4, 5] → 0, 1번 코어는 UI/오디오용
+# (Linux/Windows만 지원, macOS는 스레드 수만 적용)
+OCR_CPU_CORES = None
+# True면 시작 시 여러 (스레드 수, 코어) 조합으로 OCR 속도와 OCR 중 UI/오디오 스레드 지연을 측정해
+# 지연 예산 안에서 가장 빠른 설정을 사용 (result/ocr_threads.json에 저장, 같은 엔진/프로필/코어 수면 재측정 안 함)
+OCR_CPU_AUTOTUNE = False
+OCR_CPU_JITTER_BUDGET_MS = 8.0
+
+# OCR 결과 캐시 설정
+# 같은 픽셀의 캡처(재캡처, 넘김 실패, 이전 페이지로 돌아가기)는 PaddleOCR을 다시 돌리지 않음
+OCR_CACHE_SIZE = 128
+# 0이면 정확히 같은 픽셀만 적중, 1~4 정도로 올리면 지각 해시가 비슷한 캡처도 적중
+OCR_CACHE_PHASH_DISTANCE = 0
+# True면 캐시를 파일로 저장해 다음 실행에서도 재사용
+OCR_CACHE_PERSIST = False
+OCR_CACHE_FILE = os.path.join(OUTPUT_DIR, 'ocr_cache.json')
+
+# OCR 전처리 설정 (캡처 → OCR 사이)
+# 여백을 자르고 글자 높이가 목표값이 되도록 축소하여 고해상도 캡처의 추론 시간을 줄임
+PREPROCESS_ENABLED = True
+PREPROCESS_TARGET_TEXT_HEIGHT = 32
+# 어느 경우에도(지연 시간 예산 모드 포함) 이 글자 높이 아래로는 줄이지 않음
+PREPROCESS_MIN_TEXT_HEIGHT = 20
+PREPROCESS_GRAYSCALE = False
+PREPROCESS_BINARIZE = False
+# 페이지당 OCR 목표 시간(ms). 0보다 크면 최근 OCR 속도를 바탕으로 해상도를 골라 예산에 맞춤
+OCR_LATENCY_BUDGET_MS = 0
+
+# 줄 단위 인식 캐시: 검출된 줄 이미지가 이전에 본 것과 같으면 인식을 건너뜀
+# (연속 읽기에서 머리말/꼬리말/바뀌지 않은 문단 재사용)
+OCR_LINE_CACHE = True
+OCR_LINE_CACHE_SIZE = 4096
+
+# OCR 서버 모드: PaddleOCR을 별도 상주 프로세스(ocr_server.py)에서 실행
+# 서버가 없으면 자동으로 띄우며, 앱을 다시 실행해도 로드된 모델을 그대로 사용
+OCR_SERVER_MODE = False
+OCR_SERVER_PORT = 50731
+
+# 단계별 추적/지표 (캡처·OCR·TTS·재생 시작 소요 시간, 캐시 적중 수 등)
+# 꺼도 동작에는 영향이 없고, 켜 두어도 비용이 거의 없으므로 기본은 켜짐
+TRACE_ENABLED = True
+# True면 모든 span/이벤트를 TRACE_FILE에 JSONL로 기록
+TRACE_TO_FILE = False
+TRACE_FILE = os.path.join(OUTPUT_DIR, 'trace.jsonl')
+tracing.configure(TRACE_ENABLED, TRACE_FILE if TRACE_TO_FILE else None)
+
+# 시작 시간 보고서 (초기화가 끝날 때마다 덮어씀)
+STARTUP_REPORT_FILE = os.path.join(OUTPUT_DIR, 'startup_timing.json')
+# initialize_components가 준비하는 구성 요소 이름 (component_ready 콜백으로 전달됨)
+STARTUP_COMPONENTS = ('pygame', 'tts', 'ocr')
 
 # 글로벌 변수 선언 (초기화는 initialize_components 함수에서 진행)
 ocr = None
 _pygame = None
-_edge_tts = None
+_tts_backend = None
 _asyncio = None
-_tts_file_path = None
+_player = None
+_scratch = None
+_playback_listeners = []
+_advance_listeners = []
+_ocr_cache = None
+_audio_cache = None
 _last_ocr_text = ""
 
+# 시작 시간 측정 기준점 (모듈 import 시점, main.py는 set_startup_origin으로 프로세스 시작 시점을 지정)
+_startup_t0 = time.perf_counter()
+_startup_report = {}
+
 #-----------------------------------------
 # 초기화 함수
 #-----------------------------------------
-def initialize_components(progress_callback):
+def _init_pygame():
+    global _pygame, _player, _scratch
+    import pygame
+    _pygame = pygame
+    _pygame.mixer.init()
+    # TTS 오디오는 메모리에서 재생하며, 파일이 꼭 필요할 때만 참조 수로 관리되는 임시 영역을 사용
+    _scratch = ScratchArea()
+    atexit.register(_scratch.close)
+    _player = SegmentPlayer(_pygame, scratch=_scratch, on_finished=_notify_playback_finished,
+                            on_advanced=_notify_playback_advanced)
+
+def _audio_in_use():
+    """플레이어가 재생 중이거나 다시 재생할 수 있는 캐시 파일 경로 (TTS 캐시 정리에서 제외)."""
+    return _player.segment_paths() if _player is not None else ()
+
+def _init_tts():
+    global _tts_backend, _asyncio, _audio_cache
+    # asyncio는 import 비용이 커서 툴바 시작 경로 대신 초기화 워커에서 불러옴
+    import asyncio
+    _tts_backend = tts_backends.create_backend(TTS_BACKEND, fallback=TTS_FALLBACK)
+    _asyncio = asyncio
+    _audio_cache = AudioCache(TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES, in_use=_audio_in_use)
+
+def create_ocr(profile=None, engine=None, cpu_threads=None, line_cache_size=None):
     """
-    애플리케이션의 무거운 초기화 작업을 수행하는 함수.
-    이 함수는 별도의 스레드에서 실행되어야 UI가 멈추지 않습니다.
+    앱 전체에서 사용하는 설정으로 OCR 엔진을 만듭니다. (OCR 서버에서도 사용)
+    profile/engine/cpu_threads/line_cache_size를 생략하면 OCR_PROFILE의 모델 조합, OCR_ENGINE의 추론 엔진,
+    OCR_CPU_THREADS의 스레드 수, OCR_LINE_CACHE_SIZE의 줄 캐시 크기를 사용합니다.
+    (line_cache_size=0이면 같은 줄도 매번 인식, OCR 시간을 재는 벤치마크용)
     """
-    global ocr, _pygame, _edge_tts, _asyncio
-    
-    total_steps = 100 # 총 단계를 100개로 늘려 더 세분화
-    
-    print("[INIT] 초기화 작업 시작...")
-    
-    # 1. Pygame 초기화 (0-10%)
-    progress_callback.emit(0, "Pygame Mixer 초기화 중...")
+    import ocr_engines
+    threads = OCR_CPU_THREADS if cpu_threads is None else cpu_threads
+    cache_size = OCR_LINE_CACHE_SIZE if line_cache_size is None else line_cache_size
+    name = ocr_profiles.resolve_profile(profile or OCR_PROFILE)
+    spec = ocr_profiles.PROFILES[name]
+    engine = ocr_engines.resolve_engine(engine or OCR_ENGINE)
+    print(f"[OCR] 모델 프로필: {name} ({spec['det_model']} + {spec['rec_model']}), 엔진: {engine}")
     try:
-        import pygame
-        _pygame = pygame
-        _pygame.mixer.init()
-        print("✅ Pygame Mixer 초기화 완료.")
-    except Exception as e:
-        print(f"[ERROR] pygame 초기화 실패: {e}")
-    progress_callback.emit(10, "Pygame Mixer 초기화 완료")
-
-    # 2. PaddleOCR 모델 로딩 (10-80%)
-    progress_callback.emit(15, "OCR 모델 로딩 준비 중...")
-    try:
-        # 이 부분이 가장 오래 걸리므로, 로딩처럼 보이도록 여러 단계로 나눕니다.
-        # 실제 로딩은 단일 함수 호출이지만, 프로그레스바를 부드럽게 만들기 위한 시뮬레이션입니다.
-        for i in range(15, 80, 5):
-            progress_callback.emit(i, f"OCR 모델 로딩 중... ({i}%)")
-            time.sleep(0.1)
-             
-        ocr = PaddleOCR(
-            use_textline_orientation=False,
-            use_doc_orientation_classify=False,
-            use_doc_unwarping=False,
-            lang='korean'
-        )
-        print("✅ PaddleOCR 초기화 완료.")
-    except Exception as e:
-        print(f"[ERROR] PaddleOCR 초기화 실패: {e}")
-    progress_callback.emit(80, "PaddleOCR 모델 로딩 완료")
-
-    # 3. edge_tts 초기화 (80-90%)
-    progress_callback.emit(85, "TTS 엔진 초기화 중...")
+        return ocr_engines.create_engine(engine, spec, line_cache=OCR_LINE_CACHE, cache_size=cache_size,
+                                         model_dir=OCR_ONNX_DIR, cpu_threads=threads)
+    except (ImportError, FileNotFoundError) as e:
+        if engine == 'paddle':
+            raise
+        print(f"[ERROR] OCR 엔진 '{engine}'을 사용할 수 없어 PaddlePaddle로 실행합니다: {e}")
+        return ocr_engines.create_engine('paddle', spec, line_cache=OCR_LINE_CACHE, cache_size=cache_size,
+                                         cpu_threads=threads)
+
+def _autotune_cpu():
+    """
+    OCR_CPU_AUTOTUNE: 저장된 결과가 없으면 합성 페이지로 스레드/코어 조합을 측정하고,
+    고른 설정을 OCR_CPU_THREADS / OCR_CPU_CORES에 반영합니다.
+    """
+    global OCR_CPU_THREADS, OCR_CPU_CORES
+    import ocr_engines
+    profile = ocr_profiles.resolve_profile(OCR_PROFILE)
+    engine = ocr_engines.resolve_engine(OCR_ENGINE)
+    key = cpu_tuning.tuning_key(engine, profile)
+    best = cpu_tuning.load_tuned(key)
+    if best is None:
+        from benchmarks.pages import iter_pages
+        images = [to_ocr_array(page) for *_, page in iter_pages(languages=['mixed'], sizes=['large'], dpis=[144])]
+        best = cpu_tuning.autotune(lambda threads: create_ocr(profile, engine, cpu_threads=threads),
+                                   images, key, OCR_CPU_JITTER_BUDGET_MS)['best']
+    if best is not None:
+        OCR_CPU_THREADS, OCR_CPU_CORES = best['threads'], best['cores']
+        print(f"[CPU] OCR 스레드 {OCR_CPU_THREADS or '기본'}, 코어 {OCR_CPU_CORES or '전체'}")
+
+def ocr_cache_config():
+    """OCR 결과에 영향을 주는 설정. (OCR 결과 캐시 키와 저장 파일에 지문으로 들어감)"""
+    import ocr_engines
+    return {
+        'profile': ocr_profiles.resolve_profile(OCR_PROFILE),
+        'engine': ocr_engines.resolve_engine(OCR_ENGINE),
+        'server': OCR_SERVER_MODE,
+        'preprocess': PREPROCESS_ENABLED and {
+            'target_text_height': PREPROCESS_TARGET_TEXT_HEIGHT,
+            'min_text_height': PREPROCESS_MIN_TEXT_HEIGHT,
+            'grayscale': PREPROCESS_GRAYSCALE,
+            'binarize': PREPROCESS_BINARIZE,
+            'budget_ms': OCR_LATENCY_BUDGET_MS,
+        },
+    }
+
+def _init_ocr():
+    global ocr, _ocr_cache
+    # 툴바 시작 시간에서 뺀 이미지 처리 모듈(NumPy/PIL)을 초기화 스레드에서 미리 불러 첫 캡처가 기다리지 않게 함
+    import preprocess
+    ocr = None
+    if OCR_SERVER_MODE:
+        from ocr_server import OcrClient
+        client = OcrClient(port=OCR_SERVER_PORT)
+        try:
+            client.connect()
+            ocr = client
+        except Exception as e:
+            print(f"[ERROR] OCR 서버 연결 실패, 앱 내부에서 모델을 로드합니다: {e}")
+    if ocr is None:
+        if OCR_CPU_AUTOTUNE:
+            _autotune_cpu()
+        with cpu_tuning.pinned(OCR_CPU_CORES):
+            ocr = create_ocr()
+    _ocr_cache = OcrResultCache(
+        max_entries=OCR_CACHE_SIZE,
+        phash_distance=OCR_CACHE_PHASH_DISTANCE,
+        persist_path=OCR_CACHE_FILE if OCR_CACHE_PERSIST else None,
+        config=ocr_cache_config()
+    )
+
+# (이름, 표시 이름, 진행률 가중치, 초기화 함수)
+_INIT_STEPS = (
+    ('pygame', "Pygame Mixer", 10, _init_pygame),
+    ('tts', "TTS 엔진", 10, _init_tts),
+    ('ocr', "PaddleOCR 모델", 80, _init_ocr),
+)
+
+def set_startup_origin(t0):
+    """시작 시간 보고서의 기준점을 t0(time.perf_counter 값)로 바꿉니다."""
+    global _startup_t0
+    _startup_t0 = t0
+
+def startup_milestone(name):
+    """시작 시간 보고서에 이정표(모듈 import 기준 경과 ms)를 기록합니다."""
+    _startup_report.setdefault('milestones_ms', {})[name] = round((time.perf_counter() - _startup_t0) * 1000, 1)
+
+def get_startup_report():
+    return dict(_startup_report)
+
+def _write_startup_report():
+    lines = ["[INIT] 시작 시간 보고서"]
+    for name, ms in _startup_report.get('components_ms', {}).items():
+        lines.append(f"  {name:<8} {ms:>8.1f} ms")
+    for name, ms in _startup_report.get('milestones_ms', {}).items():
+        lines.append(f"  @{name:<16} {ms:>8.1f} ms")
+    print("\n".join(lines))
     try:
-        import edge_tts
-        _edge_tts = edge_tts
-    except Exception as e:
-        print(f"[ERROR] edge_tts 초기화 실패: {e}")
-    progress_callback.emit(90, "TTS 엔진 초기화 완료")
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        with open(STARTUP_REPORT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(_startup_report, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"[ERROR] 시작 시간 보고서 저장 실패: {e}")
 
-    # 4. asyncio 초기화 (90-100%)
-    progress_callback.emit(95, "비동기 모듈 로딩 중...")
-    try:
-        import asyncio
-        _asyncio = asyncio
-    except Exception as e:
-        print(f"[ERROR] asyncio 초기화 실패: {e}")
+def initialize_components(progress_callback, component_ready=None, components=None, component_failed=None):
+    """
+    애플리케이션의 무거운 초기화 작업을 수행하는 함수.
+    이 함수는 별도의 스레드에서 실행되어야 UI가 멈추지 않습니다.
+    서로 독립적인 Pygame/TTS/OCR 초기화를 동시에 실행하고, 각 단계가 실제로 끝날 때마다
+    progress_callback.emit(진행률, 메시지)와 component_ready.emit(이름)을 보냅니다.
+    실패한 단계는 component_failed.emit(이름, 오류 메시지)로 알립니다.
+    components로 초기화할 구성 요소 이름을 고를 수 있습니다. (기본: STARTUP_COMPONENTS 전체, 실패한 단계 재시도용)
+    """
+    print("[INIT] 초기화 작업 시작...")
+    progress_callback.emit(0, "초기화 중...")
+    startup_milestone('init_start')
+    init_start = time.perf_counter()
+    component_ms = {}
+    progress = 0
+
+    def _timed(step):
+        name, label, _weight, func = step
+        t0 = time.perf_counter()
+        try:
+            func()
+            error = None
+            print(f"✅ {label} 초기화 완료.")
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            print(f"[ERROR] {label} 초기화 실패: {e}")
+        return error, (time.perf_counter() - t0) * 1000
+
+    steps = [step for step in _INIT_STEPS if components is None or step[0] in components]
+    total_weight = sum(step[2] for step in steps) or 1
+    with ThreadPoolExecutor(max_workers=max(1, len(steps)), thread_name_prefix="init") as pool:
+        futures = {pool.submit(_timed, step): step for step in steps}
+        for future in as_completed(futures):
+            name, label, weight, _func = futures[future]
+            error, ms = future.result()
+            component_ms[name] = round(ms, 1)
+            startup_milestone(f'{name}_ready')
+            progress += weight * 100 // total_weight
+            progress_callback.emit(min(progress, 99), f"{label} {'초기화 실패' if error else '준비 완료'}")
+            if error is None:
+                if component_ready is not None:
+                    component_ready.emit(name)
+            elif component_failed is not None:
+                component_failed.emit(name, error)
+
+    # 재시도로 일부만 초기화한 경우에도 다른 구성 요소의 기록은 유지
+    _startup_report.setdefault('components_ms', {}).update(component_ms)
+    _startup_report['init_total_ms'] = round((time.perf_counter() - init_start) * 1000, 1)
+    startup_milestone('init_done')
     progress_callback.emit(100, "모든 초기화 작업 완료.") # 마지막은 항상 100%로
-
+    _write_startup_report()
     print("[INIT] 모든 초기화 작업 완료.")
 
 #-----------------------------------------
 # 오디오 제어 함수
 #-----------------------------------------
+def add_playback_listener(callback):
+    """
+    재생 시퀀스가 끝까지 재생되어 끝날 때마다 callback()을 호출하도록 등록합니다.
+    (재생 스레드에서 호출되므로 GUI는 시그널로 넘겨 받아야 함. 정지/교체 시에는 호출되지 않음)
+    """
+    _playback_listeners.append(callback)
+
+def _notify_playback_finished():
+    for callback in list(_playback_listeners):
+        callback()
+
+def add_playback_advance_listener(callback):
+    """
+    대기 중이던 다음 페이지 오디오가 현재 재생 시퀀스가 될 때마다 callback()을 호출하도록 등록합니다.
+    (재생 스레드에서 호출되므로 GUI는 시그널로 넘겨 받아야 함)
+    """
+    _advance_listeners.append(callback)
+
+def _notify_playback_advanced():
+    for callback in list(_advance_listeners):
+        callback()
+
 def play_audio(file_path):
-    global _tts_file_path, _pygame
-    if _pygame is None:
+    """단일 오디오(파일 경로 또는 오디오 바이트)를 새 시퀀스로 재생합니다."""
+    global _player
+    if _player is None:
         print("[ERROR] Pygame이 초기화되지 않았습니다.")
         return
-    try:
-        _pygame.mixer.music.load(file_path)
-        _pygame.mixer.music.play()
-        _tts_file_path = file_path
-        print("▶️ 오디오 재생 시작")
-    except _pygame.error as e:
-        print(f"[ERROR] 오디오 파일 재생 중 오류 발생: {e}")
+    _player.start()
+    _player.append(file_path)
+    _player.finish()
+    print("▶️ 오디오 재생 시작")
 
 def pause_audio():
-    global _pygame
-    if _pygame is None: return
-    if _pygame.mixer.music.get_busy():
-        _pygame.mixer.music.pause()
+    global _player
+    if _player is None: return
+    if _player.is_busy():
+        _player.pause()
         print("⏸ 오디오 일시정지")
 
 def resume_audio():
-    global _pygame
-    if _pygame is None: return
-    # 오디오가 일시정지 상태일 때만 unpause() 호출
-    # pygame.mixer.music.get_busy()는 일시정지 시 False가 되므로, 
-    # 오디오가 로드되어 있지만 재생 중이 아닐 때를 확인해야 함
-    if _pygame.mixer.music.get_busy() == 0 and _tts_file_path:
-        _pygame.mixer.music.unpause()
+    global _player
+    if _player is None: return
+    # 일시정지된 시퀀스가 있을 때만 재개 (재생 위치와 남은 세그먼트 유지)
+    if _player.is_paused():
+        _player.resume()
         print("▶ 오디오 재생 재개")
 
 def restart_audio():
-    """현재 오디오를 처음부터 다시 재생합니다."""
-    global _pygame, _tts_file_path
-    if _pygame is None:
+    """현재 오디오를 처음부터 다시 재생합니다. (스트리밍 중인 시퀀스 포함)"""
+    global _player
+    if _player is None:
         print("[ERROR] Pygame이 초기화되지 않았습니다.")
         return
-    if _tts_file_path:
+    if _player.restart():
         print("🔁 오디오 다시듣기")
-        play_audio(_tts_file_path)
     else:
         print("[combined] 오디오가 로드되지 않아 다시듣기를 실행할 수 없습니다.")
         
 def stop_audio():
-    global _tts_file_path, _pygame
-    if _pygame is None: return
-    if _pygame.mixer.music.get_busy():
-        _pygame.mixer.music.stop()
+    global _player
+    if _player is None: return
+    if _player.is_busy() or _player.is_paused():
         print("⏹ 오디오 정지")
-        _tts_file_path = None
+    _player.stop()
 
 def is_audio_busy():
-    global _pygame
-    if _pygame is None:
+    global _player
+    if _player is None:
+        return False
+    return _player.is_busy()
+
+def has_queued_audio():
+    """현재 재생 뒤에 이어서 재생할 다음 페이지 오디오가 대기 중이면 True."""
+    if _player is None:
         return False
-    return _pygame.mixer.music.get_busy()
+    return _player.has_queued()
 
 def is_audio_finished():
-    global _pygame
-    if _pygame is None:
+    global _player
+    if _player is None:
         return True
-    return not _pygame.mixer.music.get_busy() and _tts_file_path is not None
+    return not _player.is_busy() and not _player.is_paused() and _player.has_audio()
     
 def get_current_audio_file():
-    return _tts_file_path
+    if _player is None:
+        return None
+    return _player.current_segment()
 
 def perform_mouse_click(click_pos):
     """
@@ -172,110 +440,162 @@ def perform_mouse_click(click_pos):
     click_pos: QPoint 객체
     """
     if click_pos:
-        pyautogui.click(click_pos.x(), click_pos.y())
-        print(f"[Automation] 마우스 클릭: {click_pos.x()}, {click_pos.y()}")
+        # pyautogui는 import 시 디스플레이에 연결하므로 실제로 클릭할 때 불러옴 (헤드리스 실행 지원)
+        import pyautogui
+        # 화면 배율이 적용된 모니터에서는 논리 좌표를 실제 픽셀 좌표로 변환
+        x, y = capture.to_physical_point(click_pos.x(), click_pos.y())
+        pyautogui.click(x, y)
+        print(f"[Automation] 마우스 클릭: {x}, {y}")
     else:
         print("[Automation] 클릭 위치가 설정되지 않았습니다.")
 
 #-----------------------------------------
-# 스니핑 툴
+# OCR
 #-----------------------------------------
-class SnippingTool(QWidget):
-    def __init__(self, mode='read_area', callback_on_cancel=None, callback_on_snip_done=None, instruction_text=""):
-        super().__init__()
-        self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
-        self.setWindowOpacity(0.5)
-        self.setCursor(Qt.CrossCursor)
-        screen = QGuiApplication.primaryScreen().geometry()
-        self.setGeometry(screen)
-        self.begin = self.end = None
-        self.save_path = SNIP_PATH
-        self.showFullScreen()
-        self.canceled = False
-        self.callback_on_cancel = callback_on_cancel
-        self.callback_on_snip_done = callback_on_snip_done
-        self.mode = mode
-        self.instruction_text = instruction_text
-        self.setMouseTracking(True)
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        
-        # 안내 텍스트 그리기
-        if self.instruction_text:
-            painter.setPen(QColor(255, 255, 255))
-            painter.setFont(QFont("나눔고딕", 20, QFont.Bold))
-            text_rect = QRect(0, 0, self.width(), self.height())
-            painter.drawText(text_rect, Qt.AlignCenter, self.instruction_text)
-
-        if self.begin and self.end:
-            painter.setPen(QPen(Qt.red, 2, Qt.SolidLine))
-            if self.mode in ('read_area', 'normal'):
-                rect = QRect(self.begin, self.end).normalized()
-                painter.drawRect(rect)
-            elif self.mode == 'click_pos':
-                painter.drawEllipse(self.begin, 5, 5)
-
-    def mousePressEvent(self, event):
-        self.begin = event.pos()
-        self.end = self.begin
-        self.update()
-
-    def mouseMoveEvent(self, event):
-        self.end = event.pos()
-        self.update()
-
-    def mouseReleaseEvent(self, event):
-        if self.canceled:
-            return
-        
-        self.close()
-
-        if self.mode == 'read_area':
-            x1, y1 = min(self.begin.x(), self.end.x()), min(self.begin.y(), self.end.y())
-            x2, y2 = max(self.begin.x(), self.end.x()), max(self.begin.y(), self.end.y())
-            if abs(x2 - x1) > 5 and abs(y2 - y1) > 5:
-                if self.callback_on_snip_done:
-                    self.callback_on_snip_done((x1, y1, x2, y2))
-            else:
-                if self.callback_on_cancel:
-                    self.callback_on_cancel()
-        elif self.mode == 'click_pos':
-            if self.callback_on_snip_done:
-                self.callback_on_snip_done(self.begin)
-        else: # 기본 캡처 모드
-            x1, y1 = min(self.begin.x(), self.end.x()), min(self.begin.y(), self.end.y())
-            x2, y2 = max(self.begin.x(), self.end.x()), max(self.begin.y(), self.end.y())
-            if abs(x2 - x1) > 5 and abs(y2 - y1) > 5:
-                img = ImageGrab.grab(bbox=(x1, y1, x2, y2))
-                img.save(self.save_path)
-                if self.callback_on_snip_done:
-                    self.callback_on_snip_done(self.save_path)
-            else:
-                if self.callback_on_cancel:
-                    self.callback_on_cancel()
-
-    def keyPressEvent(self, event):
-        if event.key() == Qt.Key_Escape:
-            self.canceled = True
-            self.close()
-            if self.callback_on_cancel:
-                self.callback_on_cancel()
+def _extract_texts(raw):
+    """PaddleOCR 결과(3.x dict 형식 / 2.x 리스트 형식)에서 줄 단위 텍스트 목록을 꺼냅니다."""
+    texts = []
+    if isinstance(raw, list) and raw and isinstance(raw[0], dict) and 'rec_texts' in raw[0]:
+        texts = raw[0]['rec_texts']
+    elif isinstance(raw, list) and raw and isinstance(raw[0], list):
+        for line in raw:
+            for item in line:
+                if isinstance(item, list) and len(item) >= 2:
+                    text_data = item[1]
+                    if isinstance(text_data, tuple):
+                        texts.append(text_data[0])
+                    else:
+                        texts.append(text_data)
+    return texts
+
+def save_debug_capture(image):
+    """SAVE_DEBUG_CAPTURES가 켜져 있을 때만 캡처 이미지를 SNIP_PATH에 저장합니다."""
+    if not SAVE_DEBUG_CAPTURES:
+        return
+    try:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        to_pil(image).save(SNIP_PATH)
+    except Exception as e:
+        print(f"[ERROR] 디버그 캡처 저장 실패: {e}")
+
+def _prepare_ocr_input(img, image):
+    """OCR에 넘길 BGR 배열을 만듭니다. (PREPROCESS_ENABLED면 여백 자르기/축소)"""
+    import preprocess
+    with tracing.span('preprocess') as sp:
+        if PREPROCESS_ENABLED:
+            ocr_input, info = preprocess.preprocess(
+                img,
+                target_text_height=PREPROCESS_TARGET_TEXT_HEIGHT,
+                min_text_height=PREPROCESS_MIN_TEXT_HEIGHT,
+                grayscale=PREPROCESS_GRAYSCALE,
+                binarize=PREPROCESS_BINARIZE,
+                budget_ms=OCR_LATENCY_BUDGET_MS
+            )
+            sp.set(original_size=info['original_size'], size=info['size'], text_height=info['text_height'])
+        else:
+            ocr_input = to_ocr_array(image)
+    return ocr_input
+
+def _ocr_many(inputs):
+    """
+    여러 입력을 가능하면 한 번의 OCR 호출로 처리하고, 입력마다 ocr.ocr()와 같은 형식의 결과를 반환합니다.
+    LineCachedOCR은 ocr_batch, PaddleOCR 3.x는 리스트를 받는 predict로 한꺼번에 추론합니다.
+    """
+    if len(inputs) == 1:
+        return [ocr.ocr(inputs[0])]
+    if hasattr(ocr, 'ocr_batch'):
+        return ocr.ocr_batch(inputs)
+    if hasattr(ocr, 'predict'):
+        return [[res] for res in ocr.predict(inputs)]
+    return [ocr.ocr(x) for x in inputs]
+
+def recognize_texts(images):
+    """
+    여러 이미지를 한 번에 인식해 이미지별 텍스트 목록을 반환합니다. (HTTP 서비스의 마이크로 배치용)
+    캐시에 있는 이미지는 건너뛰고 나머지만 한 번의 OCR 호출로 처리합니다.
+    """
+    global ocr, _ocr_cache
+    results = [None] * len(images)
+    keys = [None] * len(images)
+    missing, inputs = [], []
+    for idx, image in enumerate(images):
+        img = to_pil(image)
+        if _ocr_cache is not None:
+            keys[idx] = _ocr_cache.make_key(img)
+            cached = _ocr_cache.get(keys[idx])
+            if cached is not None:
+                tracing.incr('ocr_cache_hit')
+                results[idx] = cached
+                continue
+            tracing.incr('ocr_cache_miss')
+        missing.append(idx)
+        inputs.append(_prepare_ocr_input(img, image))
+
+    if not inputs:
+        return results
+    t0 = time.perf_counter()
+    # OCR을 실행하는 스레드(와 추론 스레드)만 OCR_CPU_CORES에 고정, UI/오디오 스레드는 그대로
+    with cpu_tuning.pinned(OCR_CPU_CORES):
+        raws = _ocr_many(inputs)
+    ocr_ms = (time.perf_counter() - t0) * 1000
+    pixels = sum(x.shape[0] * x.shape[1] for x in inputs)
+    import preprocess
+    preprocess.latency_model.record(pixels, ocr_ms)
+    tracing.mark('ocr_infer', t0, batch=len(inputs), pixels=pixels)
+    for idx, raw in zip(missing, raws):
+        results[idx] = "\n".join(_extract_texts(raw))
+        if keys[idx] is not None:
+            _ocr_cache.put(keys[idx], results[idx])
+    return results
+
+def recognize_text(image):
+    """
+    이미지(PIL 이미지 / BGR NumPy 배열 / 파일 경로)의 텍스트를 인식해 줄바꿈으로 이은 문자열을 반환합니다.
+    캡처 이미지는 PNG 인코딩/디코딩 없이 배열로 PaddleOCR에 바로 전달됩니다.
+    같은 픽셀(또는 지각 해시 허용 범위 안)의 이미지는 캐시된 결과를 바로 돌려줍니다.
+    """
+    return recognize_texts([image])[0]
 
 #-----------------------------------------
 # OCR + TTS 실행
 #-----------------------------------------
-def run_pipeline(image_path, progress_cb=None):
+def choose_voice(text):
+    """텍스트에 한글이 있으면 한국어 음성, 없으면 영어 음성 이름을 반환합니다."""
+    has_korean = any('\uac00' <= ch <= '\ud7a3' for ch in text)
+    return KO_VOICE_NAME if has_korean else EN_VOICE_NAME
+
+def plan_chunks(text, voice=None):
+    """
+    text를 합성 단위 [(청크, 음성), ...]로 나눕니다.
+    voice가 주어지거나 TTS_MIXED_LANGUAGE가 꺼져 있으면 전체를 한 음성으로,
+    아니면 문장 청크를 다시 한국어/영어 구간으로 나눠 구간마다 해당 언어의 음성을 씁니다.
     """
-    이미지 경로를 받아 OCR → 텍스트 파일 저장 → TTS 생성/재생까지 수행.
+    if voice is not None or not TTS_MIXED_LANGUAGE:
+        voice = voice or choose_voice(text)
+        return [(chunk, voice) for chunk in tts.split_text(text)]
+    voices = {'ko': KO_VOICE_NAME, 'en': EN_VOICE_NAME}
+    return [(run, voices[lang])
+            for chunk in tts.split_text(text)
+            for lang, run in tts.split_language_runs(chunk)]
+
+def run_pipeline(image, progress_cb=None, cancel_event=None, playback_cb=None, stage_cb=None, continuation=False):
+    """
+    캡처 이미지(PIL 이미지 / BGR NumPy 배열 / 파일 경로)를 받아 OCR → 텍스트 파일 저장 → TTS 생성/재생까지 수행.
     진행 상황을 퍼센트로 업데이트할 수 있도록 progress_cb(value:int, msg:str) 콜백을 지원.
+    cancel_event(threading.Event)가 주어지면 각 단계 사이에서 확인하여 설정 시 중단합니다.
+    playback_cb()는 첫 오디오 재생이 시작되는 순간 한 번 호출됩니다. (스트리밍 모드에서는
+    합성이 끝나기 전에 호출될 수 있음)
+    stage_cb(name, ms)는 각 단계(tracing span)가 끝날 때마다 호출됩니다. (진행 창 지연 시간 표시용)
+    continuation=True(연속 읽기의 다음 페이지)면 재생 중인 오디오를 멈추지 않고 그 뒤에 이어서 재생되도록
+    대기시킵니다. 이 경우 playback_cb는 첫 오디오가 재생 대기열에 들어가는 순간 호출됩니다.
+    오디오 재생이 시작되면 True, 그 외(텍스트 없음/오류/취소)에는 False를 반환합니다.
     """
-    global _last_ocr_text, ocr, _edge_tts, _asyncio, _pygame, KO_VOICE_NAME, EN_VOICE_NAME
+    global _last_ocr_text, ocr, _tts_backend, _asyncio, _player, KO_VOICE_NAME, EN_VOICE_NAME, TTS_MAX_CONCURRENCY
 
-    if ocr is None or _edge_tts is None or _asyncio is None:
+    if ocr is None or _tts_backend is None or _asyncio is None or _player is None:
         print("[ERROR] 필수 컴포넌트(OCR, TTS)가 초기화되지 않았습니다.")
         if progress_cb: progress_cb(100, "오류")
-        return
+        return False
 
     def _p(val, msg=""):
         try:
@@ -285,74 +605,170 @@ def run_pipeline(image_path, progress_cb=None):
             # 진행 콜백으로 인한 오류는 무시하고 파이프라인 계속
             pass
 
-    print(f"[run_pipeline] 파이프라인 시작: {image_path}")
+    def _cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            print("[run_pipeline] 취소 요청으로 파이프라인 중단")
+            _p(100, "취소됨")
+            return True
+        return False
+
+    print(f"[run_pipeline] 파이프라인 시작: {image if isinstance(image, str) else type(image).__name__}")
+    pipeline_start = time.perf_counter()
     _p(5, "준비 중…")
 
-    try:
-        # ── 1) OCR ───────────────────────────────────────────────────────────
-        _p(10, "OCR 시작")
-        print("🧠 Running PaddleOCR...")
-        raw = ocr.ocr(image_path)
-        _p(40, "텍스트 인식 중…")
-
-        texts = []
-        if isinstance(raw, list) and raw and isinstance(raw[0], dict) and 'rec_texts' in raw[0]:
-            texts = raw[0]['rec_texts']
-        elif isinstance(raw, list) and raw and isinstance(raw[0], list):
-            for line in raw:
-                for item in line:
-                    if isinstance(item, list) and len(item) >= 2:
-                        text_data = item[1]
-                        if isinstance(text_data, tuple):
-                            texts.append(text_data[0])
-                        else:
-                            texts.append(text_data)
-
-        full_text = "\n".join(texts)
-        print(f"📄 OCR로 인식된 텍스트(요약 {len(full_text)}자)")
-        if not full_text.strip():
-            print("🚫 인식된 텍스트가 없습니다. 오디오를 생성하지 않습니다.")
-            _p(100, "인식된 텍스트 없음")
-            return
-
-        # ── 2) 파일 저장 ─────────────────────────────────────────────────────
-        _p(55, "텍스트 저장 중…")
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-            f.write(full_text)
-        print(f"✅ OCR text saved to {OUTPUT_FILE}")
-        _last_ocr_text = full_text
-
-        # ── 3) 언어 감지 및 음성 선택 ─────────────────────────────────────────
-        has_korean = any('\uac00' <= ch <= '\ud7a3' for ch in full_text)
-        voice_name = KO_VOICE_NAME if has_korean else EN_VOICE_NAME
-        print(f"🎤 선택된 TTS 음성: {voice_name}")
-
-        # 기존 재생 중 오디오 정리
-        if _pygame is not None and _pygame.mixer.music.get_busy():
-            _pygame.mixer.music.stop()
-            time.sleep(0.1)
-
-        # ── 4) TTS 생성 ──────────────────────────────────────────────────────
-        _p(75, "TTS 변환 준비…")
-        temp_audio = os.path.join(tempfile.gettempdir(), f'snip_tts_{uuid.uuid4().hex}.mp3')
-
-        async def gen_tts():
-            tts = _edge_tts.Communicate(text=full_text, voice=voice_name)
-            await tts.save(temp_audio)
-
-        _p(80, "TTS 변환 중…")
-        _asyncio.run(gen_tts())
-        print("🔉 TTS 오디오 생성 완료")
-
-        # ── 5) 재생 ──────────────────────────────────────────────────────────
-        _p(90, "오디오 재생 준비…")
-        play_audio(temp_audio)
-
-        _p(100, "완료")
-    except Exception as e:
-        print(f"[ERROR] run_pipeline 오류: {e}")
-        _p(100, "오류")
+    # 단계별 소요 시간은 tracing으로 기록 (get_last_stage_timings()로 조회)
+    with tracing.trace('pipeline', listener=stage_cb):
+        try:
+            # ── 1) OCR ───────────────────────────────────────────────────────
+            _p(10, "OCR 시작")
+            with tracing.span('ocr'):
+                full_text = recognize_text(image)
+            _p(40, "텍스트 인식 중…")
+            if _cancelled():
+                return False
+
+            print(f"📄 OCR로 인식된 텍스트(요약 {len(full_text)}자)")
+            if not full_text.strip():
+                print("🚫 인식된 텍스트가 없습니다. 오디오를 생성하지 않습니다.")
+                _p(100, "인식된 텍스트 없음")
+                return False
+            if _cancelled():
+                return False
+
+            # ── 2) 파일 저장 ─────────────────────────────────────────────────
+            _p(55, "텍스트 저장 중…")
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+            with tracing.span('text_save'):
+                with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+                    f.write(full_text)
+            print(f"✅ OCR text saved to {OUTPUT_FILE}")
+            _last_ocr_text = full_text
+
+            # ── 3) 언어 감지 및 음성 선택 ─────────────────────────────────────
+            with tracing.span('lang_detect'):
+                chunks = plan_chunks(full_text)
+            voice_names = list(dict.fromkeys(voice for _chunk, voice in chunks))
+            print(f"🎤 선택된 TTS 음성: {', '.join(voice_names)} (구간 {len(chunks)}개)")
+            if _cancelled():
+                return False
+
+            # 기존 재생 중 오디오 정리 (다음 페이지라면 현재 오디오 뒤에 이어서 재생)
+            if not continuation:
+                stop_audio()
+
+            # ── 4) TTS 생성 + 5) 재생 ────────────────────────────────────────
+            # 텍스트를 문장/문단 청크(및 언어 구간)로 나눠 최대 TTS_MAX_CONCURRENCY개씩 동시에 합성합니다.
+            # 스트리밍 모드에서는 첫 세그먼트가 도착하는 즉시 재생을 시작하고,
+            # 나머지 세그먼트는 청크 순서대로 플레이어 큐 뒤에 붙습니다.
+            _p(75, "TTS 변환 준비…")
+            segment_count = 0
+            tts_start = time.perf_counter()
+
+            def _on_segment(segment):
+                nonlocal segment_count
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                first = segment_count == 0
+                if first:
+                    playback_t = tracing.mark('tts_first_audio', tts_start)
+                    _player.start(continuation=continuation)
+                # 합성된 오디오 바이트는 디스크에 쓰지 않고 메모리에서 재생,
+                # 캐시에 있던 오디오 파일 경로는 그대로 재생 (캐시가 수명 관리)
+                _player.append(segment)
+                segment_count += 1
+                if first:
+                    tracing.mark('playback_start', playback_t)
+                    tracing.mark('time_to_first_audio', pipeline_start)
+                    print("▶️ 오디오 재생 시작")
+                    _p(90, "오디오 재생 시작")
+                    if playback_cb:
+                        playback_cb()
+
+            segment_kwargs = {}
+            if not TTS_STREAMING:
+                # 전체 합성이 끝난 뒤 단일 세그먼트로 재생
+                segment_kwargs = dict(first_segment_bytes=sys.maxsize, segment_bytes=sys.maxsize)
+
+            _p(80, f"TTS 변환 중… (청크 {len(chunks)}개)")
+            try:
+                completed = _asyncio.run(tts.synthesize_chunks(
+                    _tts_backend, chunks, _on_segment, cancel_event=cancel_event,
+                    max_concurrency=TTS_MAX_CONCURRENCY, rate=TTS_RATE,
+                    audio_cache=_audio_cache, **segment_kwargs
+                ))
+            finally:
+                if segment_count:
+                    _player.finish()
+            tracing.mark('tts_total', tts_start, segments=segment_count, chunks=len(chunks))
+            if not completed or _cancelled():
+                return False
+            print(f"🔉 TTS 오디오 생성 완료 (세그먼트 {segment_count}개)")
+            if not segment_count:
+                print("[ERROR] TTS 오디오가 생성되지 않았습니다.")
+                _p(100, "오류")
+                return False
+
+            tracing.incr('pages_read')
+            _p(100, "완료")
+            return True
+        except Exception as e:
+            print(f"[ERROR] run_pipeline 오류: {e}")
+            _p(100, "오류")
+            return False
+
+
+def synthesize_audio(text, voice=None):
+    """
+    text 전체를 합성해 오디오 바이트(edge-tts는 MP3, 오프라인 엔진은 WAV)로 반환합니다.
+    (재생하지 않음, 일괄 변환/HTTP 서비스용. 형식은 tts.audio_suffix로 확인)
+    voice를 생략하면 plan_chunks(text)로 구간마다 음성을 고르며, 실패하면 None을 반환합니다.
+    청크를 하나의 파일로 합치므로 모든 청크를 한 엔진으로 합성합니다. (중간에 다른 엔진으로 넘어가면
+    MP3와 WAV가 섞이므로, 엔진이 실패하면 다음 엔진으로 요청 전체를 다시 합성)
+    """
+    global _tts_backend, _audio_cache
+    if _tts_backend is None:
+        raise RuntimeError("TTS 엔진이 초기화되지 않았습니다.")
+    chunks = plan_chunks(text, voice)
+    if not chunks:
+        return None
+    voices = list(dict.fromkeys(v for _chunk, v in chunks))
+    candidates = tts_backends.request_candidates(_tts_backend, voices)
+    if not candidates:
+        raise RuntimeError(f"음성 {', '.join(voices)}을(를) 모두 낼 수 있는 TTS 엔진이 없습니다.")
+
+    import asyncio
+    errors = []
+    for backend in candidates:
+        parts = []
+
+        def _on_segment(segment):
+            if isinstance(segment, str):
+                with open(segment, 'rb') as f:
+                    parts.append(f.read())
+            else:
+                parts.append(segment)
+
+        try:
+            with tracing.span('tts_synthesize', chars=len(text), backend=backend.name):
+                ok = asyncio.run(tts.synthesize_chunks(
+                    backend, chunks, _on_segment,
+                    max_concurrency=TTS_MAX_CONCURRENCY, rate=TTS_RATE,
+                    # 캐시에는 edge-tts(MP3) 결과만 있으므로 다른 엔진으로 합성할 때는 쓰지 않음
+                    audio_cache=_audio_cache if backend.cacheable else None,
+                    first_segment_bytes=sys.maxsize, segment_bytes=sys.maxsize
+                ))
+        except Exception as e:
+            if backend is not _tts_backend:
+                _tts_backend.report_failure(backend, e)
+            errors.append(f"{backend.name}: {e}")
+            continue
+        return tts.join_audio(parts) if ok and parts else None
+    raise RuntimeError("TTS 합성 실패. " + "; ".join(errors))
+
+
+def get_last_stage_timings():
+    """마지막 run_pipeline의 단계별 소요 시간(ms) dict. (TRACE_ENABLED가 꺼져 있으면 빈 dict)"""
+    return tracing.last_trace()
 
 
 def get_last_ocr_text():
@@ -0,0 +1,249 @@
+# cpu_tuning.py
+# OCR 추론 스레드 수 / CPU 코어 고정과, 이 컴퓨터에 맞는 설정을 고르는 자동 조정.
+# 공용 PC에서 OCR 추론이 모든 코어를 차지하면 Qt UI 스레드와 오디오 피더 스레드가 CPU를 늦게 받아
+# 화면이 끊기고 오디오가 비는 일이 생기므로, 자동 조정은 OCR 속도와 함께 OCR 중 다른 스레드의 지연(jitter)을 잽니다.
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TUNING_FILE = os.path.join(BASE_DIR, 'result', 'ocr_threads.json')
+# 지연 측정 스레드가 깨어나는 간격. 오디오 피더(playback.SegmentPlayer)의 폴링 간격보다 짧게
+PROBE_INTERVAL = 0.005
+# 이보다 큰 지연(p95)을 만드는 설정은 더 빨라도 고르지 않음
+DEFAULT_JITTER_BUDGET_MS = 8.0
+
+_warned = False
+
+
+#-----------------------------------------
+# 코어 고정 (현재 스레드 기준)
+#-----------------------------------------
+# 고정은 호출한 스레드에만 적용되며, 그 스레드가 이후에 만드는 추론 스레드(OpenMP 등)도 같은 코어를 물려받습니다.
+# UI/오디오 스레드는 고정하지 않으므로 나머지 코어를 사용할 수 있습니다. (macOS는 코어 고정 API가 없어 스레드 수만 적용)
+def available_cores():
+    """이 프로세스가 사용할 수 있는 CPU 코어 번호 목록."""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _win_kernel32():
+    import ctypes
+    from ctypes import wintypes
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.GetCurrentThread.restype = wintypes.HANDLE
+    kernel32.SetThreadAffinityMask.argtypes = [wintypes.HANDLE, ctypes.c_size_t]
+    kernel32.SetThreadAffinityMask.restype = ctypes.c_size_t
+    return kernel32
+
+
+def set_thread_affinity(cores):
+    """
+    현재 스레드를 cores에 고정하고 이전 코어 목록을 반환합니다.
+    지원하지 않는 플랫폼이거나 실패하면 None을 반환합니다. (이전 목록을 다시 넘기면 원래대로 복원)
+    """
+    global _warned
+    cores = sorted(set(cores))
+    try:
+        if hasattr(os, 'sched_setaffinity'):
+            previous = sorted(os.sched_getaffinity(0))
+            os.sched_setaffinity(0, cores)
+            return previous
+        if sys.platform == 'win32':
+            kernel32 = _win_kernel32()
+            previous = kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), sum(1 << c for c in cores))
+            if previous:
+                return [c for c in range(previous.bit_length()) if previous >> c & 1]
+            return None
+    except (OSError, ValueError) as e:
+        print(f"[CPU] 코어 고정 실패 ({cores}): {e}")
+        return None
+    if not _warned:
+        _warned = True
+        print(f"[CPU] 이 플랫폼({sys.platform})은 코어 고정을 지원하지 않아 스레드 수만 적용합니다.")
+    return None
+
+
+@contextmanager
+def pinned(cores):
+    """with 블록 동안 현재 스레드를 cores에 고정합니다. (cores가 비어 있으면 아무것도 하지 않음)"""
+    previous = set_thread_affinity(cores) if cores else None
+    try:
+        yield
+    finally:
+        if previous is not None:
+            set_thread_affinity(previous)
+
+
+#-----------------------------------------
+# UI/오디오 지연 측정
+#-----------------------------------------
+class JitterProbe:
+    """
+    interval마다 깨어나는 스레드로, 예정보다 늦게 깨어난 시간(ms)을 기록합니다.
+    Qt 이벤트 루프의 타이머와 오디오 피더가 OCR 중에 CPU(및 GIL)를 얼마나 늦게 받는지의 근사치입니다.
+    """
+
+    def __init__(self, interval=PROBE_INTERVAL):
+        self.interval = interval
+        self._samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="jitter-probe", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        deadline = time.perf_counter() + self.interval
+        while not self._stop.is_set():
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+            now = time.perf_counter()
+            self._samples.append((now - deadline) * 1000)
+            deadline = max(deadline + self.interval, now)
+
+    def reset(self):
+        self._samples = []
+
+    def stats(self):
+        samples = sorted(self._samples)
+        if not samples:
+            return {'jitter_p95_ms': None, 'jitter_max_ms': None}
+        return {
+            'jitter_p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+            'jitter_max_ms': round(samples[-1], 2),
+        }
+
+
+#-----------------------------------------
+# 자동 조정
+#-----------------------------------------
+def candidate_settings(cores=None):
+    """측정할 (스레드 수, 코어) 조합. threads 0은 엔진 기본값, cores None은 고정 안 함."""
+    cores = sorted(cores or available_cores())
+    n = len(cores)
+    settings = [{'threads': 0, 'cores': None}]
+    for threads in sorted({n, n - 1, n // 2, n // 4} - {0}, reverse=True):
+        settings.append({'threads': threads, 'cores': None})
+    if n >= 4:
+        # 앞쪽 코어를 UI/오디오용으로 비워 두고 나머지에 고정
+        for reserved in (1, n // 2):
+            rest = cores[reserved:]
+            settings.append({'threads': len(rest), 'cores': rest})
+    return settings
+
+
+def measure_setting(make_ocr, setting, images, repeat=2):
+    """
+    setting으로 OCR을 만들어 images를 repeat번 인식하며, 그동안의 페이지 지연 시간과 다른 스레드의 지연을 잽니다.
+    OCR은 setting['cores']에 고정된 별도 스레드에서, 지연 측정 스레드는 고정 없이 실행됩니다.
+    """
+    result = {'threads': setting['threads'], 'cores': setting['cores']}
+    latencies = []
+    error = []
+
+    with JitterProbe() as probe:
+        def _run():
+            try:
+                with pinned(setting['cores']):
+                    ocr = make_ocr(setting['threads'])
+                    ocr.ocr(images[0])   # 워밍업 (모델 로드/추론 스레드 생성은 측정에서 제외)
+                    probe.reset()
+                    for _ in range(repeat):
+                        for image in images:
+                            t0 = time.perf_counter()
+                            ocr.ocr(image)
+                            latencies.append((time.perf_counter() - t0) * 1000)
+            except Exception as e:
+                error.append(e)
+
+        worker = threading.Thread(target=_run, name="ocr-tune")
+        worker.start()
+        worker.join()
+        jitter = probe.stats()
+    if error:
+        raise error[0]
+    result['page_ms_p50'] = round(statistics.median(latencies), 1)
+    result.update(jitter)
+    return result
+
+
+def choose(results, jitter_budget_ms):
+    """지연이 예산 이하인 설정 중 가장 빠른 것. 없으면 지연이 가장 작은 것."""
+    passing = [r for r in results if r['jitter_p95_ms'] is not None and r['jitter_p95_ms'] <= jitter_budget_ms]
+    if passing:
+        return min(passing, key=lambda r: r['page_ms_p50'])
+    return min(results, key=lambda r: r['jitter_p95_ms'] or 0.0) if results else None
+
+
+def tuning_key(engine, profile):
+    """저장된 조정 결과를 다시 써도 되는 조건 (엔진, 프로필, 사용 가능한 코어 수)."""
+    return f"{engine}/{profile}/{len(available_cores())}"
+
+
+def load_tuned(key, path=TUNING_FILE):
+    """key에 해당하는 저장된 최적 설정 (없으면 None)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if report.get('key') != key or not report.get('best'):
+        return None
+    return {'threads': report['best']['threads'], 'cores': report['best']['cores']}
+
+
+def autotune(make_ocr, images, key, jitter_budget_ms=DEFAULT_JITTER_BUDGET_MS, settings=None, repeat=2,
+             output=TUNING_FILE):
+    """
+    make_ocr(threads)로 만든 OCR을 설정마다 측정해 가장 좋은 설정을 고르고 output에 저장합니다.
+    반환값은 보고서 dict이며, report['best']가 고른 설정입니다. (모두 실패하면 None)
+    """
+    with JitterProbe() as probe:
+        time.sleep(0.5)
+        idle = probe.stats()
+    print(f"[CPU] OCR 스레드 자동 조정 시작 (유휴 지연 p95 {idle['jitter_p95_ms']}ms, 예산 {jitter_budget_ms}ms)")
+
+    results = []
+    for setting in settings or candidate_settings():
+        try:
+            result = measure_setting(make_ocr, setting, images, repeat)
+        except Exception as e:
+            print(f"[ERROR] 스레드 {setting['threads']} / 코어 {setting['cores']} 측정 실패: {e}")
+            continue
+        results.append(result)
+        print(f"[CPU] 스레드 {result['threads'] or '기본':>4} 코어 {str(result['cores'] or '전체'):<16} "
+              f"페이지 p50 {result['page_ms_p50']:8.1f}ms  지연 p95 {result['jitter_p95_ms']}ms "
+              f"최대 {result['jitter_max_ms']}ms")
+
+    best = choose(results, jitter_budget_ms)
+    report = {
+        'key': key,
+        'machine': {
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cores': available_cores(),
+        },
+        'jitter_budget_ms': jitter_budget_ms,
+        'idle': idle,
+        'results': results,
+        'best': {'threads': best['threads'], 'cores': best['cores']} if best else None,
+    }
+    if output and best:
+        try:
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            with open(output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"[ERROR] 자동 조정 결과 저장 실패: {e}")
+    return report
@@ -0,0 +1,112 @@
+import numpy as np
+from cache import LineRecognitionCache
+import tracing
+
+#-----------------------------------------
+# 줄 단위 캐시를 쓰는 OCR (검출 → 줄 자르기 → 새 줄만 인식)
+#-----------------------------------------
+# PaddleOCR 파이프라인을 검출/인식 모듈로 나눠 직접 실행합니다.
+# 검출은 매 페이지 수행하지만, 인식은 처음 보는 줄 이미지에 대해서만 수행하므로
+# 페이지에서 바뀌지 않은 부분의 비율만큼 OCR 시간이 줄어듭니다.
+
+# PaddleOCR(lang='korean')이 사용하는 기본 모델과 동일
+DEFAULT_DET_MODEL = "PP-OCRv5_server_det"
+DEFAULT_REC_MODEL = "korean_PP-OCRv5_mobile_rec"
+# 같은 줄로 볼 세로 위치 차이 (px)
+SAME_LINE_TOLERANCE = 10
+
+
+def sort_boxes(polys):
+    """검출 박스를 위→아래, 같은 줄은 왼쪽→오른쪽 순서로 정렬합니다. (PaddleOCR sorted_boxes와 동일한 규칙)"""
+    order = sorted(range(len(polys)), key=lambda i: (polys[i][0][1], polys[i][0][0]))
+    for i in range(len(order) - 1):
+        for j in range(i, -1, -1):
+            a, b = polys[order[j]], polys[order[j + 1]]
+            if abs(b[0][1] - a[0][1]) < SAME_LINE_TOLERANCE and b[0][0] < a[0][0]:
+                order[j], order[j + 1] = order[j + 1], order[j]
+            else:
+                break
+    return order
+
+
+def crop_line(image, poly):
+    """사각형 검출 영역을 원근 변환으로 펴서 잘라냅니다. 세로로 긴 줄은 90도 회전합니다."""
+    import cv2
+    pts = np.asarray(poly, dtype=np.float32)
+    width = int(max(np.linalg.norm(pts[0] - pts[1]), np.linalg.norm(pts[2] - pts[3])))
+    height = int(max(np.linalg.norm(pts[0] - pts[3]), np.linalg.norm(pts[1] - pts[2])))
+    width, height = max(width, 1), max(height, 1)
+    dst = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+    matrix = cv2.getPerspectiveTransform(pts, dst)
+    crop = cv2.warpPerspective(image, matrix, (width, height),
+                               borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC)
+    if height / width >= 1.5:
+        crop = np.rot90(crop)
+    return np.ascontiguousarray(crop)
+
+
+class LineCachedOCR:
+    """
+    PaddleOCR과 같은 ocr(image) 인터페이스를 제공하는 줄 단위 캐시 OCR.
+    결과는 PaddleOCR 3.x 형식([{'rec_texts': [...]}])으로 반환합니다.
+    """
+
+    def __init__(self, det_model=DEFAULT_DET_MODEL, rec_model=DEFAULT_REC_MODEL,
+                 cache_size=4096, rec_batch_size=8, det_kwargs=None, detector=None, recognizer=None, **kwargs):
+        # detector/recognizer를 직접 넘기면 PaddleOCR 모듈 대신 사용 (같은 predict 인터페이스, ocr_engines 참고)
+        if detector is None or recognizer is None:
+            from paddleocr import TextDetection, TextRecognition
+        # det_kwargs: 검출기에만 넘기는 옵션 (limit_side_len 등, ocr_profiles 참고)
+        self.detector = detector or TextDetection(model_name=det_model, **(det_kwargs or {}), **kwargs)
+        self.recognizer = recognizer or TextRecognition(model_name=rec_model, **kwargs)
+        self.rec_batch_size = rec_batch_size
+        self.cache = LineRecognitionCache(max_entries=cache_size)
+        self.last_stats = {}
+
+    def ocr(self, image):
+        return self.ocr_batch([image])[0]
+
+    def ocr_batch(self, images):
+        """
+        여러 이미지를 한 번에 처리합니다. 검출은 이미지 목록을 한 번에 넘기고,
+        모든 이미지에서 처음 보는 줄을 모아 인식기를 한 번만 호출합니다.
+        이미지마다 ocr(image)와 같은 형식의 결과를 담은 목록을 반환합니다.
+        """
+        pages = []   # 이미지별 (정렬된 polys, crops)
+        with tracing.span('ocr_detect', images=len(images)):
+            for image, det in zip(images, self.detector.predict(images)):
+                polys = [np.asarray(p).tolist() for p in det['dt_polys']]
+                order = sort_boxes(polys)
+                pages.append(([polys[i] for i in order], [crop_line(image, polys[i]) for i in order]))
+
+        results, keys, missing = [], [], []   # missing: (이미지 번호, 줄 번호)
+        for page_idx, (_polys, crops) in enumerate(pages):
+            page_keys = [LineRecognitionCache.make_key(c) for c in crops]
+            page_results = [None] * len(crops)
+            for line_idx, key in enumerate(page_keys):
+                cached = self.cache.get(key)
+                if cached is None:
+                    missing.append((page_idx, line_idx))
+                else:
+                    page_results[line_idx] = cached
+            keys.append(page_keys)
+            results.append(page_results)
+
+        if missing:
+            # 처음 보는 줄만 한꺼번에 인식
+            with tracing.span('ocr_recognize', lines=len(missing)):
+                outputs = self.recognizer.predict([pages[p][1][l] for p, l in missing], batch_size=self.rec_batch_size)
+            for (page_idx, line_idx), out in zip(missing, outputs):
+                result = (out['rec_text'], float(out['rec_score']))
+                results[page_idx][line_idx] = result
+                self.cache.put(keys[page_idx][line_idx], result)
+
+        lines = sum(len(crops) for _polys, crops in pages)
+        self.last_stats = {'lines': lines, 'recognized': len(missing), 'reused': lines - len(missing)}
+        tracing.incr('line_cache_hit', lines - len(missing))
+        tracing.incr('line_cache_miss', len(missing))
+        return [[{
+            'rec_texts': [text for text, _score in page_results if text],
+            'rec_scores': [score for text, score in page_results if text],
+            'dt_polys': polys,
+        }] for (polys, _crops), page_results in zip(pages, results)]
@@ -1,9 +1,14 @@
 # main.py
 import sys
+import time
+_LAUNCH_T0 = time.perf_counter()  # 시작 시간 보고서의 기준점 (import 전)
+
 from PyQt5.QtWidgets import QApplication, QDesktopWidget
-from PyQt5.QtCore import QThread, pyqtSignal, QObject, QCoreApplication
+from PyQt5.QtCore import QThread, pyqtSignal, QObject
+# toolbar/combined는 PaddleOCR·pygame·NumPy 등을 불러오지 않으므로 가볍고, 무거운 모듈은 초기화 워커에서 로드됨
+# (import 시간 확인: python -m benchmarks.bench_import)
 from toolbar import ToolBar, ProcessingOverlay
-from combined import initialize_components
+from combined import initialize_components, startup_milestone, set_startup_origin, STARTUP_COMPONENTS
 
 # -------------------------------
 # 초기화 작업 워커 (별도 스레드)
@@ -11,10 +16,17 @@ from combined import initialize_components
 class Worker(QObject):
     finished = pyqtSignal()
     progress_updated = pyqtSignal(int, str)  # (진행률, 메시지)
+    component_ready = pyqtSignal(str)        # 구성 요소 이름 ('pygame', 'tts', 'ocr')
+    component_failed = pyqtSignal(str, str)  # (구성 요소 이름, 오류 메시지)
+
+    def __init__(self, components=None):
+        super().__init__()
+        self.components = components         # None이면 전체, 재시도 때는 실패한 구성 요소만
 
     def run(self):
-        # initialize_components가 진행률/메시지를 계속 올려줌
-        initialize_components(self.progress_updated)
+        # initialize_components가 실제 완료된 단계마다 진행률/메시지를 올려줌
+        initialize_components(self.progress_updated, self.component_ready, components=self.components,
+                              component_failed=self.component_failed)
         self.finished.emit()
 
 # -------------------------------
@@ -28,34 +40,57 @@ def center_widget(widget):
 
 # 전역 툴바 핸들(가비지 컬렉션 방지)
 global_toolbar = None
+# 실행 중인 초기화 스레드/워커 (가비지 컬렉션 방지, 종료 시 대기)
+init_threads = []
+
+def start_init_worker(components=None):
+    """초기화 워커와 스레드를 만들어 (워커, 스레드)를 반환합니다. (준비/실패는 툴바로 전달, 시작은 호출한 쪽에서)"""
+    thread = QThread()
+    worker = Worker(components)
+    worker.moveToThread(thread)
+    worker.component_ready.connect(global_toolbar.set_component_ready)
+    worker.component_failed.connect(global_toolbar.set_component_failed)
+
+    # 스레드 생명주기 연결
+    thread.started.connect(worker.run)
+    worker.finished.connect(thread.quit)
+    worker.finished.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    thread.finished.connect(lambda: init_threads.remove((thread, worker)))
+    init_threads.append((thread, worker))
+    return worker, thread
 
-def show_toolbar_and_cleanup(overlay: ProcessingOverlay):
-    """초기화 완료 → 오버레이 닫고 툴바 표시"""
-    global global_toolbar
+def cleanup_overlay(overlay: ProcessingOverlay):
+    """초기화 완료 → 오버레이 닫기 (툴바는 이미 표시됨)"""
     overlay.hide()
     overlay.deleteLater()
 
-    global_toolbar = ToolBar()
-    global_toolbar.show()
-
 # -------------------------------
 # 엔트리 포인트
 # -------------------------------
 if __name__ == "__main__":
+    set_startup_origin(_LAUNCH_T0)
+    startup_milestone('imports_done')
     app = QApplication(sys.argv)
 
+    # ✅ 툴바는 바로 표시하고, 캡처 버튼은 필요한 구성 요소가 준비되는 순간 활성화
+    global_toolbar = ToolBar(pending_components=STARTUP_COMPONENTS)
+    global_toolbar.show()
+    startup_milestone('toolbar_shown')
+
     # ✅ 캡처/연속읽기 때 쓰는 ProcessingOverlay를 그대로 사용
     overlay = ProcessingOverlay(None, text="0% 완료")
     # 퍼센트 진행바로 사용(0~100)
     overlay.bar.setRange(0, 100)
     overlay.bar.setValue(0)
-    center_widget(overlay)
+    overlay.popup_near(global_toolbar)
     overlay.show()
+    # 초기화 스레드가 무거운 모듈을 불러오며 GIL을 잡기 전에 툴바/오버레이를 먼저 그림
+    app.processEvents()
+    startup_milestone('overlay_shown')
 
     # 초기화 워커/스레드
-    thread = QThread()
-    worker = Worker()
-    worker.moveToThread(thread)
+    worker, thread = start_init_worker()
 
     # 진행률을 예쁜 오버레이에 업데이트 (퍼센트 + 메시지)
     def _on_progress(v, msg):
@@ -66,25 +101,20 @@ if __name__ == "__main__":
         overlay.bar.setValue(v)
         overlay.set_text(f"{v}% 완료" + (f" — {msg}" if msg else ""))
 
-        # UI 즉시 갱신 (초기 로딩 중에도 부드럽게)
-        QCoreApplication.processEvents()
-
     worker.progress_updated.connect(_on_progress)
 
-    # 완료 시: 오버레이 닫고 툴바 띄우기
-    worker.finished.connect(lambda: show_toolbar_and_cleanup(overlay))
+    # 완료 시: 오버레이 닫기
+    worker.finished.connect(lambda: cleanup_overlay(overlay))
 
-    # 스레드 생명주기 연결
-    thread.started.connect(worker.run)
-    worker.finished.connect(thread.quit)
-    worker.finished.connect(worker.deleteLater)
-    thread.finished.connect(thread.deleteLater)
+    # 초기화에 실패한 구성 요소 다시 시도 (툴바의 재시도 요청마다 해당 구성 요소만 초기화)
+    global_toolbar.retry_requested.connect(lambda name: start_init_worker((name,))[1].start())
 
     # 앱 종료 직전, 남은 초기화 스레드 안전 종료
     def _ensure_init_thread_stopped():
-        if thread.isRunning():
-            thread.quit()
-            thread.wait(5000)  # 최대 5초 대기
+        for t, _w in list(init_threads):
+            if t.isRunning():
+                t.quit()
+                t.wait(5000)  # 최대 5초 대기
     app.aboutToQuit.connect(_ensure_init_thread_stopped)
 
     thread.start()
@@ -0,0 +1,435 @@
+# ocr_engines.py
+# OCR 추론 엔진. 앱(run_pipeline/recognize_text)은 엔진과 상관없이 같은 인터페이스만 사용합니다.
+#   ocr(image)          -> [{'rec_texts': [...], 'rec_scores': [...], 'dt_polys': [...]}]  (PaddleOCR 3.x 형식)
+#   ocr_batch(images)   -> 이미지별 ocr(image) 결과 목록 (선택)
+#
+#   'paddle'            : PaddlePaddle 추론 (기존 방식, LineCachedOCR 또는 PaddleOCR 파이프라인)
+#   'onnxruntime'       : 같은 모델을 ONNX로 내보내 ONNX Runtime(CPU)으로 추론
+#   'openvino'          : 같은 ONNX 모델을 OpenVINO(CPU)로 추론
+#   '<런타임>-int8'     : int8로 양자화한 ONNX 모델 사용
+# ONNX 엔진은 검출/인식 모델만 바꾸고 줄 정렬/자르기/줄 캐시는 LineCachedOCR을 그대로 쓰므로 결과 형식이 같습니다.
+# 엔진별 정확도/속도는 `python ocr_profiles.py calibrate --engines ...`로 같은 샘플과 기준에서 비교합니다.
+#
+#   python ocr_engines.py list
+#   python ocr_engines.py export [--profiles accurate] [--int8]
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+
+import ocr_profiles
+
+ENGINES = ('paddle', 'onnxruntime', 'onnxruntime-int8', 'openvino', 'openvino-int8')
+DEFAULT_ENGINE = 'paddle'
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ONNX_MODEL_DIR = os.path.join(BASE_DIR, 'models', 'onnx')
+# PaddleOCR(PaddleX)가 내려받은 모델 위치
+PADDLE_MODEL_DIR = os.path.join(
+    os.environ.get('PADDLE_PDX_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.paddlex')), 'official_models')
+
+
+def resolve_engine(name):
+    """
+    엔진 이름을 확정합니다. 'auto'면 보정 결과 파일의 추천 엔진(없으면 DEFAULT_ENGINE)을 씁니다.
+    """
+    if name == 'auto':
+        try:
+            with open(ocr_profiles.CALIBRATION_FILE, 'r', encoding='utf-8') as f:
+                recommended = json.load(f).get('recommended_engine')
+            if recommended in ENGINES:
+                return recommended
+        except (OSError, ValueError):
+            pass
+        return DEFAULT_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"알 수 없는 OCR 엔진: {name} (사용 가능: auto, {', '.join(ENGINES)})")
+    return name
+
+
+def _split_engine(name):
+    """'openvino-int8' -> ('openvino', True)"""
+    runtime, _, variant = name.partition('-')
+    return runtime, variant == 'int8'
+
+
+def model_path(model_name, int8=False, model_dir=ONNX_MODEL_DIR):
+    return os.path.join(model_dir, model_name + ('.int8' if int8 else '') + '.onnx')
+
+
+def dict_path(model_name, model_dir=ONNX_MODEL_DIR):
+    return os.path.join(model_dir, model_name + '.dict.txt')
+
+
+#-----------------------------------------
+# 런타임
+#-----------------------------------------
+class _Session:
+    """
+    ONNX 모델 하나를 ONNX Runtime 또는 OpenVINO로 실행합니다. (입력 1개, 첫 출력만 사용)
+    threads가 0이면 런타임 기본 스레드 수를 사용합니다.
+    """
+
+    def __init__(self, path, runtime, threads=0):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"ONNX 모델이 없습니다: {path} (`python ocr_engines.py export`로 생성)")
+        self.runtime = runtime
+        if runtime == 'openvino':
+            import openvino as ov
+            config = {'INFERENCE_NUM_THREADS': threads} if threads else {}
+            model = ov.Core().compile_model(path, 'CPU', config)
+            output = model.output(0)
+            self._run = lambda x: model(x)[output]
+        elif runtime == 'onnxruntime':
+            import onnxruntime as ort
+            options = ort.SessionOptions()
+            if threads:
+                options.intra_op_num_threads = threads
+            session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+            input_name = session.get_inputs()[0].name
+            self._run = lambda x: session.run(None, {input_name: x})[0]
+        else:
+            raise ValueError(f"알 수 없는 런타임: {runtime}")
+
+    def __call__(self, x):
+        return np.asarray(self._run(x))
+
+
+#-----------------------------------------
+# 검출 (DB) — paddleocr.TextDetection과 같은 전/후처리
+#-----------------------------------------
+class OnnxTextDetection:
+    """PP-OCR 검출 모델의 ONNX 실행기. predict(images) -> [{'dt_polys': (N, 4, 2) 배열}]"""
+
+    MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+    STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+    def __init__(self, path, runtime, limit_side_len=64, limit_type='min', max_side_limit=4000,
+                 thresh=0.3, box_thresh=0.6, unclip_ratio=1.5, max_candidates=1000, min_size=3, threads=0):
+        self.session = _Session(path, runtime, threads)
+        self.limit_side_len = limit_side_len
+        self.limit_type = limit_type
+        self.max_side_limit = max_side_limit
+        self.thresh = thresh
+        self.box_thresh = box_thresh
+        self.unclip_ratio = unclip_ratio
+        self.max_candidates = max_candidates
+        self.min_size = min_size
+
+    def predict(self, images):
+        results = []
+        for image in images:
+            tensor = self._preprocess(image)
+            pred = self.session(tensor)[0, 0]
+            results.append({'dt_polys': self._boxes(pred, image.shape[1], image.shape[0])})
+        return results
+
+    def _preprocess(self, image):
+        import cv2
+        h, w = image.shape[:2]
+        ratio = 1.0
+        if self.limit_type == 'max' and max(h, w) > self.limit_side_len:
+            ratio = self.limit_side_len / max(h, w)
+        elif self.limit_type == 'min' and min(h, w) < self.limit_side_len:
+            ratio = self.limit_side_len / min(h, w)
+        if max(h, w) * ratio > self.max_side_limit:
+            ratio = self.max_side_limit / max(h, w)
+        # 모델 입력은 32의 배수
+        rh = max(int(round(h * ratio / 32) * 32), 32)
+        rw = max(int(round(w * ratio / 32) * 32), 32)
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        resized = cv2.resize(image, (rw, rh)).astype(np.float32) / 255.0
+        resized = (resized - self.MEAN) / self.STD
+        return np.ascontiguousarray(resized.transpose(2, 0, 1)[np.newaxis])
+
+    def _boxes(self, pred, dest_w, dest_h):
+        import cv2
+        height, width = pred.shape
+        bitmap = (pred > self.thresh).astype(np.uint8) * 255
+        contours, _ = cv2.findContours(bitmap, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+        boxes = []
+        for contour in contours[:self.max_candidates]:
+            box, sside = _mini_box(contour)
+            if sside < self.min_size:
+                continue
+            if _box_score(pred, box) < self.box_thresh:
+                continue
+            expanded = _unclip(box, self.unclip_ratio)
+            if expanded is None:
+                continue
+            box, sside = _mini_box(expanded.reshape(-1, 1, 2))
+            if sside < self.min_size + 2:
+                continue
+            box[:, 0] = np.clip(np.round(box[:, 0] / width * dest_w), 0, dest_w)
+            box[:, 1] = np.clip(np.round(box[:, 1] / height * dest_h), 0, dest_h)
+            boxes.append(box.astype(np.int16))
+        return np.array(boxes).reshape(-1, 4, 2)
+
+
+def _mini_box(contour):
+    """윤곽선을 감싸는 최소 회전 사각형 (왼쪽 위부터 시계 방향)과 짧은 변 길이."""
+    import cv2
+    rect = cv2.minAreaRect(contour)
+    pts = sorted(cv2.boxPoints(rect).tolist(), key=lambda p: p[0])
+    i1, i4 = (0, 1) if pts[1][1] > pts[0][1] else (1, 0)
+    i2, i3 = (2, 3) if pts[3][1] > pts[2][1] else (3, 2)
+    return np.array([pts[i1], pts[i2], pts[i3], pts[i4]], dtype=np.float32), min(rect[1])
+
+
+def _box_score(pred, box):
+    """박스 안 확률 맵의 평균."""
+    import cv2
+    h, w = pred.shape
+    xmin = int(np.clip(np.floor(box[:, 0].min()), 0, w - 1))
+    xmax = int(np.clip(np.ceil(box[:, 0].max()), 0, w - 1))
+    ymin = int(np.clip(np.floor(box[:, 1].min()), 0, h - 1))
+    ymax = int(np.clip(np.ceil(box[:, 1].max()), 0, h - 1))
+    mask = np.zeros((ymax - ymin + 1, xmax - xmin + 1), dtype=np.uint8)
+    local = box - np.array([xmin, ymin], dtype=np.float32)
+    cv2.fillPoly(mask, local.reshape(1, -1, 2).astype(np.int32), 1)
+    return cv2.mean(pred[ymin:ymax + 1, xmin:xmax + 1], mask)[0]
+
+
+def _unclip(box, ratio):
+    """글자 영역만 잡힌 박스를 (넓이 * ratio / 둘레)만큼 바깥으로 넓힙니다."""
+    import pyclipper
+    x, y = box[:, 0], box[:, 1]
+    area = 0.5 * abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+    length = np.linalg.norm(box - np.roll(box, 1, axis=0), axis=1).sum()
+    if length == 0:
+        return None
+    offset = pyclipper.PyclipperOffset()
+    offset.AddPath(box.tolist(), pyclipper.JT_ROUND, pyclipper.ET_CLOSEDPOLYGON)
+    expanded = offset.Execute(area * ratio / length)
+    if len(expanded) != 1:
+        return None
+    return np.array(expanded[0], dtype=np.float32)
+
+
+#-----------------------------------------
+# 인식 (CTC) — paddleocr.TextRecognition과 같은 전/후처리
+#-----------------------------------------
+class OnnxTextRecognition:
+    """PP-OCR 인식 모델의 ONNX 실행기. predict(crops, batch_size) -> [{'rec_text', 'rec_score'}]"""
+
+    HEIGHT = 48
+    MIN_WIDTH = 320
+
+    def __init__(self, path, dict_file, runtime, threads=0):
+        self.session = _Session(path, runtime, threads)
+        with open(dict_file, 'r', encoding='utf-8') as f:
+            chars = [line.rstrip('\r\n') for line in f]
+        # CTC blank(0) + 사전 + 띄어쓰기 (PaddleOCR use_space_char=True)
+        self.characters = [''] + chars + [' ']
+
+    def predict(self, crops, batch_size=8):
+        results = [None] * len(crops)
+        # 비슷한 폭끼리 묶어 패딩 낭비를 줄임
+        order = sorted(range(len(crops)), key=lambda i: crops[i].shape[1] / max(crops[i].shape[0], 1))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            probs = self.session(self._preprocess([crops[i] for i in batch]))
+            for i, row in zip(batch, probs):
+                results[i] = self._decode(row)
+        return results
+
+    def _preprocess(self, crops):
+        import cv2
+        max_ratio = max([self.MIN_WIDTH / self.HEIGHT] + [c.shape[1] / max(c.shape[0], 1) for c in crops])
+        width = int(self.HEIGHT * max_ratio)
+        batch = np.zeros((len(crops), 3, self.HEIGHT, width), dtype=np.float32)
+        for n, crop in enumerate(crops):
+            if crop.ndim == 2:
+                crop = cv2.cvtColor(crop, cv2.COLOR_GRAY2BGR)
+            h, w = crop.shape[:2]
+            resized_w = min(width, int(math.ceil(self.HEIGHT * w / max(h, 1))))
+            resized = cv2.resize(crop, (max(resized_w, 1), self.HEIGHT)).astype(np.float32)
+            batch[n, :, :, :resized.shape[1]] = ((resized / 255.0 - 0.5) / 0.5).transpose(2, 0, 1)
+        return batch
+
+    def _decode(self, probs):
+        indices = probs.argmax(axis=1)
+        scores = probs.max(axis=1)
+        keep = indices != 0
+        keep[1:] &= indices[1:] != indices[:-1]   # 연속 중복 제거
+        text = "".join(self.characters[i] for i in indices[keep] if i < len(self.characters))
+        score = float(scores[keep].mean()) if keep.any() else 0.0
+        return {'rec_text': text, 'rec_score': score}
+
+
+#-----------------------------------------
+# 엔진 생성
+#-----------------------------------------
+def create_engine(engine, profile, line_cache=True, cache_size=4096, model_dir=ONNX_MODEL_DIR, cpu_threads=0):
+    """
+    engine(ENGINES 중 하나)과 프로필 설정(ocr_profiles.PROFILES의 값)으로 OCR 객체를 만듭니다.
+    cpu_threads는 추론 스레드 수이며 0이면 엔진 기본값을 사용합니다. (cpu_tuning 참고)
+    ONNX 엔진은 모델 파일이 없거나 런타임이 설치되지 않았으면 FileNotFoundError / ImportError를 냅니다.
+    """
+    from line_ocr import LineCachedOCR
+    if engine == 'paddle':
+        kwargs = {'cpu_threads': cpu_threads} if cpu_threads else {}
+        if line_cache:
+            return LineCachedOCR(det_model=profile['det_model'], rec_model=profile['rec_model'],
+                                 cache_size=cache_size, det_kwargs=ocr_profiles.detection_kwargs(profile), **kwargs)
+        from paddleocr import PaddleOCR
+        return PaddleOCR(
+            use_textline_orientation=False,
+            use_doc_orientation_classify=False,
+            use_doc_unwarping=False,
+            lang='korean',
+            **ocr_profiles.pipeline_kwargs(profile),
+            **kwargs
+        )
+    runtime, int8 = _split_engine(engine)
+    detector = OnnxTextDetection(model_path(profile['det_model'], int8, model_dir), runtime,
+                                 threads=cpu_threads, **ocr_profiles.detection_kwargs(profile))
+    recognizer = OnnxTextRecognition(model_path(profile['rec_model'], int8, model_dir),
+                                     dict_path(profile['rec_model'], model_dir), runtime, threads=cpu_threads)
+    # 줄 정렬/자르기는 LineCachedOCR을 그대로 사용 (줄 캐시를 끄면 크기 0)
+    return LineCachedOCR(detector=detector, recognizer=recognizer, cache_size=cache_size if line_cache else 0)
+
+
+#-----------------------------------------
+# 모델 내보내기 (PaddlePaddle → ONNX, 선택적으로 int8)
+#-----------------------------------------
+def _paddle_model_dir(model_name):
+    """PaddleX가 내려받은 추론 모델 디렉터리. 없으면 한 번 로드해 내려받습니다."""
+    path = os.path.join(PADDLE_MODEL_DIR, model_name)
+    if not os.path.isdir(path):
+        from paddleocr import TextDetection, TextRecognition
+        module = TextRecognition if model_name.endswith('_rec') else TextDetection
+        print(f"[Export] {model_name} 내려받는 중…")
+        module(model_name=model_name)
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"PaddleOCR 모델 디렉터리를 찾을 수 없습니다: {path}")
+    return path
+
+
+def _export_onnx(model_name, out_dir):
+    src = _paddle_model_dir(model_name)
+    # PaddleX 3.x는 inference.json(PIR), 예전 모델은 inference.pdmodel
+    model_file = 'inference.json' if os.path.exists(os.path.join(src, 'inference.json')) else 'inference.pdmodel'
+    dst = model_path(model_name, model_dir=out_dir)
+    cmd = [shutil.which('paddle2onnx') or 'paddle2onnx',
+           '--model_dir', src, '--model_filename', model_file, '--params_filename', 'inference.pdiparams',
+           '--save_file', dst, '--opset_version', '14', '--enable_onnx_checker', 'True']
+    subprocess.run(cmd, check=True)
+    if model_name.endswith('_rec'):
+        # 인식 결과의 글자 사전은 inference.yml에 들어 있음
+        import yaml
+        with open(os.path.join(src, 'inference.yml'), 'r', encoding='utf-8') as f:
+            chars = yaml.safe_load(f)['PostProcess']['character_dict']
+        with open(dict_path(model_name, out_dir), 'w', encoding='utf-8') as f:
+            f.write("\n".join(chars) + "\n")
+    return dst
+
+
+class _CalibrationReader:
+    """양자화 보정용 입력 (합성 페이지를 fp32 모델 전처리와 같은 방식으로 변환)."""
+
+    def __init__(self, input_name, tensors):
+        self.input_name = input_name
+        self._tensors = iter(tensors)
+
+    def get_next(self):
+        tensor = next(self._tensors, None)
+        return None if tensor is None else {self.input_name: tensor}
+
+
+def _quantize(det_name, rec_name, out_dir):
+    """
+    검출/인식 모델을 int8(QDQ, 채널별 가중치)로 정적 양자화합니다.
+    QDQ 형식은 ONNX Runtime과 OpenVINO 모두 int8 커널로 실행합니다.
+    """
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+    from line_ocr import crop_line
+    from capture import to_ocr_array
+
+    pages = [to_ocr_array(page) for _name, _text, page in ocr_profiles.load_samples()]
+    detector = OnnxTextDetection(model_path(det_name, model_dir=out_dir), 'onnxruntime')
+    det_inputs = [detector._preprocess(page) for page in pages]
+    recognizer = OnnxTextRecognition(model_path(rec_name, model_dir=out_dir), dict_path(rec_name, out_dir),
+                                     'onnxruntime')
+    rec_inputs = []
+    for page, det in zip(pages, detector.predict(pages)):
+        rec_inputs.extend(recognizer._preprocess([crop_line(page, poly)]) for poly in det['dt_polys'])
+
+    for name, tensors in ((det_name, det_inputs), (rec_name, rec_inputs)):
+        if os.path.exists(model_path(name, True, out_dir)):
+            continue   # 다른 프로필에서 이미 양자화한 모델
+        src = model_path(name, model_dir=out_dir)
+        input_name = ort.InferenceSession(src, providers=['CPUExecutionProvider']).get_inputs()[0].name
+        print(f"[Export] {name} int8 양자화 중… (보정 입력 {len(tensors)}개)")
+        quantize_static(src, model_path(name, True, out_dir), _CalibrationReader(input_name, tensors),
+                        quant_format=QuantFormat.QDQ, per_channel=True,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+
+
+def export(profiles=None, int8=False, out_dir=ONNX_MODEL_DIR):
+    """프로필들이 쓰는 검출/인식 모델을 ONNX로 내보냅니다."""
+    os.makedirs(out_dir, exist_ok=True)
+    done = set()
+    for name in profiles or ocr_profiles.PROFILES:
+        spec = ocr_profiles.PROFILES[name]
+        for model_name in (spec['det_model'], spec['rec_model']):
+            if model_name not in done:
+                print(f"[Export] {model_name} → {model_path(model_name, model_dir=out_dir)}")
+                _export_onnx(model_name, out_dir)
+                done.add(model_name)
+        # 검출/인식 모델은 프로필마다 조합이 달라 한쪽 int8 모델만 있을 수 있으므로 둘 다 확인
+        if int8 and not all(os.path.exists(model_path(m, True, out_dir)) for m in (spec['det_model'], spec['rec_model'])):
+            _quantize(spec['det_model'], spec['rec_model'], out_dir)
+
+
+#-----------------------------------------
+# 엔트리 포인트
+#-----------------------------------------
+def _available(engine, profile, model_dir=ONNX_MODEL_DIR):
+    """엔진을 지금 사용할 수 있으면 None, 아니면 이유."""
+    runtime, int8 = _split_engine(engine)
+    module = 'paddleocr' if runtime == 'paddle' else runtime
+    try:
+        __import__(module)
+    except ImportError:
+        return f"{module} 미설치"
+    if runtime != 'paddle':
+        for model_name in (profile['det_model'], profile['rec_model']):
+            if not os.path.exists(model_path(model_name, int8, model_dir)):
+                return "모델 없음 (export 필요)"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR 추론 엔진 목록 / ONNX 모델 내보내기")
+    sub = parser.add_subparsers(dest='command', required=True)
+    lst = sub.add_parser('list', help="엔진별 사용 가능 여부")
+    lst.add_argument('--profile', default=ocr_profiles.DEFAULT_PROFILE, choices=list(ocr_profiles.PROFILES))
+    exp = sub.add_parser('export', help="PaddleOCR 모델을 ONNX로 내보내기 (paddle2onnx 필요)")
+    exp.add_argument('--profiles', nargs='*', choices=list(ocr_profiles.PROFILES), help="대상 프로필 (기본: 전체)")
+    exp.add_argument('--int8', action='store_true', help="합성 페이지로 보정한 int8 모델도 생성 (onnxruntime 필요)")
+    exp.add_argument('--out', default=ONNX_MODEL_DIR, help=f"저장 폴더 (기본: {ONNX_MODEL_DIR})")
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        spec = ocr_profiles.PROFILES[args.profile]
+        for engine in ENGINES:
+            reason = _available(engine, spec)
+            print(f"{engine:<17} {'사용 가능' if reason is None else reason}")
+        return 0
+
+    export(args.profiles, args.int8, args.out)
+    print("[Export] 완료. combined.py의 OCR_ENGINE(또는 환경 변수 SNIP_OCR_ENGINE)로 엔진을 고르고, "
+          "`python ocr_profiles.py calibrate --engines paddle onnxruntime`로 정확도를 확인하세요.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
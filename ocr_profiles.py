@@ -0,0 +1,296 @@
+# ocr_profiles.py
+# OCR 모델 프로필(검출/인식 모델 조합과 검출 해상도)과, 이 컴퓨터에서 정확도 기준을 만족하는
+# 가장 빠른 프로필/추론 엔진을 골라 주는 보정 도구. 프로필은 combined.py의 OCR_PROFILE로 선택합니다.
+# 추론 엔진(ocr_engines.py)도 같은 샘플과 오류율 기준으로 측정하므로, 엔진 간 정확도 비교에도 씁니다.
+#
+#   python ocr_profiles.py list
+#   python ocr_profiles.py calibrate [--max-cer 0.03] [--profiles fast balanced accurate] [--samples 폴더] [--repeat 2]
+#                                    [--engines paddle onnxruntime openvino]
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+#-----------------------------------------
+# 프로필
+#-----------------------------------------
+# det_limit_side_len / det_limit_type: 검출 입력 크기 제한 (None이면 모델 기본값)
+#   limit_type 'max'는 긴 변을 limit_side_len 이하로 줄여 큰 캡처의 검출 시간을 줄임
+PROFILES = {
+    'fast': {
+        'description': "모바일 검출 모델 + 검출 입력 축소 (저사양 CPU, 메모리 최소)",
+        'det_model': "PP-OCRv5_mobile_det",
+        'rec_model': "korean_PP-OCRv5_mobile_rec",
+        'det_limit_side_len': 960,
+        'det_limit_type': 'max',
+    },
+    'balanced': {
+        'description': "모바일 검출 모델, 원본 해상도 검출",
+        'det_model': "PP-OCRv5_mobile_det",
+        'rec_model': "korean_PP-OCRv5_mobile_rec",
+        'det_limit_side_len': None,
+        'det_limit_type': None,
+    },
+    'accurate': {
+        'description': "서버 검출 모델 (PaddleOCR(lang='korean') 기본 구성)",
+        'det_model': "PP-OCRv5_server_det",
+        'rec_model': "korean_PP-OCRv5_mobile_rec",
+        'det_limit_side_len': None,
+        'det_limit_type': None,
+    },
+}
+DEFAULT_PROFILE = 'accurate'
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CALIBRATION_FILE = os.path.join(BASE_DIR, 'result', 'ocr_calibration.json')
+# 보정 시 허용하는 최대 문자 오류율 (CER)
+DEFAULT_MAX_CER = 0.03
+SAMPLE_DPIS = (96, 144)
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+
+
+def resolve_profile(name):
+    """
+    프로필 이름을 확정합니다. 'auto'면 보정 결과 파일의 추천 프로필(없으면 DEFAULT_PROFILE)을 씁니다.
+    """
+    if name == 'auto':
+        try:
+            with open(CALIBRATION_FILE, 'r', encoding='utf-8') as f:
+                recommended = json.load(f).get('recommended')
+            if recommended in PROFILES:
+                return recommended
+        except (OSError, ValueError):
+            pass
+        return DEFAULT_PROFILE
+    if name not in PROFILES:
+        raise ValueError(f"알 수 없는 OCR 프로필: {name} (사용 가능: auto, {', '.join(PROFILES)})")
+    return name
+
+
+def get_profile(name):
+    """프로필 이름(또는 'auto')에 해당하는 설정 dict."""
+    return PROFILES[resolve_profile(name)]
+
+
+def detection_kwargs(profile):
+    """paddleocr.TextDetection에 넘길 검출 입력 크기 옵션."""
+    kwargs = {}
+    if profile['det_limit_side_len'] is not None:
+        kwargs['limit_side_len'] = profile['det_limit_side_len']
+    if profile['det_limit_type'] is not None:
+        kwargs['limit_type'] = profile['det_limit_type']
+    return kwargs
+
+
+def pipeline_kwargs(profile):
+    """paddleocr.PaddleOCR에 넘길 모델/검출 옵션."""
+    kwargs = {
+        'text_detection_model_name': profile['det_model'],
+        'text_recognition_model_name': profile['rec_model'],
+    }
+    for key, value in detection_kwargs(profile).items():
+        kwargs['text_det_' + key] = value
+    return kwargs
+
+
+#-----------------------------------------
+# 정확도 / 메모리 측정
+#-----------------------------------------
+def _normalize(text):
+    # 줄바꿈/띄어쓰기 차이는 읽기에 영향이 없으므로 공백을 빼고 비교
+    return "".join(text.split())
+
+
+def char_error_rate(reference, hypothesis):
+    """공백을 무시한 문자 오류율 (편집 거리 / 정답 길이)."""
+    ref, hyp = _normalize(reference), _normalize(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, rc in enumerate(ref, 1):
+        cur = [i]
+        for j, hc in enumerate(hyp, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (rc != hc)))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def _rss_mb():
+    """현재 프로세스의 메모리 사용량(MB). psutil이 없으면 최대 사용량으로 대신하고, 둘 다 없으면 None."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def load_samples(samples_dir=None, dpis=SAMPLE_DPIS):
+    """
+    (이름, 정답 텍스트, 이미지) 목록. samples_dir가 없으면 benchmarks.pages의 합성 페이지를 쓰고,
+    있으면 폴더 안의 이미지와 같은 이름의 .txt(정답)를 짝지어 씁니다.
+    """
+    if samples_dir is None:
+        from benchmarks.pages import iter_pages
+        return [(name, text, page) for name, _lang, text, page in iter_pages(dpis=dpis)]
+    from capture import to_pil
+    samples = []
+    for name in sorted(os.listdir(samples_dir)):
+        stem, ext = os.path.splitext(name)
+        truth = os.path.join(samples_dir, stem + '.txt')
+        if ext.lower() in IMAGE_EXTS and os.path.exists(truth):
+            with open(truth, 'r', encoding='utf-8') as f:
+                samples.append((stem, f.read(), to_pil(os.path.join(samples_dir, name)).convert('RGB')))
+    return samples
+
+
+def measure_profile(name, samples_dir=None, dpis=SAMPLE_DPIS, repeat=2, engine='paddle'):
+    """
+    한 프로필/엔진으로 샘플을 모두 인식해 정확도/지연 시간/메모리를 측정합니다.
+    모델 메모리를 따로 재기 위해 조합마다 새 프로세스에서 실행됩니다. (calibrate 참고)
+    """
+    import combined
+    import ocr_engines
+    samples = load_samples(samples_dir, dpis)
+    # 반복 측정이 캐시에 적중하지 않도록 OCR 결과/줄 인식 캐시를 끔
+    combined.OCR_LINE_CACHE_SIZE = 0
+    combined._ocr_cache = None
+
+    rss_before = _rss_mb()
+    t0 = time.perf_counter()
+    # 사용할 수 없는 엔진이 PaddlePaddle로 대체되어 측정되지 않도록 직접 생성
+    combined.ocr = ocr_engines.create_engine(engine, PROFILES[name], line_cache=combined.OCR_LINE_CACHE,
+                                             cache_size=0, model_dir=combined.OCR_ONNX_DIR,
+                                             cpu_threads=combined.OCR_CPU_THREADS)
+    load_ms = (time.perf_counter() - t0) * 1000
+    rss_loaded = _rss_mb()
+    combined.recognize_text(samples[0][2])   # 첫 추론 워밍업
+
+    latencies, cers = [], []
+    for round_no in range(repeat):
+        for _sample, truth, image in samples:
+            t0 = time.perf_counter()
+            text = combined.recognize_text(image)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if round_no == 0:
+                cers.append(char_error_rate(truth, text))
+    rss_peak = _rss_mb()
+
+    def _mb(value):
+        return round(value, 1) if value is not None else None
+
+    return {
+        'profile': name,
+        'engine': engine,
+        'pages': len(samples),
+        'cer': round(statistics.fmean(cers), 4),
+        'cer_max': round(max(cers), 4),
+        'page_ms_p50': round(statistics.median(latencies), 1),
+        'page_ms_mean': round(statistics.fmean(latencies), 1),
+        'load_ms': round(load_ms, 1),
+        'model_mb': _mb(rss_loaded - rss_before) if rss_loaded is not None and rss_before is not None else None,
+        'peak_rss_mb': _mb(rss_peak),
+    }
+
+
+#-----------------------------------------
+# 보정
+#-----------------------------------------
+def recommend(results, max_cer):
+    """
+    오류율이 max_cer 이하인 측정 결과 중 가장 빠른 것. 없으면 오류율이 가장 낮은 것.
+    (측정 결과 dict, 결과가 없으면 None)
+    """
+    passing = [r for r in results if r['cer'] <= max_cer]
+    if passing:
+        return min(passing, key=lambda r: r['page_ms_p50'])
+    return min(results, key=lambda r: r['cer']) if results else None
+
+
+def calibrate(profiles=None, max_cer=DEFAULT_MAX_CER, samples_dir=None, dpis=SAMPLE_DPIS, repeat=2,
+              output=CALIBRATION_FILE, engines=('paddle',)):
+    """각 프로필 × 엔진을 별도 프로세스에서 측정하고, 추천 조합과 함께 output에 JSON으로 저장합니다."""
+    from concurrent.futures import ProcessPoolExecutor
+    results = []
+    for engine in engines:
+        for name in profiles or PROFILES:
+            print(f"[Calibrate] '{name}' / {engine} 측정 중… ({PROFILES[name]['description']})")
+            try:
+                # 조합마다 새 프로세스: 앞 조합의 모델이 메모리 측정에 섞이지 않음
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    result = pool.submit(measure_profile, name, samples_dir, dpis, repeat, engine).result()
+            except Exception as e:
+                print(f"[ERROR] '{name}' / {engine} 측정 실패: {e}")
+                continue
+            result['passed'] = result['cer'] <= max_cer
+            results.append(result)
+            print(f"[Calibrate] {name:<9} {engine:<17} CER {result['cer'] * 100:5.2f}%"
+                  f"{'' if result['passed'] else ' (기준 초과)'}  페이지 p50 {result['page_ms_p50']:8.1f}ms  "
+                  f"모델 {result['model_mb']}MB  최대 {result['peak_rss_mb']}MB")
+
+    report = {
+        'machine': {
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+        },
+        'max_cer': max_cer,
+        'samples': samples_dir or 'benchmarks.pages',
+        'results': results,
+    }
+    best = recommend(results, max_cer)
+    report['recommended'] = best['profile'] if best else None
+    report['recommended_engine'] = best['engine'] if best else None
+    if output:
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+#-----------------------------------------
+# 엔트리 포인트
+#-----------------------------------------
+def main(argv=None):
+    import ocr_engines
+    parser = argparse.ArgumentParser(description="OCR 모델 프로필 목록/보정")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="프로필 목록")
+    cal = sub.add_parser('calibrate', help="프로필별 정확도/속도/메모리를 측정하고 추천 프로필 저장")
+    cal.add_argument('--profiles', nargs='*', choices=list(PROFILES), help="측정할 프로필 (기본: 전체)")
+    cal.add_argument('--max-cer', type=float, default=DEFAULT_MAX_CER, help="허용 문자 오류율 (기본: 0.03)")
+    cal.add_argument('--samples', help="이미지 + 같은 이름의 .txt 정답 파일이 있는 폴더 (기본: 합성 페이지)")
+    cal.add_argument('--dpi', nargs='*', type=int, default=list(SAMPLE_DPIS), help="합성 페이지 DPI")
+    cal.add_argument('--repeat', type=int, default=2, help="샘플 반복 횟수")
+    cal.add_argument('--engines', nargs='*', default=['paddle'], choices=list(ocr_engines.ENGINES),
+                     help="측정할 추론 엔진 (기본: paddle)")
+    cal.add_argument('--json', default=CALIBRATION_FILE, help=f"결과 저장 경로 (기본: {CALIBRATION_FILE})")
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name, profile in PROFILES.items():
+            marker = " (기본)" if name == DEFAULT_PROFILE else ""
+            print(f"{name:<9} {profile['det_model']} + {profile['rec_model']}{marker}\n          {profile['description']}")
+        return 0
+
+    report = calibrate(args.profiles, args.max_cer, args.samples, tuple(args.dpi), args.repeat, args.json,
+                       args.engines)
+    if report['recommended'] is None:
+        print("[Calibrate] 측정에 성공한 프로필이 없습니다.")
+        return 1
+    print(f"[Calibrate] 추천 프로필: {report['recommended']}, 엔진: {report['recommended_engine']} (결과: {args.json})")
+    print("            combined.py에서 OCR_PROFILE / OCR_ENGINE = 'auto'로 두면 추천 조합을 사용합니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+# ocr_server.py
+# PaddleOCR 인스턴스를 미리 로드해 둔 상태로 로컬 소켓 요청을 처리하는 상주 OCR 서버.
+# 툴바(GUI)는 OcrClient로 접속하며, 서버가 없으면 직접 띄웁니다.
+# 서버는 GUI가 종료되어도 남아 있으므로 다음 실행부터는 모델 로딩 비용이 들지 않고,
+# Paddle 내부에서 충돌/멈춤이 생겨도 GUI는 살아남아 서버만 다시 띄우면 됩니다.
+import argparse
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Listener, Client
+
+#-----------------------------------------
+# 설정
+#-----------------------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+HOST = '127.0.0.1'
+DEFAULT_PORT = 50731
+# 접속 인증 키 (최초 실행 시 무작위로 생성, 사용자만 읽을 수 있게 저장)
+KEY_FILE = os.path.join(BASE_DIR, 'result', 'ocr_server.key')
+LOG_FILE = os.path.join(BASE_DIR, 'result', 'ocr_server.log')
+# 요청이 없으면 이 시간(초) 뒤 서버 종료 (0이면 계속 유지)
+DEFAULT_IDLE_TIMEOUT = 60 * 60
+# 서버를 띄운 뒤 모델 로딩 완료를 기다리는 최대 시간(초)
+STARTUP_TIMEOUT = 180
+# OCR 요청 하나의 응답을 기다리는 최대 시간(초). 넘으면 서버가 멈춘 것으로 보고 다시 띄움
+REQUEST_TIMEOUT = 120
+
+
+def _load_authkey(create=False):
+    try:
+        with open(KEY_FILE, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        if not create:
+            raise
+    os.makedirs(os.path.dirname(KEY_FILE), exist_ok=True)
+    key = secrets.token_hex(32).encode()
+    fd = os.open(KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+#-----------------------------------------
+# 서버
+#-----------------------------------------
+def serve(port=DEFAULT_PORT, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """OCR 모델을 로드하고 요청을 처리합니다. (종료될 때까지 반환하지 않음)"""
+    import combined
+    from combined import create_ocr
+    from cpu_tuning import pinned
+
+    authkey = _load_authkey(create=True)
+    listener = Listener((HOST, port), authkey=authkey)  # 포트가 사용 중이면 여기서 실패 → 이미 서버 있음
+
+    print(f"[OCR Server] 모델 로딩 중... (port {port})")
+    t0 = time.perf_counter()
+    with pinned(combined.OCR_CPU_CORES):
+        ocr = create_ocr()
+    print(f"[OCR Server] 모델 로딩 완료 ({time.perf_counter() - t0:.1f}s). 요청 대기 중.")
+
+    ocr_lock = threading.Lock()   # PaddleOCR 인스턴스는 동시에 한 요청만 처리
+    last_activity = [time.monotonic()]
+
+    def _handle(conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                last_activity[0] = time.monotonic()
+                command = request[0]
+                try:
+                    if command == 'ping':
+                        conn.send(('ok', os.getpid()))
+                    elif command == 'ocr':
+                        with ocr_lock, pinned(combined.OCR_CPU_CORES):
+                            raw = ocr.ocr(request[1])
+                        conn.send(('ok', _texts_from_raw(raw)))
+                    elif command == 'shutdown':
+                        conn.send(('ok', None))
+                        print("[OCR Server] 종료 요청 수신.")
+                        os._exit(0)
+                    else:
+                        conn.send(('error', f"알 수 없는 명령: {command}"))
+                except Exception as e:
+                    print(f"[ERROR] OCR 서버 요청 처리 실패: {e}")
+                    conn.send(('error', str(e)))
+                last_activity[0] = time.monotonic()
+
+    def _idle_watchdog():
+        while True:
+            time.sleep(30)
+            if time.monotonic() - last_activity[0] > idle_timeout:
+                print(f"[OCR Server] {idle_timeout}s 동안 요청이 없어 종료합니다.")
+                os._exit(0)
+
+    if idle_timeout > 0:
+        threading.Thread(target=_idle_watchdog, daemon=True).start()
+
+    while True:
+        conn = listener.accept()
+        threading.Thread(target=_handle, args=(conn,), daemon=True).start()
+
+
+def _texts_from_raw(raw):
+    from combined import _extract_texts
+    return list(_extract_texts(raw))
+
+
+#-----------------------------------------
+# 클라이언트
+#-----------------------------------------
+class OcrClient:
+    """
+    OCR 서버에 요청을 보내는 클라이언트. PaddleOCR과 같은 ocr(image) 메서드를 제공하므로
+    combined.ocr 자리에 그대로 넣어 쓸 수 있습니다.
+    서버가 없거나 요청 중 연결이 끊기면(서버 충돌) 서버를 다시 띄우고 한 번 재시도합니다.
+    request_timeout 안에 응답이 없으면(서버 멈춤) 서버 프로세스를 종료하고 새로 띄운 뒤 TimeoutError를 냅니다.
+    """
+
+    def __init__(self, port=DEFAULT_PORT, spawn=True, startup_timeout=STARTUP_TIMEOUT,
+                 request_timeout=REQUEST_TIMEOUT):
+        self.port = port
+        self.spawn = spawn
+        self.startup_timeout = startup_timeout
+        self.request_timeout = request_timeout
+        self._conn = None
+        self._proc = None
+        self._server_pid = None   # 접속한 서버의 pid (ping 응답)
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """서버에 접속합니다. 서버가 없으면 띄우고 모델 로딩이 끝날 때까지 기다립니다."""
+        with self._lock:
+            self._ensure_connected()
+
+    def ocr(self, image):
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    self._ensure_connected()
+                    self._conn.send(('ocr', image))
+                    responded = self._conn.poll(self.request_timeout)
+                    if responded:
+                        status, payload = self._conn.recv()
+                    break
+                except (EOFError, OSError) as e:
+                    print(f"[OCR Client] 서버 연결 끊김 ({e}). 서버 재시작 후 재시도합니다.")
+                    # 반쯤 죽은 서버가 포트를 잡고 있지 않도록 종료 (재시도 시 _ensure_connected가 새로 띄움)
+                    self._terminate_server()
+                    if attempt == 1:
+                        raise ConnectionError(f"OCR 서버가 요청 처리 중 종료되었습니다: {e}") from e
+            if not responded:
+                print(f"[OCR Client] {self.request_timeout}s 동안 응답이 없어 OCR 서버를 다시 시작합니다.")
+                self._terminate_server()
+                if self.spawn:
+                    self._spawn_server()
+                raise TimeoutError(f"OCR 서버가 {self.request_timeout}s 안에 응답하지 않았습니다. "
+                                   "서버를 다시 시작했으니 잠시 후 다시 시도하세요.")
+        if status != 'ok':
+            raise RuntimeError(f"OCR 서버 오류: {payload}")
+        # PaddleOCR 3.x 결과 형식과 맞춰 combined._extract_texts가 그대로 처리하도록 함
+        return [{'rec_texts': payload}]
+
+    def shutdown_server(self):
+        with self._lock:
+            try:
+                self._ensure_connected(spawn=False)
+                self._conn.send(('shutdown',))
+                self._conn.recv()
+            except (EOFError, OSError, ConnectionError):
+                pass
+            self._drop()
+
+    def close(self):
+        with self._lock:
+            self._drop()
+
+    def _drop(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+        self._conn = None
+
+    def _terminate_server(self):
+        """연결을 끊고 서버 프로세스를 종료합니다. (멈췄거나 요청 중 비정상 종료된 서버)"""
+        self._drop()
+        pid, self._server_pid = self._server_pid, None
+        if pid is not None:
+            try:
+                os.kill(pid, signal.SIGTERM)   # Windows에서는 TerminateProcess
+            except OSError:
+                pass
+        if self._proc is not None:
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+            self._proc = None
+
+    def _try_connect(self):
+        conn = Client((HOST, self.port), authkey=_load_authkey())
+        conn.send(('ping',))
+        if not conn.poll(self.request_timeout):
+            conn.close()
+            raise ConnectionError("OCR 서버가 ping에 응답하지 않습니다.")
+        self._server_pid = conn.recv()[1]
+        return conn
+
+    def _ensure_connected(self, spawn=None):
+        if self._conn is not None:
+            return
+        spawn = self.spawn if spawn is None else spawn
+        try:
+            self._conn = self._try_connect()
+            return
+        except (OSError, EOFError, FileNotFoundError):
+            if not spawn:
+                raise ConnectionError("OCR 서버에 연결할 수 없습니다.")
+        self._spawn_server()
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._proc is not None and self._proc.poll() is not None:
+                # 다른 프로세스가 먼저 포트를 잡았을 수 있으므로 접속은 계속 시도
+                self._proc = None
+            try:
+                self._conn = self._try_connect()
+                print("[OCR Client] OCR 서버 연결 완료.")
+                return
+            except (OSError, EOFError, FileNotFoundError):
+                time.sleep(0.5)
+        raise ConnectionError(f"OCR 서버가 {self.startup_timeout}s 안에 준비되지 않았습니다.")
+
+    def _spawn_server(self):
+        print("[OCR Client] OCR 서버를 시작합니다.")
+        os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+        kwargs = {}
+        if os.name == 'nt':
+            kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+        else:
+            kwargs['start_new_session'] = True
+        with open(LOG_FILE, 'ab') as log:
+            self._proc = subprocess.Popen(
+                [sys.executable, '-u', os.path.abspath(__file__), '--port', str(self.port)],
+                stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                cwd=BASE_DIR, **kwargs
+            )
+
+
+#-----------------------------------------
+# 엔트리 포인트
+#-----------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="상주 OCR 서버")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--idle-timeout', type=int, default=DEFAULT_IDLE_TIMEOUT,
+                        help="요청이 없을 때 서버를 종료할 시간(초), 0이면 유지")
+    parser.add_argument('--stop', action='store_true', help="실행 중인 서버를 종료")
+    args = parser.parse_args()
+
+    if args.stop:
+        OcrClient(port=args.port, spawn=False).shutdown_server()
+    else:
+        serve(port=args.port, idle_timeout=args.idle_timeout)
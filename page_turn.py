@@ -0,0 +1,112 @@
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+import capture
+import tracing
+
+#-----------------------------------------
+# 설정
+#-----------------------------------------
+# 화면 샘플링 간격과 축소 크기 (작게 줄인 흑백 이미지로 비교하므로 샘플 1회 비용이 작음)
+SAMPLE_INTERVAL_MS = 80
+SAMPLE_SIZE = (32, 32)
+# 이 값보다 평균 밝기 차이가 크면 페이지가 바뀐 것으로 판단 (0~1)
+CHANGE_THRESHOLD = 0.02
+# 연속 샘플 간 차이가 이 값 이하로 STABLE_MS 동안 유지되면 렌더링이 끝난 것으로 판단
+STABLE_THRESHOLD = 0.004
+STABLE_MS = 250
+# 이 시간 안에 화면이 바뀌지 않으면 마지막 페이지로 판단
+TIMEOUT_MS = 6000
+
+
+def sample_region(bbox):
+    """화면 영역을 캡처해 SAMPLE_SIZE 크기의 흑백 픽셀 목록으로 반환합니다."""
+    from PIL import Image
+    img = capture.to_pil(capture.grab(bbox)[0])
+    return list(img.convert('L').resize(SAMPLE_SIZE, Image.BILINEAR).getdata())
+
+
+def signature_distance(a, b):
+    """두 샘플의 평균 절대 밝기 차이 (0~1)."""
+    if not a or not b or len(a) != len(b):
+        return 1.0
+    return sum(abs(x - y) for x, y in zip(a, b)) / (255.0 * len(a))
+
+
+#-----------------------------------------
+# 페이지 넘김 대기
+#-----------------------------------------
+class PageTurnWaiter(QObject):
+    """
+    '다음' 클릭 후 읽기 영역을 주기적으로 샘플링하여,
+    화면이 바뀐 뒤 STABLE_MS 동안 안정되면 page_ready를,
+    TIMEOUT_MS 동안 전혀 바뀌지 않으면 page_unchanged(마지막 페이지)를 보냅니다.
+    """
+    page_ready = pyqtSignal()
+    page_unchanged = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._timer = QTimer(self)
+        self._timer.setInterval(SAMPLE_INTERVAL_MS)
+        self._timer.timeout.connect(self._tick)
+        self._bbox = None
+        self._baseline = None
+        self._last = None
+        self._changed = False
+        self._started_at = 0.0
+        self._stable_since = 0.0
+
+    def start(self, bbox):
+        """
+        현재 화면을 기준 샘플로 저장하고 감시를 시작합니다.
+        반드시 '다음' 버튼을 클릭하기 전에 호출해야 합니다.
+        """
+        self._bbox = bbox
+        self._baseline = sample_region(bbox)
+        self._last = None
+        self._changed = False
+        self._started_at = time.perf_counter()
+        self._timer.start()
+
+    def cancel(self):
+        self._timer.stop()
+
+    def is_active(self):
+        return self._timer.isActive()
+
+    def _tick(self):
+        now = time.perf_counter()
+        elapsed_ms = (now - self._started_at) * 1000
+        try:
+            sig = sample_region(self._bbox)
+        except Exception as e:
+            print(f"[PageTurn] 화면 샘플링 실패: {e}")
+            sig = None
+
+        if not self._changed:
+            if sig is not None and signature_distance(sig, self._baseline) > CHANGE_THRESHOLD:
+                self._changed = True
+                self._last = sig
+                self._stable_since = now
+            elif elapsed_ms >= TIMEOUT_MS:
+                self._timer.stop()
+                print(f"[PageTurn] {elapsed_ms:.0f}ms 동안 화면 변화 없음 → 마지막 페이지로 판단")
+                self.page_unchanged.emit()
+            return
+
+        if sig is not None and signature_distance(sig, self._last) <= STABLE_THRESHOLD:
+            if (now - self._stable_since) * 1000 >= STABLE_MS:
+                self._timer.stop()
+                tracing.mark('page_turn', self._started_at)
+                self.page_ready.emit()
+                return
+        else:
+            # 아직 렌더링/애니메이션 중
+            self._last = sig
+            self._stable_since = now
+
+        if elapsed_ms >= TIMEOUT_MS:
+            # 화면이 바뀌었지만 계속 움직이는 경우: 더 기다리지 않고 현재 상태로 진행
+            self._timer.stop()
+            print("[PageTurn] 화면이 안정되지 않았지만 시간 초과로 진행")
+            self.page_ready.emit()
@@ -0,0 +1,268 @@
+import io
+import threading
+import time
+
+import tracing
+import tts
+
+#-----------------------------------------
+# 세그먼트 순차 재생기
+#-----------------------------------------
+class SegmentPlayer:
+    """
+    순서가 있는 오디오 세그먼트(오디오 바이트 또는 파일 경로)들을 pygame.mixer.music으로 차례대로 재생합니다.
+    세그먼트는 재생 도중에도 append()로 계속 추가할 수 있으며(스트리밍 TTS),
+    finish()가 호출되고 마지막 세그먼트까지 재생되면 시퀀스가 끝납니다.
+    pause/resume/restart/stop은 현재 파일이 아닌 시퀀스 전체를 대상으로 동작합니다.
+    바이트 세그먼트는 디스크에 쓰지 않고 BytesIO로 mixer에 넘깁니다. mixer가 파일 객체를 받지 못하면
+    (오래된 pygame) scratch 영역의 임시 파일로 재생하고, 시퀀스가 교체/정지될 때 참조를 해제합니다.
+    on_finished()는 시퀀스가 마지막 세그먼트까지 재생되어 끝났을 때 피더 스레드에서 호출됩니다.
+    (stop/start로 중단된 경우에는 호출되지 않음) 재생 중이 아니면 피더 스레드가 없으므로 깨어나는 일도 없습니다.
+    start(continuation=True)로 시작한 시퀀스는 재생 중인 시퀀스를 끊지 않고 그 뒤의 대기열에 들어가,
+    앞 시퀀스의 마지막 세그먼트가 끝나는 즉시 차례대로 이어서 재생됩니다. (연속 읽기의 다음 페이지 미리 준비)
+    이때 앞 시퀀스의 끝과 첫 세그먼트 재생 사이의 무음 길이를 tracing 'page_gap'으로 기록하고,
+    대기열의 시퀀스가 현재 시퀀스가 될 때마다 피더 스레드에서 on_advanced()를 호출합니다.
+    """
+
+    def __init__(self, pygame_module, poll_interval=0.02, scratch=None, on_finished=None, on_advanced=None):
+        self._pygame = pygame_module
+        self._poll = poll_interval
+        self._scratch = scratch
+        self.on_finished = on_finished
+        self.on_advanced = on_advanced
+        self._memory_load = True   # mixer.music.load가 파일 객체를 받는지
+        self._cond = threading.Condition()
+        self._segments = []
+        self._files = {}           # 세그먼트 인덱스 -> scratch 파일 경로 (메모리 재생 불가 시)
+        self._queued = []          # 현재 시퀀스 뒤에 이어서 재생할 시퀀스들 [[세그먼트 목록, 완료 여부], ...]
+        self._ended_at = None      # 마지막으로 세그먼트 재생이 끝난 시각 (perf_counter)
+        self._measure_gap = False  # 다음 첫 세그먼트 재생 시 page_gap을 기록할지
+        self._index = 0            # 현재(또는 다음에) 재생할 세그먼트 인덱스
+        self._loaded = False       # _index 세그먼트가 mixer에 로드되어 재생을 시작했는지
+        self._complete = False     # 더 이상 세그먼트가 추가되지 않는지
+        self._paused = False
+        self._active = False       # 시퀀스가 아직 끝나지 않았는지
+        self._generation = 0       # start/stop마다 증가, 이전 피더 스레드 종료용
+        self._thread = None
+
+    # ── 시퀀스 구성 ──────────────────────────────────────────────────────────
+    def start(self, continuation=False):
+        """
+        새 시퀀스를 시작합니다. 이전 시퀀스는 정지됩니다.
+        continuation=True면 재생 중인 시퀀스가 있을 때 그 뒤의 대기열 끝에 새 시퀀스를 넣고,
+        이후 append()/finish()는 이 시퀀스를 대상으로 합니다. (이미 대기 중인 시퀀스는 그대로 유지)
+        """
+        with self._cond:
+            if continuation and self._active:
+                self._queued.append([[], False])
+                return
+            self._halt_locked()
+            self._release_files_locked()
+            self._segments = []
+            self._index = 0
+            self._loaded = False
+            self._complete = False
+            self._paused = False
+            self._active = True
+            self._measure_gap = continuation
+            self._spawn_locked()
+
+    def append(self, segment):
+        """시퀀스 끝에 세그먼트(오디오 바이트 또는 파일 경로)를 추가합니다."""
+        with self._cond:
+            if self._queued:
+                self._queued[-1][0].append(segment)
+            else:
+                self._segments.append(segment)
+            self._cond.notify_all()
+
+    def finish(self):
+        """더 이상 세그먼트가 추가되지 않음을 알립니다."""
+        with self._cond:
+            if self._queued:
+                self._queued[-1][1] = True
+            else:
+                self._complete = True
+            self._cond.notify_all()
+
+    # ── 재생 제어 ────────────────────────────────────────────────────────────
+    def pause(self):
+        with self._cond:
+            if self._active and not self._paused:
+                self._paused = True
+                if self._loaded:
+                    self._pygame.mixer.music.pause()
+                self._cond.notify_all()
+
+    def resume(self):
+        with self._cond:
+            if self._active and self._paused:
+                self._paused = False
+                if self._loaded:
+                    self._pygame.mixer.music.unpause()
+                self._cond.notify_all()
+
+    def restart(self):
+        """시퀀스를 처음 세그먼트부터 다시 재생합니다. 재생할 세그먼트가 없으면 False."""
+        with self._cond:
+            if not self._segments:
+                return False
+            self._pygame.mixer.music.stop()
+            self._index = 0
+            self._loaded = False
+            self._paused = False
+            if not self._active:
+                self._active = True
+                self._spawn_locked()
+            self._cond.notify_all()
+            return True
+
+    def stop(self):
+        with self._cond:
+            self._halt_locked()
+            self._release_files_locked()
+            self._segments = []
+            self._complete = True
+
+    # ── 상태 조회 ────────────────────────────────────────────────────────────
+    def is_busy(self):
+        """재생 중이거나 다음 세그먼트를 기다리는 중이면 True (일시정지 시 False)."""
+        with self._cond:
+            return self._active and not self._paused
+
+    def is_paused(self):
+        with self._cond:
+            return self._active and self._paused
+
+    def has_queued(self):
+        """현재 시퀀스 뒤에 이어서 재생할 시퀀스가 대기 중이면 True."""
+        with self._cond:
+            return bool(self._queued)
+
+    def has_audio(self):
+        with self._cond:
+            return bool(self._segments)
+
+    def segment_paths(self):
+        """현재 시퀀스와 대기 중인 시퀀스의 파일 경로 세그먼트 (다시 듣기로 재생될 수 있으므로 전부)."""
+        with self._cond:
+            sequences = [self._segments] + [segments for segments, _complete in self._queued]
+            return {segment for segments in sequences for segment in segments if isinstance(segment, str)}
+
+    def current_segment(self):
+        with self._cond:
+            if self._segments:
+                return self._segments[min(self._index, len(self._segments) - 1)]
+            return None
+
+    # ── 내부 ────────────────────────────────────────────────────────────────
+    def _halt_locked(self):
+        self._generation += 1
+        self._active = False
+        self._paused = False
+        self._loaded = False
+        self._pygame.mixer.music.stop()
+        self._cond.notify_all()
+
+    def _release_files_locked(self):
+        # 파일 핸들을 놓아야 Windows에서 삭제 가능 (메모리 재생 중인 BytesIO도 함께 해제)
+        unload = getattr(self._pygame.mixer.music, 'unload', None)
+        if unload is not None:
+            unload()
+        for path in self._files.values():
+            self._scratch.release(path)
+        self._files = {}
+        self._queued = []
+
+    def _advance_sequence_locked(self):
+        # 대기열의 첫 시퀀스를 현재 시퀀스로 (mixer는 멈추지 않고 다음 load/play로 바로 이어짐)
+        files = self._files
+        self._segments, self._complete = self._queued.pop(0)
+        self._index = 0
+        self._loaded = False
+        self._files = {}
+        self._measure_gap = True
+        for path in files.values():
+            self._scratch.release(path)
+
+    def _load_locked(self, index):
+        segment = self._segments[index]
+        music = self._pygame.mixer.music
+        if isinstance(segment, str):
+            music.load(segment)
+            return
+        if self._memory_load:
+            try:
+                music.load(io.BytesIO(segment), tts.audio_suffix(segment)[1:])
+                return
+            except TypeError:
+                # pygame 2.0 미만: 파일 객체 + 형식 힌트를 받지 못함
+                self._memory_load = False
+                print("[Playback] 메모리 재생을 지원하지 않는 pygame입니다. 임시 파일로 재생합니다.")
+        if self._scratch is None:
+            raise self._pygame.error("임시 파일 영역이 없어 세그먼트를 재생할 수 없습니다.")
+        path = self._files.get(index)
+        if path is None:
+            path = self._files[index] = self._scratch.put(segment, tts.audio_suffix(segment))
+        music.load(path)
+
+    def _spawn_locked(self):
+        self._thread = threading.Thread(
+            target=self._feed, args=(self._generation,), daemon=True, name="SegmentPlayer"
+        )
+        self._thread.start()
+
+    def _feed(self, generation):
+        """현재 세그먼트가 끝나면 다음 세그먼트를 로드/재생하는 피더 루프."""
+        music = self._pygame.mixer.music
+        finished = False
+        with self._cond:
+            while generation == self._generation and self._active:
+                if self._paused:
+                    self._cond.wait()
+                    continue
+                if self._loaded:
+                    if music.get_busy():
+                        self._cond.wait(self._poll)
+                        continue
+                    # 현재 세그먼트 재생 완료
+                    self._ended_at = time.perf_counter()
+                    self._index += 1
+                    self._loaded = False
+                if self._index < len(self._segments):
+                    try:
+                        self._load_locked(self._index)
+                        music.play()
+                        self._loaded = True
+                        if self._measure_gap:
+                            self._measure_gap = False
+                            if self._ended_at is not None:
+                                tracing.mark('page_gap', self._ended_at)
+                    except (self._pygame.error, OSError) as e:
+                        print(f"[ERROR] 세그먼트 재생 실패, 건너뜀: {e}")
+                        self._index += 1
+                    continue
+                if self._complete and self._queued:
+                    self._advance_sequence_locked()
+                    if self.on_advanced is not None:
+                        # 잠금을 놓고 알림 (콜백에서 플레이어 상태를 조회할 수 있도록)
+                        self._cond.release()
+                        try:
+                            self.on_advanced()
+                        except Exception as e:
+                            print(f"[ERROR] 다음 시퀀스 전환 콜백 오류: {e}")
+                        finally:
+                            self._cond.acquire()
+                    continue
+                if self._complete:
+                    self._active = False
+                    finished = True
+                    break
+                # 다음 세그먼트가 합성되기를 기다림 (append/finish가 깨움)
+                self._cond.wait()
+        # 잠금을 놓은 뒤 알림 (콜백에서 플레이어를 다시 조작할 수 있도록)
+        if finished and self.on_finished is not None:
+            try:
+                self.on_finished()
+            except Exception as e:
+                print(f"[ERROR] 재생 완료 콜백 오류: {e}")
@@ -0,0 +1,159 @@
+import numpy as np
+from PIL import Image
+
+#-----------------------------------------
+# OCR 전처리
+#-----------------------------------------
+# 사용자가 드래그한 영역을 그대로 OCR에 넣으면 고해상도(HiDPI) 캡처일수록 추론 시간이 크게 늘어납니다.
+# 여백을 잘라내고, 글자 높이가 목표값이 되도록 축소한 뒤 OCR에 넘깁니다. (확대는 하지 않음)
+
+# 배경과의 밝기 차이가 이 값보다 크면 글자(잉크) 픽셀로 판단
+INK_THRESHOLD = 48
+# 여백을 자른 뒤 남겨 둘 테두리 (px)
+TRIM_PADDING = 8
+# 한 행에서 잉크 픽셀 비율이 이 값 이상이면 글자가 있는 행으로 판단
+ROW_INK_RATIO = 0.005
+# 전체 행의 이 비율 이상에 잉크가 있는 열은 세로 괘선/스크롤바/사이드바/그림자로 보고 글자 높이 추정에서 제외
+COLUMN_RULE_RATIO = 0.6
+# 추정한 글자 높이가 목표의 이 배수를 넘으면 (줄 간격이 좁아 여러 줄이 한 덩어리로 잡히는 등) 믿지 않고 축소하지 않음
+MAX_TEXT_HEIGHT_FACTOR = 4
+
+
+def _ink_mask(gray):
+    """테두리 픽셀의 중앙값을 배경으로 보고, 배경과 충분히 다른 픽셀을 True로 표시합니다."""
+    border = np.concatenate([gray[0, :], gray[-1, :], gray[:, 0], gray[:, -1]])
+    background = np.median(border)
+    return np.abs(gray.astype(np.int16) - int(background)) > INK_THRESHOLD
+
+
+def trim_box(mask, padding=TRIM_PADDING):
+    """잉크가 있는 영역의 (left, top, right, bottom). 잉크가 없으면 None."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0 or cols.size == 0:
+        return None
+    h, w = mask.shape
+    return (max(0, cols[0] - padding), max(0, rows[0] - padding),
+            min(w, cols[-1] + 1 + padding), min(h, rows[-1] + 1 + padding))
+
+
+def estimate_text_height(mask):
+    """
+    행별 잉크 분포(수평 투영)에서 연속된 글자 행 묶음의 높이 중앙값을 글자 높이로 추정합니다.
+    추정할 수 없으면 None.
+    폭이 좁아도 대부분의 행에 걸친 세로 요소(괘선, 스크롤바 등)는 모든 행을 글자 행으로 만들므로 먼저 제외합니다.
+    """
+    if mask.shape[0] > 1:
+        mask = mask[:, mask.mean(axis=0) < COLUMN_RULE_RATIO]
+        if mask.size == 0:
+            return None
+    row_has_ink = mask.mean(axis=1) >= ROW_INK_RATIO
+    if not row_has_ink.any():
+        return None
+    # 글자 행 구간의 시작/끝 찾기
+    padded = np.concatenate([[False], row_has_ink, [False]])
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    heights = edges[1::2] - edges[0::2]
+    heights = heights[heights >= 4]  # 밑줄/노이즈 제외
+    if heights.size == 0:
+        return None
+    return float(np.median(heights))
+
+
+def otsu_threshold(gray):
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = gray.size
+    cum_count = np.cumsum(hist)
+    cum_mean = np.cumsum(hist * np.arange(256))
+    global_mean = cum_mean[-1] / total
+    w0 = cum_count / total
+    w1 = 1.0 - w0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        between = (global_mean * w0 - cum_mean / total) ** 2 / (w0 * w1)
+    return int(np.nanargmax(between))
+
+
+#-----------------------------------------
+# 지연 시간 예산 모델
+#-----------------------------------------
+class LatencyModel:
+    """
+    최근 OCR 시간으로 '메가픽셀당 ms'를 지수 이동 평균으로 학습하여,
+    페이지당 목표 시간(budget_ms)을 넘지 않는 최대 픽셀 수를 계산합니다.
+    """
+
+    def __init__(self, ms_per_megapixel=400.0, smoothing=0.3):
+        self.ms_per_megapixel = ms_per_megapixel
+        self.smoothing = smoothing
+
+    def record(self, pixels, elapsed_ms):
+        if pixels <= 0 or elapsed_ms <= 0:
+            return
+        observed = elapsed_ms / (pixels / 1e6)
+        self.ms_per_megapixel += self.smoothing * (observed - self.ms_per_megapixel)
+
+    def max_pixels(self, budget_ms):
+        return budget_ms / self.ms_per_megapixel * 1e6
+
+
+latency_model = LatencyModel()
+
+
+#-----------------------------------------
+# 전처리 단계
+#-----------------------------------------
+def preprocess(image, target_text_height=32, min_text_height=20, grayscale=False,
+               binarize=False, budget_ms=0):
+    """
+    PIL 이미지를 OCR 입력용 BGR uint8 배열로 변환합니다.
+    1) 여백 자르기 2) 글자 높이가 target_text_height가 되도록 축소
+    3) budget_ms > 0이면 예상 OCR 시간이 예산 안에 들도록 추가 축소
+    4) 선택적으로 흑백 변환/이진화
+    어느 경우에도 글자 높이는 min_text_height 이상으로 유지하며, 추정한 글자 높이가
+    target_text_height * MAX_TEXT_HEIGHT_FACTOR를 넘으면 잘못된 추정으로 보고 크기를 바꾸지 않습니다.
+    (배열, 정보 dict)를 반환합니다.
+    """
+    rgb = np.asarray(image.convert('RGB'))
+    gray = np.asarray(image.convert('L'))
+    info = {'original_size': (rgb.shape[1], rgb.shape[0])}
+
+    mask = _ink_mask(gray)
+    box = trim_box(mask)
+    if box is not None:
+        left, top, right, bottom = box
+        rgb, gray, mask = rgb[top:bottom, left:right], gray[top:bottom, left:right], mask[top:bottom, left:right]
+        info['trim_box'] = box
+
+    text_h = estimate_text_height(mask)
+    info['text_height'] = text_h
+    if text_h and text_h > target_text_height * MAX_TEXT_HEIGHT_FACTOR:
+        info['text_height_rejected'] = True
+        text_h = None
+    scale = 1.0
+    if text_h:
+        scale = min(1.0, target_text_height / text_h)
+    if budget_ms > 0 and text_h:
+        # 글자 높이를 모르면 얼마나 줄여도 되는지 알 수 없으므로 예산 축소도 하지 않음
+        pixels = rgb.shape[0] * rgb.shape[1] * scale * scale
+        allowed = latency_model.max_pixels(budget_ms)
+        if pixels > allowed:
+            scale *= (allowed / pixels) ** 0.5
+    if text_h:
+        scale = max(scale, min(1.0, min_text_height / text_h))
+    info['scale'] = round(scale, 3)
+
+    if grayscale or binarize:
+        channel = gray
+        if binarize:
+            channel = np.where(gray > otsu_threshold(gray), 255, 0).astype(np.uint8)
+        out = Image.fromarray(np.ascontiguousarray(channel)).convert('RGB')
+    else:
+        out = Image.fromarray(np.ascontiguousarray(rgb))
+
+    if scale < 0.98:
+        new_size = (max(1, round(out.width * scale)), max(1, round(out.height * scale)))
+        out = out.resize(new_size, Image.BILINEAR, reducing_gap=2.0)
+    info['size'] = out.size
+
+    bgr = np.asarray(out)[:, :, ::-1]
+    return np.ascontiguousarray(bgr), info
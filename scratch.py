@@ -0,0 +1,139 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+#-----------------------------------------
+# 관리되는 임시 파일 영역
+#-----------------------------------------
+# 오디오는 기본적으로 메모리(BytesIO)에서 바로 재생하지만, mixer가 파일 객체를 받지 못하는 환경에서는
+# 파일 경로가 필요합니다. 그런 파일은 모두 실행별 전용 디렉터리에 만들고 참조 수로 수명을 관리해,
+# 마지막 참조가 해제되면(현재/다시듣기 대상이 아니게 되면) 바로 지웁니다.
+# 이전 실행이 비정상 종료하며 남긴 디렉터리와, 예전 버전이 시스템 임시 폴더에 남긴
+# snip_tts_* / snip_continuous_* 파일은 시작 시 정리합니다.
+
+SCRATCH_ROOT = os.path.join(tempfile.gettempdir(), 'snip_scratch')
+# 이 시간보다 오래 수정되지 않은 다른 실행의 디렉터리/예전 임시 파일만 지움 (동시에 실행 중인 앱 보호)
+STALE_SECONDS = 6 * 60 * 60
+LEGACY_PREFIXES = ('snip_tts_', 'snip_continuous_', 'snip_pyttsx3_')
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return True
+    except OSError:
+        # 재생 중이라 잠긴 파일(Windows) 등
+        return False
+
+
+def sweep_stale(root=SCRATCH_ROOT, stale_seconds=STALE_SECONDS, keep=None):
+    """오래된 실행별 디렉터리와 예전 버전의 임시 파일을 지우고, 지운 파일 수를 반환합니다."""
+    cutoff = time.time() - stale_seconds
+    removed = 0
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            if path == keep or not os.path.isdir(path):
+                continue
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                for child in os.listdir(path):
+                    removed += _remove(os.path.join(path, child))
+                os.rmdir(path)
+            except OSError:
+                pass
+    temp_dir = tempfile.gettempdir()
+    try:
+        names = os.listdir(temp_dir)
+    except OSError:
+        names = []
+    for name in names:
+        if not name.startswith(LEGACY_PREFIXES):
+            continue
+        path = os.path.join(temp_dir, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) <= cutoff:
+                removed += _remove(path)
+        except OSError:
+            pass
+    return removed
+
+
+class ScratchArea:
+    """
+    참조 수로 수명을 관리하는 임시 파일 영역.
+    put()으로 만든 파일은 참조 1로 시작하며, acquire()/release()로 참조를 늘리고 줄입니다.
+    참조가 0이 되면 파일을 지우고, 잠겨 있어 지우지 못한 파일은 다음 put()/release() 때 다시 시도합니다.
+    """
+
+    def __init__(self, root=SCRATCH_ROOT, stale_seconds=STALE_SECONDS):
+        self.directory = os.path.join(root, f'run_{os.getpid()}_{uuid.uuid4().hex[:6]}')
+        self._lock = threading.Lock()
+        self._refs = {}          # 경로 -> 참조 수
+        self._sizes = {}         # 경로 -> 바이트 수
+        self._pending = set()    # 참조는 0이지만 아직 지우지 못한 파일
+        self._counter = 0
+        removed = sweep_stale(root, stale_seconds, keep=self.directory)
+        if removed:
+            print(f"[Scratch] 이전 실행이 남긴 임시 파일 {removed}개 정리")
+
+    def put(self, data, suffix=''):
+        """data를 새 임시 파일로 쓰고 경로를 반환합니다. (참조 1)"""
+        with self._lock:
+            self._retry_pending_locked()
+            os.makedirs(self.directory, exist_ok=True)
+            self._counter += 1
+            path = os.path.join(self.directory, f'{self._counter:06d}{suffix}')
+            with open(path, 'wb') as f:
+                f.write(data)
+            self._refs[path] = 1
+            self._sizes[path] = len(data)
+            return path
+
+    def acquire(self, path):
+        with self._lock:
+            if path not in self._refs:
+                raise KeyError(path)
+            self._refs[path] += 1
+            return path
+
+    def release(self, path):
+        """참조를 하나 줄이고, 0이 되면 파일을 지웁니다."""
+        with self._lock:
+            count = self._refs.get(path)
+            if count is None:
+                return
+            if count > 1:
+                self._refs[path] = count - 1
+                return
+            del self._refs[path]
+            self._sizes.pop(path, None)
+            if not _remove(path):
+                self._pending.add(path)
+            self._retry_pending_locked()
+
+    def in_use(self):
+        """(참조 중인 파일 수, 바이트 수)"""
+        with self._lock:
+            return len(self._refs), sum(self._sizes.values())
+
+    def close(self):
+        """모든 파일과 실행별 디렉터리를 지웁니다. (앱 종료 시)"""
+        with self._lock:
+            self._pending.update(self._refs)
+            self._refs.clear()
+            self._sizes.clear()
+            self._retry_pending_locked()
+            try:
+                os.rmdir(self.directory)
+            except OSError:
+                pass
+
+    def _retry_pending_locked(self):
+        if self._pending:
+            self._pending = {path for path in self._pending if not _remove(path)}
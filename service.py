@@ -0,0 +1,340 @@
+# service.py
+# 툴바와 같은 OCR → TTS 파이프라인을 로컬 HTTP로 제공하는 서비스 모드.
+#
+#   POST /ocr     이미지(본문 그대로, 또는 {"image": base64}) → {"text": ...}
+#   POST /tts     {"text": ..., "voice": (선택)} → audio/mpeg (오프라인 엔진은 audio/wav)
+#   POST /read    이미지 → {"text", "voice", "audio": base64}
+#   GET  /health  구성 요소 준비 상태, 대기열 길이
+#   GET  /metrics tracing 카운터/단계별 소요 시간, 배치 통계
+#
+# 동시에 들어온 OCR 요청은 짧은 시간(OCR_BATCH_WAIT_MS) 동안 모아 한 번의 OCR 호출로 처리합니다.
+# 대기열이 가득 차면 기다리게 하지 않고 바로 503(Retry-After)으로 돌려보냅니다.
+# --tts로 TTS 엔진을 고를 수 있고, --stub-tts(= --tts stub)로 실행하면 네트워크 없이
+# 결정적인 대체 엔진으로 합성하므로 오프라인에서도 전 경로를 시험할 수 있습니다.
+#
+#   python service.py [--port 8765] [--tts auto] [--stub-tts]
+import argparse
+import base64
+import io
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import combined
+import tracing
+import tts
+import tts_backends
+
+#-----------------------------------------
+# 설정
+#-----------------------------------------
+HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# 한 번의 OCR 호출에 묶을 최대 요청 수와, 첫 요청 뒤 다음 요청을 기다리는 최대 시간
+OCR_MAX_BATCH = 8
+OCR_BATCH_WAIT_MS = 15
+# 처리를 기다릴 수 있는 OCR 요청 수 (초과 시 503)
+OCR_MAX_QUEUE = 32
+# 동시에 처리할 수 있는 TTS 요청 수 (초과 시 503)
+TTS_MAX_INFLIGHT = 4
+# 요청 하나가 결과를 기다리는 최대 시간(초, 초과 시 504)
+REQUEST_TIMEOUT = 120
+# 요청 본문 최대 크기
+MAX_BODY_BYTES = 32 * 1024 * 1024
+# 503 응답에 넣을 재시도 권장 시간(초)
+RETRY_AFTER = 1
+
+_AUDIO_TYPES = {'.mp3': 'audio/mpeg', '.wav': 'audio/wav', '.aiff': 'audio/aiff'}
+
+
+class ServiceBusy(Exception):
+    """대기열이 가득 차서 요청을 받을 수 없을 때."""
+
+
+class ServiceTimeout(Exception):
+    """요청이 REQUEST_TIMEOUT 안에 처리되지 않았을 때. (대기 중인 작업은 취소됨)"""
+
+
+#-----------------------------------------
+# OCR 마이크로 배치
+#-----------------------------------------
+class OcrBatcher:
+    """
+    여러 스레드에서 들어온 OCR 요청을 한 작업 스레드에서 모아 run_batch(images)로 한꺼번에 처리합니다.
+    첫 요청이 들어온 뒤 max_wait_ms 안에 도착한 요청까지 최대 max_batch개를 한 배치로 묶습니다.
+    대기열(max_queue)이 가득 차면 submit이 ServiceBusy를, timeout 안에 결과가 없으면 ServiceTimeout을 던집니다.
+    """
+
+    def __init__(self, run_batch, max_batch=OCR_MAX_BATCH, max_wait_ms=OCR_BATCH_WAIT_MS,
+                 max_queue=OCR_MAX_QUEUE):
+        self.run_batch = run_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._loop, name="ocr-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, image, timeout=REQUEST_TIMEOUT):
+        """image의 인식 결과(텍스트)를 반환합니다. (배치가 처리될 때까지 대기)"""
+        future = Future()
+        try:
+            self._queue.put_nowait((image, future))
+        except queue.Full:
+            self.rejected += 1
+            raise ServiceBusy("OCR 대기열이 가득 찼습니다.")
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            # 아직 배치에 들어가지 않았다면 취소되어 작업 스레드가 건너뜀 (이미 실행 중이면 결과만 버림)
+            future.cancel()
+            self.timed_out += 1
+            raise ServiceTimeout(f"OCR 요청이 {timeout}초 안에 끝나지 않았습니다.")
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        return {
+            'queue_depth': self.depth(),
+            'queue_capacity': self._queue.maxsize,
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else None,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+        }
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # 기다리는 동안 취소(시간 초과)된 요청은 제외
+            batch = [(image, future) for image, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                with tracing.span('ocr_batch', size=len(batch)):
+                    texts = self.run_batch([image for image, _future in batch])
+                for (_image, future), text in zip(batch, texts):
+                    future.set_result(text)
+            except Exception as e:
+                for _image, future in batch:
+                    future.set_exception(e)
+
+
+#-----------------------------------------
+# 서비스 상태
+#-----------------------------------------
+class _LogProgress:
+    """initialize_components의 progress_callback/component_ready/component_failed(Qt 시그널) 자리에 넣는 emit 어댑터."""
+
+    def __init__(self, on_emit=None):
+        self.on_emit = on_emit
+
+    def emit(self, *args):
+        if self.on_emit is not None:
+            self.on_emit(*args)
+
+
+class ReadService:
+    """initialize_components가 만든 구성 요소 위에서 /ocr, /tts, /read 요청을 처리합니다."""
+
+    def __init__(self, tts_backend=None):
+        self.tts_backend = tts_backend or combined.TTS_BACKEND
+        self.ready = set()
+        self.failed = {}   # 초기화에 실패한 구성 요소 {이름: 오류 메시지}
+        self.started_at = time.time()
+        self.batcher = OcrBatcher(combined.recognize_texts)
+        self._tts_slots = threading.BoundedSemaphore(TTS_MAX_INFLIGHT)
+
+    def initialize(self):
+        """OCR/TTS 구성 요소를 초기화합니다. (재생 장치는 쓰지 않으므로 pygame은 제외)"""
+        combined.TTS_BACKEND = self.tts_backend
+        combined.initialize_components(_LogProgress(), _LogProgress(self.ready.add), components=('tts', 'ocr'),
+                                       component_failed=_LogProgress(self.failed.__setitem__))
+
+    def is_ready(self):
+        return {'tts', 'ocr'} <= self.ready
+
+    def ocr(self, image):
+        with tracing.span('http_ocr'):
+            return self.batcher.submit(image)
+
+    def synthesize(self, text, voice=None):
+        if not self._tts_slots.acquire(blocking=False):
+            raise ServiceBusy("TTS 요청이 너무 많습니다.")
+        try:
+            with tracing.span('http_tts'):
+                return combined.synthesize_audio(text, voice)
+        finally:
+            self._tts_slots.release()
+
+    def health(self):
+        return {
+            'status': 'ok' if self.is_ready() else 'error' if self.failed else 'starting',
+            'components': sorted(self.ready),
+            'failed_components': self.failed,
+            'tts_backend': self.tts_backend,
+            'uptime_s': round(time.time() - self.started_at, 1),
+            'ocr_queue_depth': self.batcher.depth(),
+        }
+
+    def metrics(self):
+        data = tracing.snapshot()
+        data['ocr_batcher'] = self.batcher.stats()
+        return data
+
+
+#-----------------------------------------
+# HTTP 처리
+#-----------------------------------------
+def _decode_image(body, content_type):
+    """요청 본문(이미지 바이트 또는 {"image": base64} JSON)을 PIL 이미지로 바꿉니다."""
+    from PIL import Image
+    if content_type.startswith('application/json'):
+        body = base64.b64decode(json.loads(body)['image'])
+    img = Image.open(io.BytesIO(body))
+    img.load()
+    return img
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None   # make_server에서 지정
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, fmt, *args):
+        # 요청마다 출력하지 않음 (지표는 /metrics로 확인)
+        pass
+
+    def _send(self, status, body, content_type='application/json; charset=utf-8', headers=None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"요청 본문이 너무 큽니다. (최대 {MAX_BODY_BYTES} bytes)")
+        return self.rfile.read(length)
+
+    def do_GET(self):
+        tracing.incr('http_requests')
+        if self.path == '/health':
+            health = self.service.health()
+            self._send(200 if health['status'] == 'ok' else 503, health)
+        elif self.path == '/metrics':
+            self._send(200, self.service.metrics())
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        tracing.incr('http_requests')
+        routes = {'/ocr': self._post_ocr, '/tts': self._post_tts, '/read': self._post_read}
+        handler = routes.get(self.path)
+        if handler is None:
+            self._send(404, {'error': 'not found'})
+            return
+        if self.service.failed:
+            # 재시도해도 나아지지 않으므로 Retry-After 없이 실패 원인을 돌려줌
+            self._send(503, {'error': '초기화 실패', 'failed_components': self.service.failed})
+            return
+        if not self.service.is_ready():
+            self._send(503, {'error': '초기화 중입니다.'}, headers={'Retry-After': str(RETRY_AFTER)})
+            return
+        try:
+            handler(self._read_body(), self.headers.get('Content-Type', ''))
+        except ServiceBusy as e:
+            tracing.incr('http_rejected')
+            self._send(503, {'error': str(e)}, headers={'Retry-After': str(RETRY_AFTER)})
+        except ServiceTimeout as e:
+            tracing.incr('http_timeouts')
+            self._send(504, {'error': str(e)})
+        except (ValueError, KeyError, OSError) as e:
+            self._send(400, {'error': f"잘못된 요청: {e}"})
+        except Exception as e:
+            print(f"[ERROR] {self.path} 요청 처리 실패: {e}")
+            self._send(500, {'error': str(e)})
+
+    def _post_ocr(self, body, content_type):
+        with tracing.trace('http_ocr'):
+            text = self.service.ocr(_decode_image(body, content_type))
+        self._send(200, {'text': text})
+
+    def _post_tts(self, body, content_type):
+        request = json.loads(body)
+        text = request['text']
+        with tracing.trace('http_tts'):
+            audio = self.service.synthesize(text, request.get('voice'))
+        if audio is None:
+            self._send(500, {'error': 'TTS 합성 실패'})
+        else:
+            self._send(200, audio, content_type=_AUDIO_TYPES[tts.audio_suffix(audio)])
+
+    def _post_read(self, body, content_type):
+        with tracing.trace('http_read'):
+            text = self.service.ocr(_decode_image(body, content_type))
+            voices = list(dict.fromkeys(voice for _chunk, voice in combined.plan_chunks(text)))
+            audio = self.service.synthesize(text) if text.strip() else None
+        tracing.incr('pages_read')
+        self._send(200, {
+            'text': text,
+            'voice': voices[0] if voices else None,
+            'voices': voices,
+            'audio': base64.b64encode(audio).decode('ascii') if audio else None,
+            'audio_type': _AUDIO_TYPES[tts.audio_suffix(audio)] if audio else None,
+        })
+
+
+def make_server(port=DEFAULT_PORT, tts_backend=None, host=HOST):
+    """HTTP 서버와 서비스 객체를 만듭니다. (구성 요소 초기화는 service.initialize()로 별도 실행)"""
+    service = ReadService(tts_backend=tts_backend)
+    handler = type('Handler', (_Handler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, service
+
+
+#-----------------------------------------
+# 엔트리 포인트
+#-----------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OCR/TTS 로컬 HTTP 서비스")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--tts', help=f"TTS 엔진 (auto/{'/'.join(tts_backends.BACKENDS)}, 기본: {combined.TTS_BACKEND})")
+    parser.add_argument('--stub-tts', action='store_true', help="네트워크 없이 대체 TTS로 합성 (시험용, --tts stub)")
+    args = parser.parse_args()
+
+    backend = 'stub' if args.stub_tts else args.tts
+    server, service = make_server(port=args.port, tts_backend=backend)
+    # 모델을 로드하는 동안에도 /health에 응답하도록 초기화는 백그라운드에서 진행
+    threading.Thread(target=service.initialize, name="service-init", daemon=True).start()
+    print(f"[Service] http://{HOST}:{args.port} 에서 대기 중 (TTS: {service.tts_backend})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[Service] 종료합니다.")
+    finally:
+        server.server_close()
@@ -0,0 +1,101 @@
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPainter, QPen, QGuiApplication, QFont, QColor
+from PyQt5.QtCore import Qt, QRect
+from capture import grab_region
+from combined import SNIP_PATH, save_debug_capture
+
+#-----------------------------------------
+# 스니핑 툴
+#-----------------------------------------
+class SnippingTool(QWidget):
+    """
+    모든 모니터(가상 데스크톱 전체)를 덮는 반투명 창에서 영역/위치를 고릅니다.
+    콜백으로 넘기는 영역과 위치는 Qt 논리 좌표계의 전역 좌표입니다. (capture.grab_region과 같은 좌표계)
+    """
+    def __init__(self, mode='read_area', callback_on_cancel=None, callback_on_snip_done=None, instruction_text=""):
+        super().__init__()
+        self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
+        self.setWindowOpacity(0.5)
+        self.setCursor(Qt.CrossCursor)
+        # showFullScreen은 한 화면만 덮으므로 모든 화면을 합친 영역으로 창을 띄움
+        desktop = QRect()
+        for screen in QGuiApplication.screens():
+            desktop = desktop.united(screen.geometry())
+        self.setGeometry(desktop)
+        self.begin = self.end = None
+        self.save_path = SNIP_PATH
+        self.show()
+        self.canceled = False
+        self.callback_on_cancel = callback_on_cancel
+        self.callback_on_snip_done = callback_on_snip_done
+        self.mode = mode
+        self.instruction_text = instruction_text
+        self.setMouseTracking(True)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        
+        # 안내 텍스트 그리기
+        if self.instruction_text:
+            painter.setPen(QColor(255, 255, 255))
+            painter.setFont(QFont("나눔고딕", 20, QFont.Bold))
+            # 안내 문구는 주 화면 가운데에 표시
+            primary = QGuiApplication.primaryScreen().geometry()
+            text_rect = QRect(self.mapFromGlobal(primary.topLeft()), primary.size())
+            painter.drawText(text_rect, Qt.AlignCenter, self.instruction_text)
+
+        if self.begin and self.end:
+            painter.setPen(QPen(Qt.red, 2, Qt.SolidLine))
+            if self.mode in ('read_area', 'normal'):
+                rect = QRect(self.begin, self.end).normalized()
+                painter.drawRect(rect)
+            elif self.mode == 'click_pos':
+                painter.drawEllipse(self.begin, 5, 5)
+
+    def mousePressEvent(self, event):
+        self.begin = event.pos()
+        self.end = self.begin
+        self.update()
+
+    def mouseMoveEvent(self, event):
+        self.end = event.pos()
+        self.update()
+
+    def mouseReleaseEvent(self, event):
+        if self.canceled:
+            return
+        
+        # 창 좌표 → 전역 좌표 (보조 모니터는 음수일 수 있음)
+        begin, end = self.mapToGlobal(self.begin), self.mapToGlobal(self.end)
+        self.close()
+
+        if self.mode == 'read_area':
+            x1, y1 = min(begin.x(), end.x()), min(begin.y(), end.y())
+            x2, y2 = max(begin.x(), end.x()), max(begin.y(), end.y())
+            if abs(x2 - x1) > 5 and abs(y2 - y1) > 5:
+                if self.callback_on_snip_done:
+                    self.callback_on_snip_done((x1, y1, x2, y2))
+            else:
+                if self.callback_on_cancel:
+                    self.callback_on_cancel()
+        elif self.mode == 'click_pos':
+            if self.callback_on_snip_done:
+                self.callback_on_snip_done(begin)
+        else: # 기본 캡처 모드
+            x1, y1 = min(begin.x(), end.x()), min(begin.y(), end.y())
+            x2, y2 = max(begin.x(), end.x()), max(begin.y(), end.y())
+            if abs(x2 - x1) > 5 and abs(y2 - y1) > 5:
+                img = grab_region((x1, y1, x2, y2))
+                save_debug_capture(img)
+                if self.callback_on_snip_done:
+                    self.callback_on_snip_done(img)
+            else:
+                if self.callback_on_cancel:
+                    self.callback_on_cancel()
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            self.canceled = True
+            self.close()
+            if self.callback_on_cancel:
+                self.callback_on_cancel()
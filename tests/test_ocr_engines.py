@@ -0,0 +1,44 @@
+# tests/test_ocr_engines.py
+# PaddlePaddle / ONNX Runtime / OpenVINO 엔진이 같은 정확도 기준을 통과하는지 확인합니다.
+# 고정된 합성 페이지를 엔진마다 인식해 문자 오류율(CER)을 비교하며,
+# 런타임이 설치되지 않았거나 ONNX 모델을 내보내지 않은 엔진은 건너뜁니다. (python ocr_engines.py export [--int8])
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('PIL')
+
+import ocr_engines
+import ocr_profiles
+
+PROFILE = 'fast'
+# fp32 엔진은 보정(calibrate) 기준과 같은 CER, int8 양자화 모델은 약간의 손실을 허용
+MAX_CER = {engine: ocr_profiles.DEFAULT_MAX_CER * (2 if engine.endswith('-int8') else 1)
+           for engine in ocr_engines.ENGINES}
+
+
+@pytest.fixture(scope='module')
+def page():
+    from benchmarks.pages import SAMPLE_TEXTS, find_font_path, iter_pages
+    if find_font_path() is None:
+        pytest.skip("한글 글꼴이 없어 합성 페이지를 렌더링할 수 없습니다. (BENCH_FONT로 지정)")
+    (_name, _lang, text, image), = iter_pages(languages=['mixed'], sizes=['large'], dpis=[144])
+    assert text == SAMPLE_TEXTS['mixed']
+    return text, image
+
+
+def _recognize(engine, image):
+    import combined
+    combined.ocr = ocr_engines.create_engine(engine, ocr_profiles.PROFILES[PROFILE], cache_size=0,
+                                             model_dir=combined.OCR_ONNX_DIR)
+    combined._ocr_cache = None
+    return combined.recognize_text(image)
+
+
+@pytest.mark.parametrize('engine', ocr_engines.ENGINES)
+def test_engine_cer(engine, page):
+    reason = ocr_engines._available(engine, ocr_profiles.PROFILES[PROFILE])
+    if reason is not None:
+        pytest.skip(f"{engine}: {reason}")
+    truth, image = page
+    cer = ocr_profiles.char_error_rate(truth, _recognize(engine, image))
+    assert cer <= MAX_CER[engine], f"{engine} CER {cer:.4f} > {MAX_CER[engine]}"
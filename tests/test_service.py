@@ -0,0 +1,204 @@
+# tests/test_service.py
+# HTTP 서비스 모드를 네트워크/모델 없이 시험합니다.
+# OCR은 가짜 run_batch 함수, TTS는 tts_backends.StubBackend(--stub-tts와 같은 엔진)로 대신합니다.
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+import combined
+import service
+import tts_backends
+
+
+def _fake_ocr(delay=0.0, calls=None):
+    """이미지(여기서는 바이트) 목록을 받아 'text:<이미지>'를 돌려주는 가짜 OCR. 호출마다 배치 크기를 기록."""
+    def run_batch(images):
+        if calls is not None:
+            calls.append(len(images))
+        time.sleep(delay)
+        return [f"text:{image}" for image in images]
+    return run_batch
+
+
+#-----------------------------------------
+# OcrBatcher
+#-----------------------------------------
+def test_batcher_groups_concurrent_requests():
+    calls = []
+    batcher = service.OcrBatcher(_fake_ocr(calls=calls), max_batch=8, max_wait_ms=200)
+    results = {}
+
+    def _submit(i):
+        results[i] = batcher.submit(i)
+
+    threads = [threading.Thread(target=_submit, args=(i,)) for i in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {i: f"text:{i}" for i in range(5)}
+    assert sum(calls) == 5 and len(calls) < 5
+    assert batcher.stats()['items'] == 5
+
+
+def test_batcher_respects_max_batch():
+    calls = []
+    batcher = service.OcrBatcher(_fake_ocr(calls=calls), max_batch=2, max_wait_ms=200)
+    threads = [threading.Thread(target=batcher.submit, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(calls) <= 2 and sum(calls) == 4
+
+
+def test_batcher_rejects_when_queue_full():
+    release = threading.Event()
+    batcher = service.OcrBatcher(lambda images: release.wait() and [""] * len(images),
+                                 max_batch=1, max_wait_ms=0, max_queue=1)
+    first = threading.Thread(target=batcher.submit, args=('busy',))
+    first.start()
+    while batcher.stats()['batches'] == 0:   # 첫 요청이 작업 스레드에서 처리되기 시작할 때까지
+        time.sleep(0.01)
+    waiting = threading.Thread(target=batcher.submit, args=('queued',))
+    waiting.start()
+    while batcher.depth() == 0:
+        time.sleep(0.01)
+    with pytest.raises(service.ServiceBusy):
+        batcher.submit('rejected')
+    assert batcher.stats()['rejected'] == 1
+    release.set()
+    first.join()
+    waiting.join()
+
+
+def test_batcher_timeout_cancels_queued_work():
+    calls = []
+    batcher = service.OcrBatcher(_fake_ocr(delay=0.3, calls=calls), max_batch=1, max_wait_ms=0)
+    slow = threading.Thread(target=batcher.submit, args=('slow',))
+    slow.start()
+    time.sleep(0.05)
+    with pytest.raises(service.ServiceTimeout):
+        batcher.submit('late', timeout=0.05)
+    slow.join()
+    time.sleep(0.1)
+    # 시간 초과된 요청은 작업 스레드가 건너뜀
+    assert calls == [1]
+    assert batcher.stats()['timed_out'] == 1
+
+
+#-----------------------------------------
+# HTTP
+#-----------------------------------------
+@pytest.fixture
+def http(monkeypatch):
+    """가짜 OCR + StubBackend로 구성한 서비스를 임의 포트에서 실행하고 (요청 함수, 서비스)를 돌려줍니다."""
+    monkeypatch.setattr(combined, 'recognize_texts', _fake_ocr())
+    monkeypatch.setattr(combined, '_tts_backend', tts_backends.StubBackend())
+    monkeypatch.setattr(combined, '_audio_cache', None)
+    # PIL 없이 시험하도록 요청 본문을 그대로 이미지로 사용
+    monkeypatch.setattr(service, '_decode_image', lambda body, content_type: body.decode('utf-8'))
+    server, svc = service.make_server(port=0, tts_backend='stub')
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+    def request(path, body=None, content_type='application/json'):
+        req = urllib.request.Request(base + path, data=body,
+                                     headers={'Content-Type': content_type} if body is not None else {})
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                return resp.status, dict(resp.headers), resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, dict(e.headers), e.read()
+
+    yield request, svc
+    server.shutdown()
+    server.server_close()
+
+
+def test_health_reports_startup_ready_and_failure(http):
+    request, svc = http
+    status, _headers, body = request('/health')
+    assert status == 503 and json.loads(body)['status'] == 'starting'
+
+    svc.ready.update({'tts', 'ocr'})
+    status, _headers, body = request('/health')
+    health = json.loads(body)
+    assert status == 200 and health['status'] == 'ok'
+    assert health['tts_backend'] == 'stub' and health['ocr_queue_depth'] == 0
+
+    svc.ready.discard('ocr')
+    svc.failed['ocr'] = "모델 없음"
+    status, _headers, body = request('/health')
+    assert status == 503 and json.loads(body)['failed_components'] == {'ocr': "모델 없음"}
+
+
+def test_requests_wait_for_initialization(http):
+    request, _svc = http
+    status, headers, _body = request('/tts', json.dumps({'text': "hello"}).encode())
+    assert status == 503 and headers.get('Retry-After')
+
+
+def test_ocr_and_tts_with_stub_backend(http):
+    request, svc = http
+    svc.ready.update({'tts', 'ocr'})
+    status, _headers, body = request('/ocr', b"page-1", 'image/png')
+    assert status == 200 and json.loads(body) == {'text': "text:page-1"}
+
+    status, headers, body = request('/tts', json.dumps({'text': "Hello world."}).encode())
+    assert status == 200 and headers['Content-Type'] == 'audio/mpeg'
+    # StubBackend는 같은 입력에 항상 같은 바이트를 냄
+    assert body == request('/tts', json.dumps({'text': "Hello world."}).encode())[2]
+
+
+def test_tts_backpressure_returns_503(http):
+    request, svc = http
+    svc.ready.update({'tts', 'ocr'})
+    for _ in range(service.TTS_MAX_INFLIGHT):
+        svc._tts_slots.acquire()
+    try:
+        status, headers, _body = request('/tts', json.dumps({'text': "hello"}).encode())
+    finally:
+        for _ in range(service.TTS_MAX_INFLIGHT):
+            svc._tts_slots.release()
+    assert status == 503 and headers.get('Retry-After') == str(service.RETRY_AFTER)
+
+
+def test_ocr_timeout_returns_504_and_cancels(http, monkeypatch):
+    request, svc = http
+    svc.ready.update({'tts', 'ocr'})
+    release = threading.Event()
+    calls = []
+
+    def run_batch(images):
+        calls.append(list(images))
+        release.wait()
+        return [""] * len(images)
+
+    svc.batcher = service.OcrBatcher(run_batch, max_batch=1, max_wait_ms=0)
+    submit = svc.batcher.submit
+    monkeypatch.setattr(svc.batcher, 'submit', lambda image: submit(image, timeout=0.1))
+    first = threading.Thread(target=request, args=('/ocr', b"slow", 'image/png'))
+    first.start()
+    while not calls:
+        time.sleep(0.01)
+    status, _headers, body = request('/ocr', b"late", 'image/png')
+    assert status == 504 and 'error' in json.loads(body)
+    release.set()
+    first.join()
+    time.sleep(0.1)
+    # 늦은 요청은 배치에 들어가기 전에 취소됨 (실행 중이던 첫 요청도 시간 초과로 504를 받음)
+    assert calls == [["slow"]]
+    assert svc.batcher.stats()['timed_out'] == 2
+
+
+def test_malformed_request_returns_400(http):
+    request, svc = http
+    svc.ready.update({'tts', 'ocr'})
+    status, _headers, _body = request('/tts', b"not json")
+    assert status == 400
@@ -1,14 +1,16 @@
 import sys, os
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QFrame, QLabel, QDialog, QProgressBar
+    QPushButton, QFrame, QLabel, QDialog, QProgressBar, QMessageBox
 )
-from PyQt5.QtCore import Qt, QSize, QPoint, QTimer
+from PyQt5.QtCore import Qt, QSize, QPoint, QThread, QObject, pyqtSignal
 from PyQt5.QtGui import QIcon
-from PIL import ImageGrab
-import tempfile
-import uuid
-from combined import SnippingTool, run_pipeline, pause_audio, resume_audio, stop_audio, get_last_ocr_text, restart_audio, is_audio_busy, is_audio_finished, SNIP_PATH, OUTPUT_FILE, perform_mouse_click, get_current_audio_file
+import threading
+import tracing
+from page_turn import PageTurnWaiter
+from capture import grab_region, image_size
+from snipping import SnippingTool
+from combined import run_pipeline, save_debug_capture, pause_audio, resume_audio, stop_audio, get_last_ocr_text, restart_audio, is_audio_finished, has_queued_audio, add_playback_listener, add_playback_advance_listener, CONTINUOUS_LOOKAHEAD, SNIP_PATH, OUTPUT_FILE, perform_mouse_click, get_current_audio_file
 
 
 # 이미지 및 대체 텍스트 설정
@@ -19,12 +21,85 @@ FALLBACK = {
     "continuous_read": "📚"
 }
 
+# 재생 상태 전이표 (현재 상태 → 옮겨 갈 수 있는 상태)
+AUDIO_TRANSITIONS = {
+    'stopped': {'playing', 'finished'},
+    'playing': {'paused', 'finished', 'stopped'},
+    'paused': {'playing', 'stopped'},
+    'finished': {'playing', 'stopped'},
+}
+
+# 캡처/재생 제어 버튼 공통 스타일 (비활성 모양은 :disabled로 처리되므로 상태가 바뀌어도 다시 적용하지 않음)
+CONTROL_STYLE = """
+    QPushButton {
+        background-color:#ffffff;
+        font-size:20px;
+    }
+    QPushButton:disabled {
+        color: #a0a0a0;
+        opacity: 0.5;
+    }
+"""
+
+# 진행 창에 표시할 단계와 이름 (tracing span 이름 → 표시 이름)
+LATENCY_LABELS = {
+    'capture': "캡처",
+    'ocr': "OCR",
+    'tts_first_audio': "TTS",
+    'time_to_first_audio': "첫 오디오",
+}
+
+
+class PlaybackEvents(QObject):
+    """재생 스레드의 완료/다음 페이지 전환 알림을 GUI 스레드로 넘기는 시그널 중계 객체."""
+    finished = pyqtSignal()
+    advanced = pyqtSignal()
+
+
+class PipelineWorker(QObject):
+    """
+    run_pipeline을 별도 QThread에서 실행하는 워커.
+    진행률과 완료 여부는 시그널로 전달되어 GUI 스레드에서 큐 방식으로 처리됩니다.
+    """
+    progress_updated = pyqtSignal(int, str)  # (진행률, 메시지)
+    playback_started = pyqtSignal()          # 첫 오디오 재생 시작 (스트리밍 시 합성 완료 전)
+    finished = pyqtSignal(bool, bool)        # (오디오 재생 시작 여부, 취소 여부)
+    stage_timed = pyqtSignal(str, float)     # (단계 이름, 소요 시간 ms)
+
+    def __init__(self, image, continuation=False):
+        super().__init__()
+        self.image = image
+        self.continuation = continuation
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        started = run_pipeline(
+            self.image,
+            progress_cb=self.progress_updated.emit,
+            cancel_event=self.cancel_event,
+            playback_cb=self.playback_started.emit,
+            stage_cb=self.stage_timed.emit,
+            continuation=self.continuation
+        )
+        self.finished.emit(bool(started), self.cancel_event.is_set())
+
+    def cancel(self):
+        # 진행 중인 단계가 끝나는 즉시 run_pipeline이 중단됩니다.
+        self.cancel_event.set()
+
 
 class ToolBar(QWidget):
-    def __init__(self):
+    retry_requested = pyqtSignal(str)   # 초기화에 실패한 구성 요소를 다시 초기화해 달라는 요청 (이름)
+
+    def __init__(self, pending_components=()):
         super().__init__()
         print("[ToolBar] ToolBar __init__ 호출됨")
 
+        # 아직 초기화 중인 구성 요소 (모두 준비되어야 캡처/연속 읽기 가능)
+        self.pending_components = set(pending_components)
+        # 초기화에 실패한 구성 요소 {이름: 오류 메시지} (다시 시도해 준비될 때까지 캡처/연속 읽기 불가)
+        self.failed_components = {}
+
         self.setWindowTitle("국립중앙도서관 오디오")
         self.setGeometry(200, 200, 100, 50)
         self.setFixedSize(120, 50)
@@ -40,12 +115,26 @@ class ToolBar(QWidget):
         self.continuous_read_active = False
         self.is_setting_next_page_pos = False
         self.is_waiting_for_next_page = False
+        # 연속 읽기: 현재 페이지 처리가 끝나 다음 페이지로 넘길 차례인지
+        self._advance_due = False
 
         self._overlay = None
 
+        # 백그라운드 파이프라인(OCR → TTS) 관련 속성
+        self._pipeline_thread = None
+        self._pipeline_worker = None
+        self.pipeline_running = False
+        # 취소 요청 후 아직 현재 단계를 마치지 않은 이전 워커와, 그 워커가 끝나면 시작할 요청 (image, continuation)
+        # 같은 OCR 엔진과 플레이어를 두 워커가 동시에 쓰지 않도록 새 파이프라인은 이전 워커가 끝난 뒤 시작합니다.
+        self._cancelling_worker = None
+        self._queued_pipeline = None
+
         # 연속 읽기 기능 관련 속성
         self.reading_area = None
         self.next_page_click_pos = None
+        self._page_waiter = PageTurnWaiter(self)
+        self._page_waiter.page_ready.connect(self._on_next_page_ready)
+        self._page_waiter.page_unchanged.connect(self._on_last_page_reached)
 
         # 오디오 버튼 변수 초기화
         self.pause_btn = None
@@ -60,21 +149,28 @@ class ToolBar(QWidget):
         self.resize_direction = {}
 
         self.init_ui()
-        
-        # 오디오 상태를 주기적으로 확인하는 타이머 추가
-        self.audio_timer = QTimer(self)
-        self.audio_timer.timeout.connect(self._check_audio_status)
-        self.audio_timer.start(250)
+
+        # 재생 완료는 재생 스레드가 알려 줌 (주기적으로 상태를 확인하지 않음)
+        self._playback_events = PlaybackEvents(self)
+        self._playback_events.finished.connect(self._on_audio_finished)
+        add_playback_listener(self._playback_events.finished.emit)
+        # 미리 준비한 다음 페이지가 재생되기 시작하면 그다음 페이지를 준비할 수 있음
+        self._playback_events.advanced.connect(self._maybe_advance_page)
+        add_playback_advance_listener(self._playback_events.advanced.emit)
 
     def _show_processing(self, text="처리 중…"):
         if self._overlay is None:
-            self._overlay = ProcessingOverlay(self, text=text)
+            self._overlay = ProcessingOverlay(self, text=text, cancellable=True)
+            self._overlay.cancel_requested.connect(self._cancel_pipeline)
         else:
             self._overlay.set_text(text)
         self._overlay.bar.setValue(0)
+        self._overlay.reset_latency()
+        capture_ms = tracing.last('capture')
+        if capture_ms is not None:
+            self._overlay.update_latency('capture', capture_ms)
         self._overlay.popup_near(self)
         self._overlay.show()
-        QApplication.processEvents()  # 동기 호출 직전 한 번 그려주기
 
     def _hide_processing(self):
         if self._overlay and self._overlay.isVisible():
@@ -159,8 +255,9 @@ class ToolBar(QWidget):
         read_row_widget.setVisible(False)
         self.layout.addWidget(read_row_widget)
         self.tool_containers.append(read_row_widget)
-        
-        self._update_audio_button_colors(self.audio_status)
+
+        self._apply_control_styles()
+        self._refresh_controls(force=True)
 
         # 취소 버튼
         self.cancel_button_widget = QWidget(self)
@@ -178,71 +275,106 @@ class ToolBar(QWidget):
 
         self.setStyleSheet("QWidget{background:#f9f9f9;}")
 
-    def _check_audio_status(self):
-        """오디오 상태가 변경되었는지 확인하고 UI를 업데이트합니다."""
-        if self.audio_status == 'playing' and not is_audio_busy():
+    def set_component_ready(self, name):
+        """초기화 워커가 구성 요소 준비 완료를 알리면 호출됩니다."""
+        self.pending_components.discard(name)
+        self.failed_components.pop(name, None)
+        if not self.pending_components and not self.failed_components:
+            print("[ToolBar] 모든 구성 요소 준비 완료. 캡처 가능.")
+        self._refresh_controls()
+        self._show_component_errors()
+
+    def set_component_failed(self, name, error):
+        """초기화 워커가 구성 요소 초기화 실패를 알리면 호출됩니다. 오류를 보여 주고 다시 시도할지 묻습니다."""
+        print(f"[ToolBar] 구성 요소 초기화 실패: {name} ({error})")
+        self.pending_components.discard(name)
+        self.failed_components[name] = error
+        self._refresh_controls()
+        self._show_component_errors()
+        answer = QMessageBox.warning(
+            self, "초기화 실패", f"{name} 초기화에 실패했습니다.\n{error}\n\n다시 시도할까요?",
+            QMessageBox.Retry | QMessageBox.Close, QMessageBox.Retry)
+        if answer == QMessageBox.Retry and name in self.failed_components:
+            self.retry_component(name)
+
+    def retry_component(self, name):
+        """실패한 구성 요소를 다시 초기화 중 상태로 돌리고 retry_requested를 보냅니다."""
+        self.failed_components.pop(name, None)
+        self.pending_components.add(name)
+        self._refresh_controls()
+        self._show_component_errors()
+        self.retry_requested.emit(name)
+
+    def _show_component_errors(self):
+        """초기화 실패 상태를 캡처/연속 읽기 버튼의 툴팁으로 표시합니다. (실패가 없으면 지움)"""
+        tip = "\n".join(f"{name} 초기화 실패: {error}" for name, error in self.failed_components.items())
+        for btn in (self.snip_btn, self.continuous_read_btn):
+            if btn is not None:
+                btn.setToolTip(tip)
+
+    def _set_audio_status(self, status):
+        """재생 상태를 전이표에 따라 바꾸고, 클릭 가능 여부가 바뀐 버튼만 갱신합니다."""
+        if status != self.audio_status:
+            if status not in AUDIO_TRANSITIONS[self.audio_status]:
+                print(f"[ToolBar] 허용되지 않는 재생 상태 전이 무시: {self.audio_status} → {status}")
+                return
+            self.audio_status = status
+        self._refresh_controls()
+        self._maybe_advance_page()
+
+    def _on_audio_finished(self):
+        """재생 스레드가 보낸 시퀀스 재생 완료 알림 (GUI 스레드에서 실행)."""
+        # 알림이 도착하기 전에 정지/다시듣기/새 재생이 있었다면 무시
+        if self.audio_status == 'playing' and is_audio_finished():
             print("[ToolBar] 오디오 재생이 자연스럽게 완료됨.")
-            self.audio_status = 'finished'
-            self._update_audio_button_colors(self.audio_status)
-        
-        if self.continuous_read_active and self.audio_status == 'finished' and not self.is_waiting_for_next_page:
-            print("[Continuous Read] 오디오 재생 완료. 다음 페이지로 이동합니다.")
-            self._update_audio_button_colors(self.audio_status)
-            self._next_page_action()
-        
-    def _update_audio_button_colors(self, status):
-        """버튼 색은 유지하면서 클릭 가능 여부만 조정"""
-        pause_clickable = (status == 'playing' or (self.continuous_read_active and status == 'playing'))
-        play_clickable = (status == 'paused' or (self.continuous_read_active and status == 'paused'))
-        stop_clickable = (status in ['playing', 'paused', 'finished'] or self.continuous_read_active) 
-        restart_clickable = (status in ['playing', 'paused', 'finished'] or self.continuous_read_active)
-        snip_clickable = not self.snipping_active and not is_audio_busy() and not self.continuous_read_active
-        continuous_read_clickable = not self.snipping_active and not is_audio_busy() and not self.continuous_read_active
-
-        if self.pause_btn and self.play_btn and self.stop_btn and self.restart_btn and self.snip_btn and self.continuous_read_btn:
-            base_style = """
-                QPushButton {
-                    background-color:#ffffff;
-                    font-size:20px;
-                }
-                QPushButton:disabled {
-                    color: #a0a0a0;
-                    opacity: 0.5;
-                }
-            """
-            
-            self.snip_btn.setStyleSheet(base_style + "color: #000000;")
-            self.snip_btn.setEnabled(snip_clickable)
-            self.snip_btn.setCursor(Qt.PointingHandCursor if snip_clickable else Qt.ArrowCursor)
-            
-            self.pause_btn.setStyleSheet(base_style + "color: #dc3545;")
-            self.pause_btn.setEnabled(pause_clickable)
-            self.pause_btn.setCursor(Qt.PointingHandCursor if pause_clickable else Qt.ArrowCursor)
-
-            self.play_btn.setStyleSheet(base_style + "color: #000000;")
-            self.play_btn.setEnabled(play_clickable)
-            self.play_btn.setCursor(Qt.PointingHandCursor if play_clickable else Qt.ArrowCursor)
-            
-            self.restart_btn.setStyleSheet(base_style + "color: #000000;")
-            self.restart_btn.setEnabled(restart_clickable)
-            self.restart_btn.setCursor(Qt.PointingHandCursor if restart_clickable else Qt.ArrowCursor)
-            
-            self.stop_btn.setStyleSheet(base_style + "color: #000000;")
-            self.stop_btn.setEnabled(stop_clickable)
-            self.stop_btn.setCursor(Qt.PointingHandCursor if stop_clickable else Qt.ArrowCursor)
-
-            self.continuous_read_btn.setStyleSheet(base_style + "color: #000000;")
-            self.continuous_read_btn.setEnabled(continuous_read_clickable)
-            self.continuous_read_btn.setCursor(Qt.PointingHandCursor if continuous_read_clickable else Qt.ArrowCursor)
+            self._set_audio_status('finished')
 
-            print(f"✅ 오디오 상태 업데이트: 일시정지({pause_clickable}), 재생({play_clickable}), 다시듣기({restart_clickable}), 정지({stop_clickable}), 캡처({snip_clickable}), 연속읽기({continuous_read_clickable})")
+    def _maybe_advance_page(self):
+        """
+        연속 읽기 중 현재 페이지 처리가 끝났으면 다음 페이지로 넘어갑니다.
+        CONTINUOUS_LOOKAHEAD면 재생이 끝나기를 기다리지 않고 넘겨 다음 페이지 오디오를 미리 준비합니다.
+        미리 준비하는 페이지는 하나뿐이며, 대기 중인 페이지가 재생되기 시작해야 그다음 페이지로 넘깁니다.
+        (일시정지 중에는 넘기지 않음)
+        """
+        if (not self.continuous_read_active or not self._advance_due
+                or self.is_waiting_for_next_page or self.pipeline_running):
+            return
+        if self.audio_status == 'finished':
+            print("[Continuous Read] 오디오 재생 완료. 다음 페이지로 이동합니다.")
+        elif CONTINUOUS_LOOKAHEAD and self.audio_status == 'playing' and not has_queued_audio():
+            print("[Continuous Read] 재생 중에 다음 페이지를 미리 준비합니다.")
+        else:
+            return
+        self._advance_due = False
+        self._next_page_action()
+
+    def _apply_control_styles(self):
+        """제어 버튼 스타일 적용 (UI 생성/툴바 확장 시에만)"""
+        for btn in (self.snip_btn, self.pause_btn, self.play_btn, self.restart_btn, self.stop_btn, self.continuous_read_btn):
+            btn.setStyleSheet(CONTROL_STYLE + ("color: #dc3545;" if btn is self.pause_btn else "color: #000000;"))
+
+    def _refresh_controls(self, force=False):
+        """버튼 색은 유지하면서 클릭 가능 여부만 조정 (바뀐 버튼만 건드림, force=True면 모두)"""
+        status = self.audio_status
+        stop_clickable = status in ('playing', 'paused', 'finished') or self.continuous_read_active or self.pipeline_running
+        restart_clickable = status in ('playing', 'paused', 'finished') or self.continuous_read_active
+        capture_clickable = (not self.pending_components and not self.failed_components and not self.snipping_active and status != 'playing'
+                             and not self.continuous_read_active and not self.pipeline_running)
+        for btn, clickable in ((self.snip_btn, capture_clickable),
+                               (self.pause_btn, status == 'playing'),
+                               (self.play_btn, status == 'paused'),
+                               (self.restart_btn, restart_clickable),
+                               (self.stop_btn, stop_clickable),
+                               (self.continuous_read_btn, capture_clickable)):
+            if force or btn.isEnabled() != clickable:
+                btn.setEnabled(clickable)
+                btn.setCursor(Qt.PointingHandCursor if clickable else Qt.ArrowCursor)
 
     def _on_pause_clicked(self):
         if self.audio_status == 'playing':
             print("[ToolBar] 일시정지 버튼 클릭됨.")
             pause_audio()
-            self.audio_status = 'paused'
-            self._update_audio_button_colors(self.audio_status)
+            self._set_audio_status('paused')
         else:
             print("[ToolBar] 오디오가 재생 중이 아니므로 일시정지 버튼 클릭 무시.")
 
@@ -250,8 +382,7 @@ class ToolBar(QWidget):
         if self.audio_status == 'paused':
             print("[ToolBar] 재생 버튼 클릭됨.")
             resume_audio()
-            self.audio_status = 'playing'
-            self._update_audio_button_colors(self.audio_status)
+            self._set_audio_status('playing')
         else:
             print("[ToolBar] 오디오가 일시정지 상태가 아니므로 재생 버튼 클릭 무시.")
 
@@ -259,8 +390,7 @@ class ToolBar(QWidget):
         if self.audio_status != 'stopped':
             print("[ToolBar] 다시듣기 버튼 클릭됨.")
             restart_audio()
-            self.audio_status = 'playing'
-            self._update_audio_button_colors(self.audio_status)
+            self._set_audio_status('playing')
         else:
             print("[ToolBar] 오디오가 재생 또는 일시정지 상태가 아니므로 다시듣기 버튼 클릭 무시.")
 
@@ -268,28 +398,134 @@ class ToolBar(QWidget):
         print("[ToolBar] 정지 버튼 클릭됨.")
         if self.continuous_read_active:
             print("[ToolBar] 연속 읽기 모드 종료.")
+            self._page_waiter.cancel()
             self.continuous_read_active = False
             self.is_waiting_for_next_page = False
             self.is_setting_next_page_pos = False
         
+        self._cancel_pipeline()
         stop_audio()
-        self.audio_status = 'stopped'
-        self._update_audio_button_colors(self.audio_status)
+        self._set_audio_status('stopped')
+
+    def _start_pipeline(self, image, continuation=False):
+        """
+        run_pipeline을 백그라운드 스레드에서 시작합니다. (GUI 스레드는 바로 반환)
+        취소된 이전 워커가 아직 실행 중이면 요청을 대기시켰다가 그 워커가 끝나는 즉시 시작합니다.
+        """
+        # 호출한 쪽이 이미 띄운 진행 창은 그대로 두고 이전 작업만 취소
+        self._cancel_pipeline(hide=False)
+        if self._cancelling_worker is not None:
+            print("[ToolBar] 이전 파이프라인이 끝나면 시작합니다.")
+            self._queued_pipeline = (image, continuation)
+            self.pipeline_running = True
+            self._refresh_controls()
+            return
+        self._launch_pipeline(image, continuation)
+
+    def _launch_pipeline(self, image, continuation):
+        thread = QThread(self)
+        worker = PipelineWorker(image, continuation)
+        worker.moveToThread(thread)
+
+        if self._overlay is not None:
+            worker.progress_updated.connect(self._overlay.update_progress)
+        worker.playback_started.connect(self._on_playback_started)
+        worker.finished.connect(self._on_pipeline_finished)
+        worker.stage_timed.connect(self._on_stage_timed)
+
+        # 스레드 생명주기 연결
+        thread.started.connect(worker.run)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        self._pipeline_thread = thread
+        self._pipeline_worker = worker
+        self.pipeline_running = True
+        self._refresh_controls()
+        thread.start()
+
+    def _cancel_pipeline(self, hide=True):
+        """진행 중인 파이프라인에 취소를 요청하고 대기 중인 요청을 버립니다. (다음 단계 경계에서 중단)"""
+        if self._queued_pipeline is not None:
+            self._queued_pipeline = None
+            self.pipeline_running = False
+            if hide:
+                self._hide_processing()
+        if self._pipeline_worker is not None and self.pipeline_running:
+            print("[ToolBar] 파이프라인 취소 요청.")
+            self._pipeline_worker.cancel()
+            # 현재 단계를 마치고 finished를 보낼 때까지 참조를 유지 (그 전에는 새 워커를 시작하지 않음)
+            self._cancelling_worker = self._pipeline_worker
+            self._pipeline_worker = None
+            self._pipeline_thread = None
+            self.pipeline_running = False
+            if hide:
+                self._hide_processing()
+
+    def _on_stage_timed(self, name, ms):
+        """파이프라인 단계 소요 시간을 진행 창에 표시합니다."""
+        if self.sender() is not self._pipeline_worker or self._overlay is None:
+            return
+        self._overlay.update_latency(name, ms)
+
+    def _on_playback_started(self):
+        """첫 오디오 재생 시작 시그널 처리. 남은 합성은 백그라운드에서 계속됩니다."""
+        if self.sender() is not self._pipeline_worker:
+            return
+        self._hide_processing()
+        # 미리 준비한 다음 페이지는 앞 페이지 뒤에 대기하므로, 앞 페이지를 일시정지 중이면 그대로 유지
+        if self.audio_status != 'paused':
+            self._set_audio_status('playing')
+
+    def _on_pipeline_finished(self, started, cancelled):
+        """PipelineWorker 완료 시그널 처리 (GUI 스레드에서 실행)."""
+        if self.sender() is self._cancelling_worker:
+            # 취소된 이전 워커가 끝남: 대기 중인 요청이 있으면 이제 시작
+            self._cancelling_worker = None
+            if self._queued_pipeline is not None:
+                image, continuation = self._queued_pipeline
+                self._queued_pipeline = None
+                self._launch_pipeline(image, continuation)
+            return
+        if self.sender() is not self._pipeline_worker:
+            # 이미 취소되었거나 새 파이프라인으로 대체된 이전 작업의 결과는 무시
+            return
+        self._pipeline_worker = None
+        self._pipeline_thread = None
+        self.pipeline_running = False
+        self._hide_processing()
+
+        if self.continuous_read_active:
+            self.is_waiting_for_next_page = False
+            self._advance_due = not cancelled
+
+        if cancelled:
+            self._set_audio_status('stopped')
+        elif started:
+            # 재생 시작 시그널에서 이미 'playing'으로 전환됨 (그 사이 일시정지했거나 이미 끝났다면 유지)
+            self._set_audio_status('playing' if self.audio_status == 'stopped' else self.audio_status)
+        elif self.audio_status in ('playing', 'paused'):
+            # 미리 준비한 페이지에 텍스트가 없음: 앞 페이지 오디오는 계속 재생하고 그다음 페이지로
+            self._set_audio_status(self.audio_status)
+        else:
+            # 인식된 텍스트가 없거나 오류: 연속 읽기라면 다음 페이지로 넘어가도록 'finished' 처리
+            self._set_audio_status('finished' if self.continuous_read_active else 'stopped')
         
     def start_snipping(self):
         print("[ToolBar] start_snipping 호출됨. 툴바 숨김.")
         
         if self.continuous_read_active:
             print("[ToolBar] 연속 읽기 모드 중이므로 모드를 종료하고 캡처 시작.")
+            self._page_waiter.cancel()
             stop_audio()
             self.continuous_read_active = False
             self.is_waiting_for_next_page = False
             self.is_setting_next_page_pos = False
-            self.audio_status = 'stopped'
-            self._update_audio_button_colors(self.audio_status)
+            self._set_audio_status('stopped')
         
         stop_audio()
-        self.audio_status = 'stopped'
+        self._set_audio_status('stopped')
 
         self.snipping_active = True
         self.hide()
@@ -300,34 +536,27 @@ class ToolBar(QWidget):
         )
         self.snipper.show()
         self.show_cancel_button()
-        self.audio_timer.stop()
-        self._update_audio_button_colors(self.audio_status)
+        self._refresh_controls()
 
-    def handle_snipped_image(self, image_path):
-        print(f"[ToolBar] handle_snipped_image 콜백 호출됨: {image_path}")
+    def handle_snipped_image(self, image):
+        print(f"[ToolBar] handle_snipped_image 콜백 호출됨: {image_size(image)}")
         stop_audio()
 
-        # ▶ 로딩 오버레이 표시
-        self._show_processing("OCR/TTS 처리 중…")
-
-        try:
-            run_pipeline(image_path, progress_cb=self._overlay.update_progress)  # 기존 동기 호출 그대로 유지
-        finally:
-            # ▶ 처리 후 반드시 닫기
-            self._hide_processing()
-
+        # 툴바를 먼저 복원하여 처리 중에도 정지/취소 버튼을 누를 수 있게 함
         self.snipping_active = False
         self.hide_cancel_button()
         self.show()
         self.is_expanded = False
         self.toggle_toolbar()
-        self.audio_status = 'playing'
-        self._update_audio_button_colors(self.audio_status)
+        self._set_audio_status('stopped')
         if self.snipper:
             print("[ToolBar] 스니퍼 인스턴스 정리.")
             self.snipper = None
-        self.audio_timer.start(250)
-        print("[ToolBar] handle_snipped_image 처리 완료.")
+
+        # ▶ 로딩 오버레이 표시 후 백그라운드에서 OCR/TTS 실행
+        self._show_processing("OCR/TTS 처리 중…")
+        self._start_pipeline(image)
+        print("[ToolBar] handle_snipped_image 처리 시작됨 (백그라운드).")
 
 
     def cancel_snipping(self):
@@ -341,9 +570,13 @@ class ToolBar(QWidget):
 
     def close_application(self):
         print("[ToolBar] close_application 호출됨. 애플리케이션 종료 시작.")
+        self._cancel_pipeline()
+        for t in self.findChildren(QThread):
+            # 취소된 워커가 현재 단계를 마칠 때까지 잠시 대기
+            t.quit()
+            t.wait(3000)
         stop_audio()
-        self.audio_status = 'stopped'
-        self._update_audio_button_colors(self.audio_status)
+        self._set_audio_status('stopped')
         if hasattr(self, 'snipper') and self.snipper and self.snipper.isVisible():
             print("[ToolBar] 활성 스니퍼가 감지되어 먼저 취소합니다.")
             self.snipper.canceled = True
@@ -358,7 +591,6 @@ class ToolBar(QWidget):
         except Exception as e:
             print(f"[ERROR] 파일 삭제 중 오류 발생: {e}")
 
-        self.audio_timer.stop()
         self.close()
         QApplication.instance().quit()
         print("[ToolBar] QApplication.quit() 호출됨. (이 메시지 이후 프로세스 종료 예상)")
@@ -375,30 +607,28 @@ class ToolBar(QWidget):
         self.is_expanded = False
         self.toggle_toolbar()
         
-        self.audio_status = 'stopped'
-        self._update_audio_button_colors(self.audio_status)
+        self._set_audio_status('stopped')
         
         if self.snipper:
             print("[ToolBar] 스니퍼 인스턴스 정리.")
             self.snipper = None
 
-        self.audio_timer.start(250)
         print("[ToolBar] on_snipping_cancelled 처리 완료.")
 
     def start_continuous_reading(self):
         """연속 읽기 모드 시작."""
         if self.continuous_read_active:
             self.continuous_read_active = False
-            self.continuous_read_btn.setStyleSheet("background:transparent;")
+            self._page_waiter.cancel()
+            self._cancel_pipeline()
             stop_audio()
-            self.audio_status = 'stopped'
-            self._update_audio_button_colors(self.audio_status)
+            self._set_audio_status('stopped')
             print("[ToolBar] 연속 읽기 모드 종료.")
             return
 
         print("[ToolBar] 연속 읽기 모드 시작. 읽기 영역 설정 시작.")
         stop_audio()
-        self.audio_status = 'stopped'
+        self._set_audio_status('stopped')
         
         self.continuous_read_active = True
         self.is_setting_next_page_pos = False
@@ -447,10 +677,14 @@ class ToolBar(QWidget):
         else:
             self.on_snipping_cancelled()
 
-    def _start_reading_loop(self):
-        """읽기 루프 시작 (첫 실행 및 다음 페이지 루프 공통)"""
+    def _start_reading_loop(self, continuation=False):
+        """
+        읽기 루프 시작 (첫 실행 및 다음 페이지 루프 공통)
+        continuation=True면 다음 페이지로, 오디오가 아직 재생 중이면 그 뒤에 이어서 재생되도록 준비합니다.
+        """
         if not self.continuous_read_active:
             return
+        self._advance_due = False
 
         # 화면 캡처 준비
         self.hide()
@@ -462,36 +696,50 @@ class ToolBar(QWidget):
             self.show()
             return
 
-        # 영역 캡처
-        img = ImageGrab.grab(bbox=self.reading_area)
-        temp_path = os.path.join(tempfile.gettempdir(), f'snip_continuous_{uuid.uuid4().hex}.png')
-        img.save(temp_path)
+        # 영역 캡처 (메모리에서 바로 OCR로 전달, 디버그 저장이 켜진 경우에만 PNG 기록)
+        img = grab_region(self.reading_area)
+        save_debug_capture(img)
+
+        self.show()
+
+        if continuation and self.audio_status in ('playing', 'paused'):
+            # 앞 페이지를 듣는 동안 백그라운드에서 준비 (로딩창 없이, 재생 상태 유지)
+            self._start_pipeline(img, continuation=True)
+            return
 
         # ✅ 로딩창을 먼저 띄우고 0%로 시작
         self._show_processing("OCR/TTS 처리 중…")
 
-        try:
-            # ✅ run_pipeline은 딱 한 번만 호출하고, 진행률 콜백 연결
-            #    (이전 코드의 이중 호출/무콜백 호출 제거)
-            self.audio_status = 'stopped'   # 아직 재생 전 상태로 유지
-            run_pipeline(temp_path, progress_cb=self._overlay.update_progress)
-        finally:
-            self._hide_processing()
-
-        # TTS 생성이 끝나면 play_audio가 내부에서 실행되므로 여기서 상태만 'playing'으로
-        self.audio_status = 'playing'
-        self.show()
-        self._update_audio_button_colors(self.audio_status)
-        self.audio_timer.start(250)
-        self.is_waiting_for_next_page = False
+        # ✅ run_pipeline은 백그라운드 워커에서 실행, 완료 시 _on_pipeline_finished에서
+        #    'playing' 전환 및 is_waiting_for_next_page 해제
+        self._set_audio_status('stopped')   # 아직 재생 전 상태로 유지
+        self._start_pipeline(img, continuation=continuation)
 
     
     def _next_page_action(self):
-        """다음 페이지로 넘어가는 액션을 수행합니다."""
-        if self.continuous_read_active and not is_audio_busy():
+        """
+        다음 페이지로 넘어가는 액션을 수행합니다.
+        고정 대기 대신 PageTurnWaiter가 읽기 영역의 변화를 감지해 렌더링이 끝나는 즉시 다음 읽기를 시작합니다.
+        """
+        if self.continuous_read_active:
             self.is_waiting_for_next_page = True
+            # 클릭 전 화면을 기준으로 잡아야 하므로 감시를 먼저 시작
+            self._page_waiter.start(self.reading_area)
             perform_mouse_click(self.next_page_click_pos)
-            QTimer.singleShot(2000, self._start_reading_loop)
+
+    def _on_next_page_ready(self):
+        if self.continuous_read_active:
+            self._start_reading_loop(continuation=True)
+
+    def _on_last_page_reached(self):
+        """'다음' 클릭 후에도 화면이 바뀌지 않음 → 책의 끝으로 보고 연속 읽기 종료."""
+        if not self.continuous_read_active:
+            return
+        print("[Continuous Read] 페이지가 더 이상 바뀌지 않아 연속 읽기를 종료합니다.")
+        self.continuous_read_active = False
+        self.is_waiting_for_next_page = False
+        # 미리 넘긴 경우 마지막 페이지 오디오는 끝까지 재생
+        self._set_audio_status('stopped' if self.audio_status == 'finished' else self.audio_status)
 
     def show_cancel_button(self):
         print("[ToolBar] show_cancel_button 호출됨.")
@@ -556,7 +804,9 @@ class ToolBar(QWidget):
             self.setMaximumSize(320, 500)
             self.resize(280, 400)
             print("[ToolBar] 툴바 확장됨.")
-            self._update_audio_button_colors(self.audio_status)
+            # 축소 시 투명 배경으로 바뀐 버튼 스타일 복원
+            self._apply_control_styles()
+            self._refresh_controls()
         else:
             self.setFixedSize(120, 50)
             print("[ToolBar] 툴바 축소됨.")
@@ -683,11 +933,13 @@ class ToolBar(QWidget):
         self.drag_start_position = global_pos
 
 class ProcessingOverlay(QDialog):
-    def __init__(self, parent=None, text="처리 중…"):
+    cancel_requested = pyqtSignal()
+
+    def __init__(self, parent=None, text="처리 중…", cancellable=False):
         super().__init__(parent, flags=Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
         self.setModal(False)
-        self.setFixedSize(260, 110)
+        self.setFixedSize(260, 170 if cancellable else 130)
 
         cont = QWidget(self)
         cont.setStyleSheet("""
@@ -702,7 +954,21 @@ class ProcessingOverlay(QDialog):
         self.bar = QProgressBar(cont)
         # 동기 처리 중 애니메이션 대신 '바 모드'로 표시 (마퀴 효과)
         self.bar.setRange(0, 100)  # 0,0 => Busy indicator
-        v.addWidget(self.msg); v.addWidget(self.bar)
+        # 단계별 소요 시간 (파이프라인 진행 중 실시간 갱신)
+        self.latency = QLabel("", cont)
+        self.latency.setStyleSheet("color: #b0b0b0; font-size: 11px;")
+        self._latency_ms = {}
+        v.addWidget(self.msg); v.addWidget(self.bar); v.addWidget(self.latency)
+        if cancellable:
+            self.cancel_btn = QPushButton("취소", cont)
+            self.cancel_btn.setCursor(Qt.PointingHandCursor)
+            self.cancel_btn.setStyleSheet("""
+                QPushButton{ background:#dc3545; color:#ffffff; border-radius:6px;
+                             font-size:14px; padding:4px; }
+                QPushButton:hover{ background:#c82333; }
+            """)
+            self.cancel_btn.clicked.connect(self.cancel_requested.emit)
+            v.addWidget(self.cancel_btn)
 
         wrap = QVBoxLayout(self); wrap.setContentsMargins(0,0,0,0); wrap.addWidget(cont)
 
@@ -722,7 +988,19 @@ class ProcessingOverlay(QDialog):
             self.msg.setText(f"{value}% 완료 — {msg}")
         else:
             self.msg.setText(f"{value}% 완료")
-        QApplication.processEvents()
+
+    def reset_latency(self):
+        self._latency_ms = {}
+        self.latency.setText("")
+
+    def update_latency(self, name: str, ms: float):
+        """LATENCY_LABELS에 있는 단계만 '캡처 12 · OCR 840 · 첫 오디오 1320 ms' 형태로 표시합니다."""
+        if name not in LATENCY_LABELS:
+            return
+        self._latency_ms[name] = ms
+        parts = [f"{label} {self._latency_ms[key]:.0f}" for key, label in LATENCY_LABELS.items()
+                 if key in self._latency_ms]
+        self.latency.setText(" · ".join(parts) + " ms")
 
     def set_text(self, text: str):
         if text: self.msg.setText(text)
\ No newline at end of file
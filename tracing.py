@@ -0,0 +1,235 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+#-----------------------------------------
+# 단계별 추적/지표
+#-----------------------------------------
+# 캡처/OCR/TTS/재생 시작 같은 단계의 소요 시간(span)과 캐시 적중/읽은 페이지 수 같은 카운터를 모읍니다.
+# 꺼져 있으면 span()은 미리 만들어 둔 빈 컨텍스트를 돌려주고 incr()는 바로 반환하므로
+# 측정 비용이 거의 없습니다. 켜져 있을 때도 perf_counter 두 번과 dict 갱신 정도라 상시 사용 가능합니다.
+# trace_path가 설정되면 모든 span/이벤트를 JSONL 한 줄씩 기록합니다.
+
+_enabled = True
+_trace_path = None
+_trace_file = None
+_lock = threading.Lock()
+_local = threading.local()   # 현재 스레드에서 진행 중인 trace
+
+_counters = {}
+_stats = {}        # 이름 -> [횟수, 합계 ms, 최대 ms]
+_last = {}         # 이름 -> 마지막 소요 시간 ms
+_last_trace = {}   # 마지막으로 끝난 trace의 단계별 ms
+
+
+def configure(enabled=True, trace_path=None):
+    """추적 사용 여부와 JSONL 기록 경로(None이면 파일 기록 안 함)를 설정합니다."""
+    global _enabled, _trace_path, _trace_file
+    with _lock:
+        if _trace_file is not None and trace_path != _trace_path:
+            _trace_file.close()
+            _trace_file = None
+        _enabled = enabled
+        _trace_path = trace_path if enabled else None
+
+
+def is_enabled():
+    return _enabled
+
+
+def _write_locked(record):
+    global _trace_file
+    if _trace_path is None:
+        return
+    try:
+        if _trace_file is None:
+            os.makedirs(os.path.dirname(_trace_path) or '.', exist_ok=True)
+            _trace_file = open(_trace_path, 'a', encoding='utf-8', buffering=1)
+        _trace_file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    except OSError as e:
+        print(f"[ERROR] 추적 파일 기록 실패: {e}")
+        _trace_file = None
+
+
+def _record(name, ms, attrs):
+    trace = getattr(_local, 'trace', None)
+    with _lock:
+        _last[name] = ms
+        stat = _stats.get(name)
+        if stat is None:
+            _stats[name] = [1, ms, ms]
+        else:
+            stat[0] += 1
+            stat[1] += ms
+            if ms > stat[2]:
+                stat[2] = ms
+        if trace is not None:
+            trace.stages[name] = ms
+        if _trace_path is not None:
+            record = {'ts': round(time.time(), 3), 'name': name, 'ms': ms,
+                      'trace': trace.id if trace is not None else None}
+            if attrs:
+                record.update(attrs)
+            _write_locked(record)
+    if trace is not None and trace.listener is not None:
+        try:
+            trace.listener(name, ms)
+        except Exception:
+            # 표시용 콜백 오류로 측정 대상 작업이 실패하지 않도록 무시
+            pass
+
+
+#-----------------------------------------
+# span / 카운터 / 이벤트
+#-----------------------------------------
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'attrs', '_t0')
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = round((time.perf_counter() - self._t0) * 1000, 2)
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        _record(self.name, ms, self.attrs)
+        return False
+
+    def set(self, **attrs):
+        """span이 끝날 때 함께 기록할 속성을 추가합니다."""
+        self.attrs.update(attrs)
+
+
+def span(name, **attrs):
+    """with tracing.span('ocr'): ... 형태로 블록의 소요 시간을 기록합니다."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name, attrs)
+
+
+def mark(name, since, **attrs):
+    """
+    블록으로 감쌀 수 없는 구간(콜백 사이 등)을 기록합니다.
+    since는 time.perf_counter() 값이며, 현재 perf_counter() 값을 반환해 다음 구간의 시작으로 쓸 수 있습니다.
+    """
+    now = time.perf_counter()
+    if _enabled:
+        _record(name, round((now - since) * 1000, 2), attrs)
+    return now
+
+
+def incr(name, n=1):
+    """카운터를 n만큼 증가시킵니다."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def event(name, **attrs):
+    """소요 시간 없는 이벤트(전처리 결과, 선택된 음성 등)를 JSONL에만 기록합니다."""
+    if not _enabled or _trace_path is None:
+        return
+    trace = getattr(_local, 'trace', None)
+    record = {'ts': round(time.time(), 3), 'name': name, 'trace': trace.id if trace is not None else None}
+    record.update(attrs)
+    with _lock:
+        _write_locked(record)
+
+
+#-----------------------------------------
+# trace (한 번의 파이프라인 실행)
+#-----------------------------------------
+class _Trace:
+    __slots__ = ('id', 'kind', 'listener', 'stages', '_prev')
+
+    def __init__(self, kind, listener):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.listener = listener
+        self.stages = {}
+
+    def __enter__(self):
+        self._prev = getattr(_local, 'trace', None)
+        _local.trace = self
+        return self
+
+    def __exit__(self, *exc):
+        global _last_trace
+        _local.trace = self._prev
+        with _lock:
+            _last_trace = dict(self.stages)
+        return False
+
+
+class _NoopTrace(_NoopSpan):
+    __slots__ = ()
+    stages = {}
+
+
+_NOOP_TRACE = _NoopTrace()
+
+
+def trace(kind, listener=None):
+    """
+    with 블록 안에서 같은 스레드가 기록한 span을 하나의 trace로 묶습니다.
+    listener(name, ms)가 주어지면 span이 끝날 때마다 호출됩니다. (진행 창 지연 시간 표시용)
+    """
+    if not _enabled:
+        return _NOOP_TRACE
+    return _Trace(kind, listener)
+
+
+#-----------------------------------------
+# 조회
+#-----------------------------------------
+def last(name, default=None):
+    """name span의 마지막 소요 시간(ms)."""
+    return _last.get(name, default)
+
+
+def last_trace():
+    """마지막으로 끝난 trace의 단계별 소요 시간(ms) dict."""
+    return dict(_last_trace)
+
+
+def snapshot():
+    """카운터와 span별 (횟수, 평균, 최대, 마지막) 요약."""
+    with _lock:
+        spans = {
+            name: {'count': count, 'avg_ms': round(total / count, 2), 'max_ms': peak, 'last_ms': _last.get(name)}
+            for name, (count, total, peak) in _stats.items()
+        }
+        return {'counters': dict(_counters), 'spans': spans}
+
+
+def reset():
+    global _last_trace
+    with _lock:
+        _counters.clear()
+        _stats.clear()
+        _last.clear()
+        _last_trace = {}
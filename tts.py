@@ -0,0 +1,314 @@
+import re
+
+import tracing
+
+#-----------------------------------------
+# 스트리밍 TTS 합성
+#-----------------------------------------
+# TTS 엔진(tts_backends)이 보내는 오디오 청크를 모아 문장/단어 경계에서 잘라 세그먼트로 내보냅니다.
+# 첫 세그먼트는 작게 잘라 첫 음성까지의 시간(time-to-first-audio)을 줄이고,
+# 이후 세그먼트는 크게 잘라 세그먼트 전환 횟수를 줄입니다.
+
+# 첫 세그먼트 최소 크기 (기본 출력 48kbit/s MP3 기준 약 1초)
+FIRST_SEGMENT_BYTES = 6 * 1024
+# 이후 세그먼트 최소 크기 (약 8초)
+SEGMENT_BYTES = 48 * 1024
+
+_BOUNDARY_TYPES = ("WordBoundary", "SentenceBoundary")
+
+
+# 기본 말하기 속도 (edge-tts 형식, 예: "+10%")
+DEFAULT_RATE = "+0%"
+
+
+def audio_suffix(data):
+    """오디오 바이트의 파일 형식에 맞는 확장자. (오프라인 엔진은 WAV, edge-tts는 MP3)"""
+    if data[:4] == b"RIFF":
+        return '.wav'
+    if data[:4] == b"FORM":
+        return '.aiff'
+    return '.mp3'
+
+
+class MixedAudioError(ValueError):
+    """형식(또는 WAV 샘플 형식)이 서로 다른 세그먼트를 하나로 합치려 할 때."""
+
+
+def join_audio(parts):
+    """
+    합성된 세그먼트들을 하나의 오디오로 합칩니다.
+    MP3는 프레임을 그대로 이어 붙이고, WAV는 헤더를 다시 만들어 샘플만 이어 붙입니다.
+    대체 엔진으로 넘어가 MP3와 WAV가 섞이는 등 합칠 수 없는 조합이면 깨진 파일 대신 MixedAudioError를 던집니다.
+    """
+    if not parts:
+        return b""
+    suffixes = sorted({audio_suffix(part) for part in parts})
+    if len(suffixes) > 1:
+        raise MixedAudioError(f"서로 다른 오디오 형식은 합칠 수 없습니다: {', '.join(suffixes)}")
+    if len(parts) == 1:
+        return parts[0]
+    if suffixes[0] == '.mp3':
+        return b"".join(parts)
+    if suffixes[0] != '.wav':
+        raise MixedAudioError(f"{suffixes[0]} 세그먼트는 이어 붙일 수 없습니다.")
+    import io
+    import wave
+    out = io.BytesIO()
+    writer = None
+    params = None
+    for part in parts:
+        with wave.open(io.BytesIO(part), 'rb') as reader:
+            # 채널 수/샘플 폭/샘플링 레이트가 다르면 샘플을 그대로 이어 붙일 수 없음
+            fmt = reader.getparams()[:3]
+            if writer is None:
+                writer = wave.open(out, 'wb')
+                writer.setparams(reader.getparams())
+                params = fmt
+            elif fmt != params:
+                writer.close()
+                raise MixedAudioError(f"WAV 샘플 형식이 다릅니다: {params} / {fmt}")
+            writer.writeframes(reader.readframes(reader.getnframes()))
+    writer.close()
+    return out.getvalue()
+
+
+async def stream_segments(backend, text, voice, on_segment, cancel_event=None,
+                          first_segment_bytes=FIRST_SEGMENT_BYTES, segment_bytes=SEGMENT_BYTES,
+                          rate=DEFAULT_RATE, meta=None):
+    """
+    backend.stream()으로 text를 합성하면서, 일정 크기 이상 모인 오디오를
+    경계 이벤트 시점에 잘라 on_segment(bytes)로 순서대로 전달합니다.
+    (경계 이벤트가 없는 엔진은 청크 전체가 한 세그먼트가 됨)
+    meta dict가 주어지면 실제로 합성한 엔진을 meta['backend']에 기록합니다.
+    cancel_event가 설정되면 남은 합성을 중단하고 False를 반환합니다.
+    """
+    buf = bytearray()
+    threshold = first_segment_bytes
+    if meta is not None:
+        meta['backend'] = backend
+
+    async for chunk in backend.stream(text, voice, rate):
+        if cancel_event is not None and cancel_event.is_set():
+            return False
+        kind = chunk.get("type")
+        if kind == "backend":
+            # 라우터가 고른 실제 엔진
+            if meta is not None:
+                meta['backend'] = chunk["backend"]
+        elif kind == "audio":
+            buf.extend(chunk["data"])
+        elif kind in _BOUNDARY_TYPES and len(buf) >= threshold:
+            # 경계 직전까지 받은 오디오를 한 세그먼트로 내보냄
+            on_segment(bytes(buf))
+            buf.clear()
+            threshold = segment_bytes
+
+    if buf:
+        on_segment(bytes(buf))
+    return True
+
+
+#-----------------------------------------
+# 문장 단위 청크 분할
+#-----------------------------------------
+# 첫 청크는 짧게 만들어 빨리 합성/재생되게 하고, 이후 청크는 요청 수를 줄이기 위해 길게 묶습니다.
+FIRST_CHUNK_CHARS = 120
+CHUNK_CHARS = 400
+
+# 문장 부호 뒤 공백, 또는 OCR에서 공백이 빠진 한국어 종결 어미('다.', '요.' 등) 뒤에서 자름
+_SENTENCE_END = re.compile(r'(?<=[.!?。…])\s+|(?<=[다요죠까][.!?])(?=\S)')
+_SOFT_BREAK = re.compile(r'(?<=[,;:，、])\s+|\s+')
+
+
+def _split_long(sentence, max_chars):
+    """max_chars보다 긴 문장을 쉼표/공백 기준으로 나눕니다."""
+    parts, cur = [], ""
+    for piece in _SOFT_BREAK.split(sentence):
+        if not piece:
+            continue
+        candidate = f"{cur} {piece}" if cur else piece
+        if len(candidate) > max_chars and cur:
+            parts.append(cur)
+            cur = piece
+        else:
+            cur = candidate
+    if cur:
+        parts.append(cur)
+    return parts
+
+
+def split_text(text, first_chunk_chars=FIRST_CHUNK_CHARS, chunk_chars=CHUNK_CHARS):
+    """
+    OCR 텍스트를 합성 단위 청크 목록으로 나눕니다.
+    빈 줄은 문단 경계로 보고 청크를 끊으며, 문단 안의 줄바꿈(OCR 줄 단위)은 공백으로 이어
+    문장 단위로 다시 자른 뒤 최대 길이까지 묶습니다.
+    """
+    chunks = []
+    limit = first_chunk_chars
+    for paragraph in re.split(r'\n\s*\n', text):
+        flowing = " ".join(line.strip() for line in paragraph.splitlines() if line.strip())
+        if not flowing:
+            continue
+        cur = ""
+        for sentence in _SENTENCE_END.split(flowing):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            for piece in (_split_long(sentence, limit) if len(sentence) > limit else [sentence]):
+                candidate = f"{cur} {piece}" if cur else piece
+                if len(candidate) > limit and cur:
+                    chunks.append(cur)
+                    limit = chunk_chars
+                    cur = piece
+                else:
+                    cur = candidate
+        if cur:
+            chunks.append(cur)
+            limit = chunk_chars
+    return chunks
+
+
+#-----------------------------------------
+# 언어 구간 분할
+#-----------------------------------------
+# 한글이 섞인 단어는 한국어 구간(영어 음성은 한글을 읽지 못함), 라틴 문자만 있는 단어는 영어 구간으로 나눕니다.
+# 숫자/문장 부호만 있는 단어는 앞 구간에 붙입니다.
+# 한국어 문장 속의 짧은 영어 단어(약어 등)는 한국어 음성도 자연스럽게 읽으므로, 라틴 문자가 이 개수보다
+# 적고 한국어 문맥 속에 있는 영어 구간은 한국어 구간에 합쳐 음성이 자주 바뀌지 않게 합니다.
+MIN_LATIN_RUN_CHARS = 12
+
+_HANGUL = re.compile(r'[\u1100-\u11ff\u3130-\u318f\uac00-\ud7a3]')
+_LATIN = re.compile(r'[A-Za-z]')
+_WORD = re.compile(r'\S+\s*')
+
+
+def _word_lang(word):
+    if _HANGUL.search(word):
+        return 'ko'
+    if _LATIN.search(word):
+        return 'en'
+    return None
+
+
+def split_language_runs(text, min_latin_chars=MIN_LATIN_RUN_CHARS):
+    """
+    텍스트를 순서대로 [(언어, 조각), ...] 목록으로 나눕니다. 언어는 'ko' 또는 'en'입니다.
+    조각을 이어 붙이면 (앞뒤 공백을 제외하고) 원문과 같습니다.
+    """
+    runs = []   # [언어, 조각]
+    for word in _WORD.findall(text):
+        lang = _word_lang(word)
+        if runs and (lang is None or lang == runs[-1][0] or runs[-1][0] is None):
+            runs[-1][1] += word
+            if runs[-1][0] is None:
+                runs[-1][0] = lang
+        else:
+            runs.append([lang, word])
+
+    # 한국어 문맥 속의 짧은 영어 구간(양옆이 한국어이거나, 한쪽 끝에서 옆 한국어 구간보다 짧음)은 한국어로
+    for i, run in enumerate(runs):
+        if run[0] != 'en' or len(_LATIN.findall(run[1])) >= min_latin_chars:
+            continue
+        neighbors = [runs[j] for j in (i - 1, i + 1) if 0 <= j < len(runs)]
+        korean = [n for n in neighbors if n[0] == 'ko']
+        if len(korean) == 2 or (korean and len(korean[0][1].strip()) >= len(run[1].strip())):
+            run[0] = 'ko'
+
+    merged = []
+    for lang, piece in runs:
+        lang = lang or 'en'
+        if merged and merged[-1][0] == lang:
+            merged[-1] = (lang, merged[-1][1] + piece)
+        else:
+            merged.append((lang, piece))
+    return [(lang, piece.strip()) for lang, piece in merged if piece.strip()]
+
+
+#-----------------------------------------
+# 청크 병렬 합성 + 순서 보장 전달
+#-----------------------------------------
+class _OrderedSink:
+    """
+    병렬로 합성되는 청크들의 세그먼트를 청크 순서대로 내보냅니다.
+    맨 앞(head) 청크의 세그먼트는 즉시 전달하고, 뒤 청크의 세그먼트는 앞 청크가 끝날 때까지 보관합니다.
+    """
+
+    def __init__(self, count, emit):
+        self._emit = emit
+        self._head = 0
+        self._pending = [[] for _ in range(count)]
+        self._done = [False] * count
+
+    def add(self, index, segment):
+        if index == self._head:
+            self._emit(segment)
+        else:
+            self._pending[index].append(segment)
+
+    def close(self, index):
+        self._done[index] = True
+        while self._head < len(self._done) and self._done[self._head]:
+            self._head += 1
+            if self._head < len(self._done):
+                for segment in self._pending[self._head]:
+                    self._emit(segment)
+                self._pending[self._head] = []
+
+
+async def synthesize_chunks(backend, chunks, on_segment, cancel_event=None, max_concurrency=3,
+                            first_segment_bytes=FIRST_SEGMENT_BYTES, segment_bytes=SEGMENT_BYTES,
+                            rate=DEFAULT_RATE, audio_cache=None):
+    """
+    chunks[(text, voice), ...]를 최대 max_concurrency개까지 동시에 합성하고,
+    만들어진 세그먼트를 청크 순서대로 on_segment(segment)에 전달합니다.
+    segment는 새로 합성된 오디오(bytes) 또는 audio_cache에 있던 파일 경로(str)입니다.
+    첫 청크는 스트리밍으로 바로 재생되고, 뒤 청크는 재생되는 동안 미리 합성됩니다.
+    """
+    import asyncio   # 툴바 시작 시간을 줄이기 위해 사용 시점에 불러옴 (이벤트 루프 안이므로 이미 로드되어 있음)
+    sink = _OrderedSink(len(chunks), on_segment)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _run(index, text, voice):
+        key = None
+        if audio_cache is not None:
+            key = audio_cache.make_key(text, voice, rate)
+            cached_path = audio_cache.get(key)
+            if cached_path is not None:
+                # 캐시 적중: TTS 엔진 왕복 없이 바로 전달
+                tracing.incr('tts_cache_hit')
+                sink.add(index, cached_path)
+                sink.close(index)
+                return True
+            tracing.incr('tts_cache_miss')
+
+        parts = []
+        meta = {}
+
+        def _add(segment):
+            parts.append(segment)
+            sink.add(index, segment)
+
+        async with semaphore:
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+            ok = await stream_segments(
+                backend, text, voice, _add,
+                cancel_event=cancel_event,
+                first_segment_bytes=first_segment_bytes if index == 0 else segment_bytes,
+                segment_bytes=segment_bytes,
+                rate=rate,
+                meta=meta
+            )
+        # 캐시는 네트워크 엔진(edge-tts)의 결과만 저장 (오프라인 엔진은 다시 합성하는 편이 빠름)
+        if ok and key is not None and parts and getattr(meta.get('backend'), 'cacheable', False):
+            audio_cache.put(key, b"".join(parts))
+        sink.close(index)
+        return ok
+
+    tasks = [asyncio.ensure_future(_run(i, text, voice)) for i, (text, voice) in enumerate(chunks)]
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    return all(results)
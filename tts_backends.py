@@ -0,0 +1,358 @@
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+
+#-----------------------------------------
+# TTS 엔진
+#-----------------------------------------
+# 모든 엔진은 같은 인터페이스를 가집니다.
+#   name, cacheable                 엔진 이름, 결과를 디스크 캐시에 저장할지 여부
+#   expected_first_audio_ms         측정값이 없을 때 쓰는 첫 오디오까지의 예상 시간
+#   available() -> bool             지금 사용할 수 있는지 (패키지/실행 파일 유무)
+#   supports(voice) -> bool         voice(edge-tts 음성 이름, 예: "ko-KR-SunHiNeural")의 언어를 낼 수 있는지
+#   async stream(text, voice, rate) {"type": "audio", "data": bytes} 와 경계 이벤트를 차례로 내보냄
+# 음성은 항상 combined.KO_VOICE_NAME / EN_VOICE_NAME으로 지정하고,
+# 오프라인 엔진은 그 이름의 언어 부분("ko-KR")으로 설치된 음성을 찾습니다.
+
+# 네트워크 엔진이 실패하면 이 시간(초) 동안은 건너뛰고 다른 엔진을 사용
+FAILURE_COOLDOWN = 30
+# edge-tts 서버 연결 제한 시간(초). 오프라인일 때 대체 엔진으로 빨리 넘어가도록 짧게 설정
+EDGE_CONNECT_TIMEOUT = 5
+
+_LANGUAGE_NAMES = {'ko': 'KOREAN', 'en': 'ENGLISH'}
+
+
+def voice_locale(voice):
+    """'ko-KR-SunHiNeural' → ('ko', 'ko-KR')"""
+    parts = voice.split('-')
+    lang = parts[0].lower()
+    return lang, '-'.join(parts[:2]) if len(parts) >= 2 else lang
+
+
+def rate_percent(rate):
+    """edge-tts 속도 문자열('+10%', '-5%')을 정수 퍼센트로 바꿉니다."""
+    match = re.fullmatch(r'\s*([+-]?\d+)\s*%\s*', rate or "")
+    return int(match.group(1)) if match else 0
+
+
+class EdgeBackend:
+    """Microsoft Edge 온라인 신경망 음성 (edge-tts). 음질이 가장 좋지만 네트워크 왕복이 필요합니다."""
+    name = 'edge'
+    cacheable = True
+    expected_first_audio_ms = 700
+
+    def __init__(self, connect_timeout=EDGE_CONNECT_TIMEOUT):
+        self.connect_timeout = connect_timeout
+        self._edge_tts = None
+
+    def available(self):
+        if self._edge_tts is None:
+            try:
+                import edge_tts
+            except ImportError:
+                return False
+            self._edge_tts = edge_tts
+        return True
+
+    def supports(self, voice):
+        return True
+
+    async def stream(self, text, voice, rate):
+        if not self.available():
+            raise RuntimeError("edge-tts가 설치되어 있지 않습니다.")
+        communicate = self._edge_tts.Communicate(text=text, voice=voice, rate=rate,
+                                                 connect_timeout=self.connect_timeout)
+        async for chunk in communicate.stream():
+            yield chunk
+
+
+class Pyttsx3Backend:
+    """
+    운영체제 음성 엔진 (Windows SAPI5 / macOS NSSpeech / Linux eSpeak)을 pyttsx3로 사용하는 오프라인 엔진.
+    pyttsx3 엔진은 만든 스레드에서만 써야 하므로 전용 스레드 하나에서 모든 합성을 처리합니다.
+    supports()는 asyncio 루프(BackendRouter.candidates)에서 청크마다 불리므로 전용 스레드를 기다리지 않고,
+    생성 시 전용 스레드에서 한 번 읽어 둔 음성 목록과 음성별 결과 캐시만 봅니다.
+    """
+    name = 'pyttsx3'
+    cacheable = False
+    expected_first_audio_ms = 200
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyttsx3")
+        self._engine = None
+        self._voices = None
+        self._voice_ids = {}    # 음성 이름 -> 시스템 음성 id (없으면 None)
+        self._available = None
+        # 음성 목록은 전용 스레드에서 미리 읽어 둠 (다 읽기 전에는 supports()가 False)
+        self._voices_ready = self._executor.submit(self._ensure_engine) if self.available() else None
+
+    def available(self):
+        if self._available is None:
+            try:
+                import pyttsx3  # noqa: F401
+                self._available = True
+            except ImportError:
+                self._available = False
+        return self._available
+
+    def _ensure_engine(self):
+        # 전용 스레드 안에서만 호출
+        if self._engine is None:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+            self._voices = [
+                (v.id, f"{v.id} {v.name} {' '.join(str(l) for l in (v.languages or []))}".upper().replace('_', '-'))
+                for v in self._engine.getProperty('voices')
+            ]
+        return self._engine
+
+    def _find_voice(self, voice):
+        # self._voices가 읽힌 뒤에만 호출 (엔진을 건드리지 않으므로 어느 스레드에서나 가능)
+        if voice not in self._voice_ids:
+            lang, locale = voice_locale(voice)
+            self._voice_ids[voice] = next(
+                (voice_id for voice_id, haystack in self._voices
+                 if locale.upper() in haystack or _LANGUAGE_NAMES.get(lang, lang.upper()) in haystack),
+                None)
+        return self._voice_ids[voice]
+
+    def supports(self, voice):
+        ready = self._voices_ready
+        if ready is None or not ready.done() or ready.exception() is not None:
+            return False
+        return self._find_voice(voice) is not None
+
+    def _synthesize(self, text, voice, rate):
+        engine = self._ensure_engine()
+        voice_id = self._find_voice(voice)
+        if voice_id is None:
+            raise RuntimeError(f"{voice} 언어의 시스템 음성이 없습니다.")
+        engine.setProperty('voice', voice_id)
+        engine.setProperty('rate', int(200 * (1 + rate_percent(rate) / 100)))
+        fd, path = tempfile.mkstemp(suffix='.wav', prefix='snip_pyttsx3_')
+        os.close(fd)
+        try:
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    async def stream(self, text, voice, rate):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(self._executor, self._synthesize, text, voice, rate)
+        yield {"type": "audio", "data": data}
+
+
+class EspeakBackend:
+    """espeak-ng 명령줄 엔진. 가장 빠르고 어디서나 동작하지만 음성이 기계적입니다."""
+    name = 'espeak'
+    cacheable = False
+    expected_first_audio_ms = 80
+    languages = ('ko', 'en')
+
+    def __init__(self):
+        self.executable = shutil.which('espeak-ng') or shutil.which('espeak')
+
+    def available(self):
+        return self.executable is not None
+
+    def supports(self, voice):
+        return voice_locale(voice)[0] in self.languages
+
+    async def stream(self, text, voice, rate):
+        import asyncio
+        words_per_minute = int(175 * (1 + rate_percent(rate) / 100))
+        proc = await asyncio.create_subprocess_exec(
+            self.executable, '--stdout', '--stdin', '-v', voice_locale(voice)[0], '-s', str(words_per_minute),
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            data, err = await proc.communicate(text.encode('utf-8'))
+        except asyncio.CancelledError:
+            proc.kill()
+            raise
+        if proc.returncode != 0 or not data:
+            raise RuntimeError(f"espeak 실패: {err.decode('utf-8', 'replace').strip()}")
+        yield {"type": "audio", "data": data}
+
+
+class StubBackend:
+    """
+    오프라인 대체 엔진 (테스트/벤치마크용).
+    글자 수에 비례한 크기의 무음 MP3 바이트를 문장 경계 이벤트와 함께 내보냅니다.
+    같은 입력에는 항상 같은 바이트를 내므로 결과 비교가 가능하고,
+    first_chunk_delay/per_chunk_delay로 네트워크 지연을 흉내낼 수 있습니다.
+    """
+    name = 'stub'
+    cacheable = False
+    expected_first_audio_ms = 0
+    bytes_per_char = 400
+    chunk_bytes = 4096
+
+    def __init__(self, first_chunk_delay=0.0, per_chunk_delay=0.0):
+        self.first_chunk_delay = first_chunk_delay
+        self.per_chunk_delay = per_chunk_delay
+
+    def available(self):
+        return True
+
+    def supports(self, voice):
+        return True
+
+    async def stream(self, text, voice, rate):
+        import asyncio
+        total = max(1, len(text)) * self.bytes_per_char
+        sent = 0
+        await asyncio.sleep(self.first_chunk_delay)
+        while sent < total:
+            size = min(self.chunk_bytes, total - sent)
+            yield {"type": "audio", "data": b"\xff\xf3" + bytes(size - 2)}
+            sent += size
+            yield {"type": "SentenceBoundary", "offset": sent, "duration": 0, "text": ""}
+            if self.per_chunk_delay:
+                await asyncio.sleep(self.per_chunk_delay)
+
+
+#-----------------------------------------
+# 엔진 선택
+#-----------------------------------------
+class BackendRouter:
+    """
+    여러 엔진을 하나의 엔진처럼 사용합니다.
+    policy='ordered'면 목록 순서대로, policy='fastest'면 측정된 첫 오디오 시간(지수 이동 평균)이
+    가장 짧은 엔진부터 시도하고, 오디오가 나오기 전에 실패하면 다음 엔진으로 넘어갑니다.
+    실패한 엔진은 FAILURE_COOLDOWN 동안 후보에서 빠지므로, 오프라인일 때 요청마다 연결을 기다리지 않습니다.
+    """
+    cacheable = False
+
+    def __init__(self, backends, policy='ordered', cooldown=FAILURE_COOLDOWN, smoothing=0.3):
+        self.backends = list(backends)
+        self.policy = policy
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.name = 'auto' if policy == 'fastest' else '+'.join(b.name for b in self.backends)
+        self.expected_first_audio_ms = min((b.expected_first_audio_ms for b in self.backends), default=0)
+        self._lock = threading.Lock()
+        self._first_audio_ms = {}   # 엔진 이름 -> 첫 오디오 시간 이동 평균
+        self._failed_until = {}
+
+    def available(self):
+        return any(b.available() for b in self.backends)
+
+    def supports(self, voice):
+        return any(b.supports(voice) for b in self.backends)
+
+    def estimate(self, backend):
+        return self._first_audio_ms.get(backend.name, backend.expected_first_audio_ms)
+
+    def candidates(self, voice):
+        """voice를 낼 수 있고 지금 쓸 수 있는 엔진 목록 (시도 순서)."""
+        now = time.monotonic()
+        usable = [b for b in self.backends
+                  if self._failed_until.get(b.name, 0) <= now and b.available() and b.supports(voice)]
+        if self.policy == 'fastest':
+            usable.sort(key=self.estimate)
+        return usable
+
+    def request_candidates(self, voices):
+        """
+        voices를 모두 낼 수 있고 지금 쓸 수 있는 엔진 목록 (시도 순서).
+        한 요청의 모든 청크를 한 엔진으로 합성할 때(합친 오디오에 MP3와 WAV가 섞이지 않도록) 사용합니다.
+        """
+        voices = list(voices)
+        return [b for b in self.candidates(voices[0]) if all(b.supports(v) for v in voices[1:])]
+
+    def report_failure(self, backend, error):
+        """라우터 밖에서 직접 쓴 엔진의 실패를 기록합니다. (FAILURE_COOLDOWN 동안 후보에서 제외)"""
+        self._fail(backend, error)
+
+    def _record(self, backend, ms):
+        with self._lock:
+            prev = self._first_audio_ms.get(backend.name)
+            self._first_audio_ms[backend.name] = ms if prev is None else prev + self.smoothing * (ms - prev)
+        tracing.incr(f'tts_backend_{backend.name}')
+
+    def _fail(self, backend, error):
+        with self._lock:
+            self._failed_until[backend.name] = time.monotonic() + self.cooldown
+        tracing.incr(f'tts_backend_{backend.name}_failed')
+        print(f"[TTS] {backend.name} 엔진 실패, {self.cooldown}s 동안 다른 엔진 사용: {error}")
+
+    async def stream(self, text, voice, rate):
+        errors = []
+        for backend in self.candidates(voice):
+            t0 = time.perf_counter()
+            started = False
+            try:
+                async for chunk in backend.stream(text, voice, rate):
+                    if not started and chunk.get("type") == "audio":
+                        started = True
+                        self._record(backend, (time.perf_counter() - t0) * 1000)
+                        yield {"type": "backend", "backend": backend}
+                    yield chunk
+            except Exception as e:
+                if started:
+                    # 이미 일부 오디오가 나간 뒤의 실패는 다른 엔진으로 이어 붙일 수 없음
+                    raise
+                self._fail(backend, e)
+                errors.append(f"{backend.name}: {e}")
+                continue
+            if started:
+                return
+            errors.append(f"{backend.name}: 오디오 없음")
+        raise RuntimeError("사용 가능한 TTS 엔진이 없습니다. " + "; ".join(errors))
+
+
+def request_candidates(backend, voices):
+    """backend(단일 엔진 또는 BackendRouter)로 voices를 모두 합성할 때 차례로 시도할 엔진 목록."""
+    if isinstance(backend, BackendRouter):
+        return backend.request_candidates(voices)
+    return [backend]
+
+
+BACKENDS = {
+    'edge': EdgeBackend,
+    'pyttsx3': Pyttsx3Backend,
+    'espeak': EspeakBackend,
+    'stub': StubBackend,
+}
+# 'auto' 또는 대체 엔진으로 고려할 순서 (stub은 명시적으로 고를 때만 사용)
+FALLBACK_ORDER = ('edge', 'pyttsx3', 'espeak')
+
+
+def create_backend(name='edge', fallback=True):
+    """
+    이름으로 엔진을 만듭니다.
+    'auto'는 사용 가능한 엔진 중 요청마다 첫 오디오가 가장 빠른 엔진을 고르고,
+    fallback=True면 지정한 엔진이 실패할 때 나머지 사용 가능한 엔진으로 이어서 합성합니다.
+    """
+    if name == 'auto':
+        backends = [BACKENDS[n]() for n in FALLBACK_ORDER]
+        router = BackendRouter([b for b in backends if b.available()], policy='fastest')
+        if not router.backends:
+            raise RuntimeError("사용 가능한 TTS 엔진이 없습니다.")
+        return router
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 TTS 엔진: {name} (가능: auto, {', '.join(BACKENDS)})")
+    primary = BACKENDS[name]()
+    if name == 'stub' or not fallback:
+        if not primary.available():
+            raise RuntimeError(f"TTS 엔진 '{name}'을(를) 사용할 수 없습니다.")
+        return primary
+    others = [BACKENDS[n]() for n in FALLBACK_ORDER if n != name]
+    backends = [b for b in [primary] + others if b.available()]
+    if not backends:
+        raise RuntimeError("사용 가능한 TTS 엔진이 없습니다.")
+    return BackendRouter(backends, policy='ordered')